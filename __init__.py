@@ -1,10 +1,15 @@
-# Core classes
-from luna_rig.core.meta import MetaNode
-from luna_rig.core.component import Component
-from luna_rig.core.component import AnimComponent
-from luna_rig.core.component import Hook
-from luna_rig.core.control import Control
-# Components lib
-import luna_rig.components as components
-# Util
-import pymel.core.nodetypes as nt
+from luna_rig.functions import lazyFn
+
+# Attributes are imported on first access, see lazyFn.install
+lazyFn.install(__name__, [
+    # Core classes
+    ("MetaNode", "luna_rig.core.meta:MetaNode"),
+    ("Component", "luna_rig.core.component:Component"),
+    ("AnimComponent", "luna_rig.core.component:AnimComponent"),
+    ("Hook", "luna_rig.core.component:Hook"),
+    ("Control", "luna_rig.core.control:Control"),
+    # Components lib
+    ("components", "luna_rig.components"),
+    # Util
+    ("nt", "pymel.core.nodetypes"),
+])
@@ -1,23 +1,28 @@
-# Character/ Anim components
-from luna_rig.components.character_component import Character
-from luna_rig.components.fk_component import FKComponent
-from luna_rig.components.fk_component import HeadComponent
-from luna_rig.components.ik_component import IKComponent
-from luna_rig.components.ik_component import IKSplineComponent
-from luna_rig.components.fkik_component import FKIKComponent
-from luna_rig.components.fk_dynamics_component import FKDynamicsComponent
-from luna_rig.components.spine_component import FKIKSpineComponent
-from luna_rig.components.spine_component import RibbonSpineComponent
-from luna_rig.components.foot_component import FootComponent
-from luna_rig.components.twist_component import TwistComponent
-from luna_rig.components.hand_component import HandComponent
-from luna_rig.components.eye_component import EyeComponent
-from luna_rig.components.simple_component import SimpleComponent
-from luna_rig.components.ribbon_component import RibbonComponent
-from luna_rig.components.lips_component import RibbonLipsComponent
-from luna_rig.components.corrective_component import CorrectiveComponent
-from luna_rig.components.wire_component import WireComponent
+from luna_rig.functions import lazyFn
 
-# Components
-from luna_rig.components.stretch_component import IKSplineStretchComponent
-from luna_rig.components.stretch_component import IKStretchComponent
+# Components are imported on first access, see lazyFn.install
+lazyFn.install(__name__, [
+    # Character/ Anim components
+    ("Character", "luna_rig.components.character_component:Character"),
+    ("FKComponent", "luna_rig.components.fk_component:FKComponent"),
+    ("HeadComponent", "luna_rig.components.fk_component:HeadComponent"),
+    ("IKComponent", "luna_rig.components.ik_component:IKComponent"),
+    ("IKSplineComponent", "luna_rig.components.ik_component:IKSplineComponent"),
+    ("FKIKComponent", "luna_rig.components.fkik_component:FKIKComponent"),
+    ("FKDynamicsComponent", "luna_rig.components.fk_dynamics_component:FKDynamicsComponent"),
+    ("FKIKSpineComponent", "luna_rig.components.spine_component:FKIKSpineComponent"),
+    ("RibbonSpineComponent", "luna_rig.components.spine_component:RibbonSpineComponent"),
+    ("FootComponent", "luna_rig.components.foot_component:FootComponent"),
+    ("TwistComponent", "luna_rig.components.twist_component:TwistComponent"),
+    ("HandComponent", "luna_rig.components.hand_component:HandComponent"),
+    ("EyeComponent", "luna_rig.components.eye_component:EyeComponent"),
+    ("SimpleComponent", "luna_rig.components.simple_component:SimpleComponent"),
+    ("RibbonComponent", "luna_rig.components.ribbon_component:RibbonComponent"),
+    ("RibbonLipsComponent", "luna_rig.components.lips_component:RibbonLipsComponent"),
+    ("CorrectiveComponent", "luna_rig.components.corrective_component:CorrectiveComponent"),
+    ("WireComponent", "luna_rig.components.wire_component:WireComponent"),
+
+    # Components
+    ("IKSplineStretchComponent", "luna_rig.components.stretch_component:IKSplineStretchComponent"),
+    ("IKStretchComponent", "luna_rig.components.stretch_component:IKStretchComponent"),
+])
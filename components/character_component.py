@@ -1,4 +1,6 @@
+import json
 import pymel.core as pm
+import maya.cmds as mc
 from luna import Logger
 from luna import static
 import luna_rig
@@ -8,6 +10,17 @@ import luna_rig.functions.outlinerFn as outlinerFn
 import luna_rig.functions.rigFn as rigFn
 import luna_rig.functions.nameFn as nameFn
 import luna_rig.functions.jointFn as jointFn
+import luna_rig.functions.transformFn as transformFn
+import luna_rig.functions.cacheFn as cacheFn
+import luna_rig.functions.attachFn as attachFn
+import luna_rig.functions.manifestFn as manifestFn
+import luna_rig.functions.perfFn as perfFn
+import luna_rig.functions.asset_files as asset_files
+from luna.utils import fileFn
+
+
+# Character node -> list of (left ctl, right ctl) transform names
+_MIRROR_TABLES = cacheFn.SceneCache("mirror_tables", events=[cacheFn.SceneEvent.NAME_CHANGED, cacheFn.SceneEvent.NODE_REMOVED])
 
 
 class Character(luna_rig.Component):
@@ -64,6 +77,89 @@ class Character(luna_rig.Component):
         size = max(self.get_size(axis="y") * 0.1, self.get_size(axis="x") * 0.1)
         return size
 
+    @property
+    def attach_method(self):
+        """Method used by components to attach skeleton and hooks, "constr" or "matrix".
+
+        :rtype: str
+        """
+        if not self.pynode.hasAttr("attachMethod"):
+            return "constr"
+        return self.pynode.attachMethod.get() or "constr"
+
+    @attach_method.setter
+    def attach_method(self, method):
+        method = attachFn.validate_method(method)
+        if not self.pynode.hasAttr("attachMethod"):
+            self.pynode.addAttr("attachMethod", dt="string")
+        self.pynode.attachMethod.set(method)
+        Logger.info("{0}: Attach method set to {1}. Affects components attached from now on.".format(self, method))
+
+    @property
+    def performance_level(self):
+        """Current performance level name, one of perfFn.PERFORMANCE_LEVELS.
+
+        :rtype: str
+        """
+        if not self.pynode.hasAttr("performanceLevel"):
+            return perfFn.PERFORMANCE_LEVELS[0]
+        return perfFn.PERFORMANCE_LEVELS[self.pynode.performanceLevel.get()]
+
+    def set_performance_level(self, level, measure=False, time_range=None, loops=1):
+        """Disable costly subsystems for fast playback. Previous level is restored exactly before new one is applied.
+        Level and restore state are stored on character node, so they persist in saved and referenced scenes.
+
+        :param level: Level name or index, see perfFn.PERFORMANCE_LEVELS
+        :type level: str or int
+        :param measure: Measure playback FPS before and after switching, defaults to False
+        :type measure: bool, optional
+        :param time_range: Range to measure, defaults to None (playback range)
+        :type time_range: tuple, optional
+        :param loops: Measured playback loops, defaults to 1
+        :type loops: int, optional
+        :raises ValueError: If level is not valid
+        :return: Report with "level", "switched" and if measured "fps_before", "fps_after", "gain"
+        :rtype: dict
+        """
+        if isinstance(level, int):
+            if not 0 <= level < len(perfFn.PERFORMANCE_LEVELS):
+                raise ValueError("Invalid performance level {0}. Valid: {1}".format(level, perfFn.PERFORMANCE_LEVELS))
+            level = perfFn.PERFORMANCE_LEVELS[level]
+        if level not in perfFn.PERFORMANCE_LEVELS:
+            raise ValueError("Invalid performance level {0}. Valid: {1}".format(level, perfFn.PERFORMANCE_LEVELS))
+        if not self.pynode.hasAttr("performanceLevel"):
+            self.pynode.addAttr("performanceLevel", at="enum", en=":".join(perfFn.PERFORMANCE_LEVELS))
+            self.pynode.addAttr("performanceState", dt="string")
+            self.pynode.performanceState.set(json.dumps({}))
+
+        report = {"level": level}
+        if measure:
+            report["fps_before"] = perfFn.measure_playback(time_range, loops=loops)
+
+        # Back to full
+        failed = perfFn.restore_performance_state(json.loads(self.pynode.performanceState.get() or "{}"),
+                                                  namespace=":".join(self.namespace_list))
+        if failed:
+            Logger.warning("{0}: Failed to restore {1} switches of {2} level.".format(self, failed, self.performance_level))
+        # Apply new level
+        switches = perfFn.collect_performance_switches(self, perfFn.LEVEL_CATEGORIES[level])
+        state = perfFn.apply_performance_switches(switches)
+        self.pynode.performanceState.set(json.dumps(state))
+        self.pynode.performanceLevel.set(perfFn.PERFORMANCE_LEVELS.index(level))
+        report["switched"] = len(state["attrs"]) + len(state["connections"])
+
+        if measure:
+            report["fps_after"] = perfFn.measure_playback(time_range, loops=loops)
+            report["gain"] = report["fps_after"] / report["fps_before"] if report["fps_before"] else 0.0
+            Logger.info("{0}: Performance level {1}: {2:.2f} -> {3:.2f} fps (x{4:.2f})".format(self,
+                                                                                             level,
+                                                                                             report["fps_before"],
+                                                                                             report["fps_after"],
+                                                                                             report["gain"]))
+        else:
+            Logger.info("{0}: Performance level set to {1} ({2} switches).".format(self, level, report["switched"]))
+        return report
+
     @ property
     def actions_dict(self):
         actions = {}
@@ -80,13 +176,15 @@ class Character(luna_rig.Component):
         return result
 
     @classmethod
-    def create(cls, meta_parent=None, name="character", tag="character"):
+    def create(cls, meta_parent=None, name="character", tag="character", attach_method="constr"):
         """Creation method.
 
         :param meta_parent: Not used, defaults to None
         :type meta_parent: Component, optional
         :param name: Character name, defaults to "character"
         :type name: str, optional
+        :param attach_method: Components attach method, "constr" or "matrix", defaults to "constr"
+        :type attach_method: str, optional
         :return: New character instance.
         :rtype: Character
         """
@@ -101,6 +199,8 @@ class Character(luna_rig.Component):
         instance.pynode.addAttr("worldLocator", at="message")
         instance.pynode.addAttr("utilGrp", at="message")
         instance.pynode.addAttr("rootMotionJoint", at="message")
+        instance.pynode.addAttr("attachMethod", dt="string")
+        instance.pynode.attachMethod.set(attachFn.validate_method(attach_method))
 
         # Create main members
         root_control = luna_rig.Control.create(name="character_node",
@@ -227,28 +327,40 @@ class Character(luna_rig.Component):
         if not time_range:
             time_range = animFn.get_playback_range()
         Logger.info("{0}: Baking to skeleton {1}...".format(self, time_range))
-        pm.bakeResults(self.bind_joints, time=time_range, simulation=True)
+        bind_joints = self.bind_joints
+        for bind_jnt in bind_joints:
+            attachFn.to_constraint(bind_jnt)
+        pm.bakeResults(bind_joints, time=time_range, simulation=True)
 
     def bake_and_detach(self, time_range=None):
         self.bake_to_skeleton(time_range=time_range)
         for anim_comp in self.get_meta_children(of_type=luna_rig.AnimComponent):
             anim_comp.detach_from_sekelton()
 
-    def remove(self, time_range=None):
-        # Bake root
-        if self.root_motion:
-            Logger.info("{0}: Baking root motion...".format(self))
-            pm.bakeResults(self.root_motion, time=time_range, simulation=True)
-        # Bake components
-        self.bake_and_detach(time_range)
-        # Remove rig
-        for child in self.geometry_grp.getChildren():
-            child.setParent(None)
-        for child in self.deformation_rig.getChildren():
-            child.setParent(None)
-        pm.delete(self.root_control.group)
-        self._delete_util_nodes()
-        pm.delete(self.pynode)
+    def remove(self, time_range=None, dry_run=False):
+        """Bake animation to skeleton and delete rig. Geometry and skeleton are moved to world.
+
+        :param time_range: Bake range, defaults to None
+        :type time_range: tuple, optional
+        :param dry_run: Only log planned operations, defaults to False
+        :type dry_run: bool, optional
+        :return: Removal plan
+        :rtype: RemovalPlan
+        """
+        if not dry_run:
+            # Bake root
+            if self.root_motion:
+                Logger.info("{0}: Baking root motion...".format(self))
+                pm.bakeResults(self.root_motion, time=time_range, simulation=True)
+            # Bake components
+            self.bake_and_detach(time_range)
+        return super(Character, self).remove(dry_run=dry_run)
+
+    def _plan_removal(self, plan):
+        for child in self.geometry_grp.getChildren() + self.deformation_rig.getChildren():
+            plan.add_reparent(child, None)
+        plan.add_nodes([self.root_control.group])
+        super(Character, self)._plan_removal(plan)
 
     def set_interesting(self, value):
         for ctl in self.list_controls():
@@ -319,15 +431,216 @@ class Character(luna_rig.Component):
         return rig_set
 
     def set_publish_mode(self, value):
+        if value:
+            # Rig built against referenced model
+            asset_files.import_model_references()
         self.set_interesting(not value)
         rigFn.set_node_selectable(self.geometry_grp, not value)
         rigFn.set_node_selectable(self.deformation_rig, not value)
         self.deformation_rig.visibility.set(not value)
         self.util_grp.visibility.set(not value)
         self.create_selection_sets()
+        if value:
+            self.write_manifest()
+
+    def get_manifest_data(self):
+        """Collect components, controls, hooks and bind joints with single traversal of meta graph.
+        Format is described by manifestFn.RigManifest.
+
+        :rtype: dict
+        """
+        components = []
+        controls = {}
+        # Hook transform -> (component node, hook data)
+        hooks = {}
+        # Component node -> in hook transform
+        in_hooks = {}
+
+        def add_control(ctl, comp_node):
+            controls[str(ctl.transform)] = {"component": comp_node,
+                                            "side": ctl.side,
+                                            "name": ctl.name,
+                                            "index": ctl.index,
+                                            "tag": ctl.tag,
+                                            "spaces": ctl.spaces,
+                                            "bind_pose": ctl.bind_pose}
+
+        def list_hierarchy_children(comp):
+            # Only metaParent links, components are also connected to character through "character" attribute
+            comp_node = str(comp.pynode)
+            if not mc.attributeQuery("metaChildren", n=comp_node, ex=True):
+                return []
+            plugs = mc.listConnections(comp_node + ".metaChildren", s=True, d=False, plugs=True) or []
+            return [luna_rig.MetaNode(plug.split(".")[0]) for plug in plugs if plug.split(".")[-1] == "metaParent"]
+
+        visited = set()
+        queue = [self]
+        # Components not parented under character hierarchy are visited last
+        orphans = list(self.meta_children)
+        while queue or orphans:
+            comp = queue.pop(0) if queue else orphans.pop(0)
+            if comp in visited:
+                continue
+            visited.add(comp)
+            comp_node = str(comp.pynode)
+            meta_parent = comp.meta_parent if comp is not self else None
+            parent_node = str(meta_parent.pynode) if meta_parent else None
+            children = list_hierarchy_children(comp)
+            comp_data = {"node": comp_node,
+                         "type": comp.as_str(name_only=True),
+                         "class": comp.as_str(),
+                         "side": comp.side,
+                         "name": comp.name,
+                         "tag": comp.tag,
+                         "parent": parent_node,
+                         "children": [str(child.pynode) for child in children],
+                         "controls": [],
+                         "bind_joints": [],
+                         "hooks": [],
+                         "in_hook": None}
+            if comp is self:
+                comp_data["controls"].append(str(self.root_control.transform))
+                add_control(self.root_control, comp_node)
+            elif isinstance(comp, luna_rig.AnimComponent):
+                for ctl in comp.controls:
+                    comp_data["controls"].append(str(ctl.transform))
+                    add_control(ctl, comp_node)
+                comp_data["bind_joints"] = [str(jnt) for jnt in comp.bind_joints]
+                for index, hook in enumerate(comp.out_hooks):
+                    hook_data = {"index": index, "node": str(hook.transform), "object": str(hook.as_object), "children": []}
+                    comp_data["hooks"].append(hook_data)
+                    hooks[str(hook.transform)] = (comp_node, hook_data)
+                in_hook = comp.in_hook
+                if in_hook:
+                    in_hooks[comp_node] = str(in_hook.transform)
+            components.append(comp_data)
+            queue.extend(children)
+
+        # Resolve hook topology
+        for comp_data in components:
+            hook_transform = in_hooks.get(comp_data["node"])
+            if hook_transform not in hooks:
+                continue
+            owner_node, hook_data = hooks[hook_transform]
+            hook_data["children"].append(comp_data["node"])
+            comp_data["in_hook"] = {"component": owner_node, "index": hook_data["index"]}
+
+        return {"version": manifestFn.VERSION,
+                "scene": mc.file(q=True, sn=True),
+                "character": {"name": str(self.pynode.characterName.get()),
+                              "node": str(self.pynode),
+                              "attach_method": self.attach_method,
+                              "root_control": str(self.root_control.transform)},
+                "components": components,
+                "controls": controls}
+
+    def write_manifest(self, file_path=None):
+        """Write rig manifest for queries without Maya, see manifestFn.RigManifest.
+
+        :param file_path: Output file, defaults to None (next to current scene)
+        :type file_path: str, optional
+        :return: Written file path or None if scene is not saved.
+        :rtype: str
+        """
+        if not file_path:
+            scene_path = mc.file(q=True, sn=True)
+            if not scene_path:
+                Logger.warning("{0}: Scene is not saved, manifest is not written.".format(self))
+                return None
+            file_path = manifestFn.get_manifest_path(scene_path)
+        data = self.get_manifest_data()
+        fileFn.write_json(file_path, data=data, sort_keys=True)
+        Logger.info("{0}: Manifest written ({1} components, {2} controls): {3}".format(self, len(data["components"]), len(data["controls"]), file_path))
+        return file_path
 
     def copy_keyframes(self, time_range, target_component, time_offset=0.0):
-        for source_ctl in self.controls:
-            for target_ctl in target_component.controls:
-                if target_ctl.transform.stripNamespace() == source_ctl.transform.stripNamespace():
-                    source_ctl.copy_keyframes(time_range, target_ctl, time_offset=time_offset)
+        """Copy controls animation to other component. Controls are matched by name without namespace.
+
+        :param time_range: Keys range
+        :type time_range: tuple
+        :param target_component: Component to copy animation to
+        :type target_component: Character
+        :param time_offset: Keys time offset, defaults to 0.0
+        :type time_offset: float, optional
+        :return: Transfer report with unmatched controls
+        :rtype: dict
+        """
+        return animFn.transfer_keyframes([ctl.transform for ctl in self.controls],
+                                         [ctl.transform for ctl in target_component.controls],
+                                         time_range=time_range,
+                                         time_offset=time_offset)
+
+    def get_mirror_table(self, refresh=False):
+        """Get pairs of opposite controls. Table is cached until any node is renamed or deleted.
+
+        :param refresh: Rebuild cached table, defaults to False
+        :type refresh: bool, optional
+        :return: List of (left control, right control) transform names.
+        :rtype: list[(str, str)]
+        """
+        table_key = self.pynode.longName()
+        if refresh:
+            _MIRROR_TABLES.pop(table_key)
+        return _MIRROR_TABLES.get_or_create(table_key, self.__build_mirror_table)
+
+    def __build_mirror_table(self):
+        side_controls = {}
+        for ctl in self.list_controls():
+            name_parts = nameFn.deconstruct_name(ctl.transform)
+            if name_parts.side in ["l", "r"]:
+                side_controls[(name_parts.side, name_parts.indexed_name)] = ctl.transform.longName()
+        mirror_table = []
+        for (side, indexed_name), left_transform in side_controls.items():
+            if side != "l":
+                continue
+            right_transform = side_controls.get(("r", indexed_name))
+            if right_transform:
+                mirror_table.append((left_transform, right_transform))
+        Logger.debug("{0}: Built mirror table with {1} pairs.".format(self, len(mirror_table)))
+        return mirror_table
+
+    def mirror_pose(self, direction="l", behavior=True, skip_translate=[False, False, False], skip_rotate=[False, False, False]):
+        """Mirror pose of all character controls to opposite side as single undo chunk.
+
+        :param direction: Source side, "l" mirrors left controls to the right and "r" right to the left, defaults to "l"
+        :type direction: str, optional
+        :param behavior: Mirror transform behaviour, defaults to True
+        :type behavior: bool, optional
+        :param skip_translate: Translate axes to keep on destination controls, defaults to [False, False, False]
+        :type skip_translate: list[bool], optional
+        :param skip_rotate: Rotate axes to keep on destination controls, defaults to [False, False, False]
+        :type skip_rotate: list[bool], optional
+        """
+        if direction not in ["l", "r"]:
+            Logger.error("{0}: Invalid mirror direction {1}, expected 'l' or 'r'.".format(self, direction))
+            raise ValueError
+        mirror_table = self.get_mirror_table()
+        if not mirror_table:
+            Logger.warning("{0}: No opposite controls to mirror.".format(self))
+            return
+        if direction == "l":
+            source_transforms, destination_transforms = zip(*mirror_table)
+        else:
+            destination_transforms, source_transforms = zip(*mirror_table)
+
+        # Bulk read
+        source_matrices = transformFn.get_matrices(source_transforms, space="object")
+        old_translates = [mc.getAttr(node + ".translate")[0] for node in destination_transforms]
+        old_rotates = [mc.getAttr(node + ".rotate")[0] for node in destination_transforms]
+        # Mirror all matrices at once
+        if behavior:
+            mirrored_matrices = transformFn.invert_matrices(source_matrices)
+        else:
+            mirrored_matrices = source_matrices
+
+        # Bulk write
+        pm.undoInfo(openChunk=True)
+        try:
+            transformFn.set_matrices(destination_transforms, mirrored_matrices, space="object")
+            for node, old_translate, old_rotate in zip(destination_transforms, old_translates, old_rotates):
+                for is_skipped, attr_name, old_value in zip(skip_translate + skip_rotate, ["tx", "ty", "tz", "rx", "ry", "rz"], old_translate + old_rotate):
+                    if is_skipped:
+                        mc.setAttr("{0}.{1}".format(node, attr_name), old_value)
+        finally:
+            pm.undoInfo(closeChunk=True)
+        Logger.info("{0}: Mirrored {1} controls ({2} ->> {3}).".format(self, len(destination_transforms), direction, static.OppositeSide[direction].value))
@@ -56,6 +56,6 @@ class CorrectiveComponent(luna_rig.AnimComponent):
         return pose_dict
 
     def attach_to_skeleton(self):
-        super(CorrectiveComponent, self).attach_to_skeleton()
-        for ctl_jnt, bind_jnt in zip(self.ctl_chain, self.bind_joints):
-            pm.scaleConstraint(ctl_jnt, bind_jnt)
+        """Override: attach to skeleton including scale"""
+        Logger.info("{0}: Attaching to skeleton...".format(self))
+        self._attach_joints(self.ctl_chain, self.bind_joints, scale=True)
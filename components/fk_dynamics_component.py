@@ -120,25 +120,23 @@ class FKDynamicsComponent(luna_rig.AnimComponent):
     def attach_to_component(self, other_comp):
         super(FKDynamicsComponent, self).attach_to_component(other_comp, hook_index=None)
         # Add dynamics attributes
-        attrFn.add_divider(self.meta_parent.controls[0].transform, attr_name="DYNAMICS")
-        # TODO: Use proxy attr instead of copying
-        attr_dict = attrFn.transfer_attr(self.hair_system, self.meta_parent.controls[0].transform, connect=True)
-        for added_attr in attr_dict.values():
-            self._store_settings(added_attr)
+        fk_controls = self.meta_parent.controls
+        attrFn.add_divider(fk_controls[0].transform, attr_name="DYNAMICS")
+        attr_dict = attrFn.transfer_attr(self.hair_system, fk_controls[0].transform, proxy=True)
+        self._store_settings(list(attr_dict.values()))
         # Create dynamics offsets
-        for fk_ctl, jnt in zip(self.meta_parent.controls, self.ctl_chain):
+        dynam_offsets = []
+        for fk_ctl, jnt in zip(fk_controls, self.ctl_chain):
             dynam_offset = fk_ctl.insert_offset("dynamics")
-            self._store_util_nodes(dynam_offset)
             jnt.rotate.connect(dynam_offset.rotate)
+            dynam_offsets.append(dynam_offset)
+        self._store_util_nodes(dynam_offsets)
 
     def attach_to_skeleton(self):
         pass
 
-    def remove(self):
+    def _plan_removal(self, plan):
         # Delete attributes
-        for attr in self.settings.keys():
-            pm.deleteAttr(attr)
-        self.meta_parent.controls[0].transform.DYNAMICS.unlock()
-        pm.deleteAttr(self.meta_parent.controls[0].transform.DYNAMICS)
-        super(FKDynamicsComponent, self).remove()
-        self.signals.removed.emit()
+        plan.add_attrs(self.settings.keys())
+        plan.add_attrs([self.meta_parent.controls[0].transform.DYNAMICS], unlock=True)
+        super(FKDynamicsComponent, self)._plan_removal(plan)
@@ -145,19 +145,19 @@ class FootComponent(luna_rig.AnimComponent):
 
         return instance
 
-    def remove(self):
+    def _plan_removal(self, plan):
         # Delete chains
-        pm.delete(self.ctl_chain[0])
-        if self.fk_control.transform.numChildren():
-            self.fk_control.transform.childAtIndex(0).setParent(self.fk_control.transform.getParent())
-        pm.delete(self.fk_control.group)
+        plan.add_nodes([self.ctl_chain[0]])
+        fk_transform = self.fk_control.transform
+        if fk_transform.numChildren():
+            plan.add_reparent(fk_transform.childAtIndex(0), fk_transform.getParent())
+        plan.add_nodes([self.fk_control.group])
 
         # Delete attrs
-        self.meta_parent.ik_control.transform.FOOT.unlock()
-        pm.deleteAttr(self.meta_parent.ik_control.transform.FOOT)
-        for attr_name in self.ROLL_ATTRS:
-            pm.deleteAttr(self.meta_parent.ik_control.transform.attr(attr_name))
-        super(FootComponent, self).remove()
+        ik_transform = self.meta_parent.ik_control.transform
+        plan.add_attrs([ik_transform.FOOT], unlock=True)
+        plan.add_attrs([ik_transform.attr(attr_name) for attr_name in self.ROLL_ATTRS])
+        super(FootComponent, self)._plan_removal(plan)
 
     def bake_fkik(self, source="fk", time_range=None, step=1):
         if source != "ik":
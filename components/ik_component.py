@@ -134,8 +134,7 @@ class IKComponent(luna_rig.AnimComponent):
 
     def attach_to_skeleton(self):
         """Override: attach to skeleton"""
-        for ctl_jnt, bind_jnt in zip(self.ctl_chain[:-1], self.bind_joints[:-1]):
-            pm.parentConstraint(ctl_jnt, bind_jnt, mo=1)
+        self._attach_joints(self.ctl_chain[:-1], self.bind_joints[:-1])
 
 
 class IKSplineComponent(luna_rig.AnimComponent):
@@ -204,8 +203,9 @@ class IKSplineComponent(luna_rig.AnimComponent):
         shape_controls = []
 
         ctl_locator = pm.spaceLocator(n="temp_control_loc")
+        control_points = curveFn.sample_points(ik_curve, num_controls + 1)
         # Root control
-        ctl_locator.translate.set(pm.pointOnCurve(ik_curve, pr=0.0, top=1))
+        ctl_locator.translate.set(control_points[0])
         root_control = luna_rig.Control.create(name=[instance.indexed_name, "root"],
                                                side=instance.side,
                                                guide=ctl_locator,
@@ -215,8 +215,7 @@ class IKSplineComponent(luna_rig.AnimComponent):
 
         # Shape control
         for index in range(0, num_controls + 1):
-            u_value = float(index) / float(num_controls)
-            ctl_locator.translate.set(pm.pointOnCurve(ik_curve, pr=u_value, top=1))
+            ctl_locator.translate.set(control_points[index])
             ctl = luna_rig.Control.create(name=[instance.indexed_name, "shape"],
                                           side=instance.side,
                                           guide=ctl_locator,
@@ -162,9 +162,9 @@ class RibbonComponent(luna_rig.AnimComponent):
         return main_ctl
 
     def attach_to_skeleton(self):
-        super(RibbonComponent, self).attach_to_skeleton()
-        for ctl_jnt, bind_jnt in zip(self.ctl_chain, self.bind_joints):
-            pm.scaleConstraint(ctl_jnt, bind_jnt)
+        """Override: attach to skeleton including scale"""
+        Logger.info("{0}: Attaching to skeleton...".format(self))
+        self._attach_joints(self.ctl_chain, self.bind_joints, scale=True)
 
     def attach_to_component(self, other_comp, hook_index=None):
         super(RibbonComponent, self).attach_to_component(other_comp, hook_index=hook_index)
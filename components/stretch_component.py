@@ -166,7 +166,7 @@ class IKStretchComponent(luna_rig.Component):
 
         return instance
 
-    def remove(self):
-        self.state = False
-        self._delete_settings_attrs()
-        super(IKStretchComponent, self).remove()
+    def _plan_removal(self, plan):
+        plan.add_pre_action("{0}: Disable stretch".format(self), lambda: setattr(self, "state", False))
+        plan.add_attrs(self.settings.keys())
+        super(IKStretchComponent, self)._plan_removal(plan)
@@ -5,6 +5,7 @@ import luna_rig.functions.curveFn as curveFn
 import luna_rig.functions.nameFn as nameFn
 import luna_rig.functions.jointFn as jointFn
 import luna_rig.functions.attrFn as attrFn
+import luna_rig.functions.attachFn as attachFn
 
 
 class TwistComponent(luna_rig.AnimComponent):
@@ -159,9 +160,7 @@ class TwistComponent(luna_rig.AnimComponent):
     def attach_to_skeleton(self):
         Logger.info("{0}: Attaching to skeleton...".format(self))
         if not self.twist_start_object == self.start_joint:
-            constraints = self.meta_parent.bind_joints[0].listConnections(type="parentConstraint")
-            if constraints:
-                pm.delete(constraints)
-            pm.parentConstraint(self.ctl_chain[0], self.meta_parent.bind_joints[0])
+            attachFn.detach(self.meta_parent.bind_joints[0])
+            attachFn.attach(self.ctl_chain[0], self.meta_parent.bind_joints[0], method=self.attach_method, maintain_offset=False)
         # Insert output joints
         self.bind_joints[0].setParent(self.skel_start_joint)
@@ -3,6 +3,7 @@ import luna_rig
 import luna_rig.functions.nameFn as nameFn
 import luna_rig.functions.attrFn as attrFn
 import luna_rig.functions.nodeFn as nodeFn
+import luna_rig.functions.curveFn as curveFn
 from luna import Logger
 
 
@@ -65,8 +66,9 @@ class WireComponent(luna_rig.AnimComponent):
         # Create controls
         shape_controls = []
         ctl_locator = pm.spaceLocator(n="temp_control_loc")
+        control_points = curveFn.sample_points(curve, num_controls + 1)
         # Root control
-        ctl_locator.translate.set(pm.pointOnCurve(curve, pr=0.0, top=1))
+        ctl_locator.translate.set(control_points[0])
         root_control = luna_rig.Control.create(name=[instance.indexed_name, "root"],
                                                side=instance.side,
                                                guide=ctl_locator,
@@ -76,8 +78,7 @@ class WireComponent(luna_rig.AnimComponent):
 
         # Shape control
         for index in range(0, num_controls + 1):
-            u_value = float(index) / float(num_controls)
-            ctl_locator.translate.set(pm.pointOnCurve(curve, pr=u_value, top=1))
+            ctl_locator.translate.set(control_points[index])
             ctl = luna_rig.Control.create(name=[instance.indexed_name, "shape"],
                                           side=instance.side,
                                           guide=ctl_locator,
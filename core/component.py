@@ -1,5 +1,7 @@
+import bisect
 import pymel.core as pm
-from PySide2 import QtCore
+import maya.cmds as mc
+import maya.OpenMaya as om
 
 import luna_rig
 from luna import Logger
@@ -10,21 +12,63 @@ import luna_rig.functions.animFn as animFn
 import luna_rig.functions.attrFn as attrFn
 import luna_rig.functions.nodeFn as nodeFn
 import luna_rig.functions.rigFn as rigFn
+import luna_rig.functions.attachFn as attachFn
+import luna_rig.functions.cacheFn as cacheFn
+from luna_rig.core.removal import RemovalPlan
+from luna_rig.core import signals
 
 
-class _compSignals(QtCore.QObject):
-    removed = QtCore.Signal()
-    attached = QtCore.Signal(object)
+_compSignals = signals.signal_group_class("_compSignals", {"removed": (), "attached": (object,)})
+# Meta node -> signals, shared by all component instances wrapping the node
+_COMPONENT_SIGNALS = signals.NodeSignals(_compSignals)
 
 
 class Component(luna_rig.MetaNode):
 
+    # Meta attributes connection cache counters, shared by all components.
+    connections_cache_stats = {"hits": 0, "misses": 0}
+
     def __new__(cls, node=None):
         return object.__new__(cls)
 
     def __init__(self, node):
         super(Component, self).__init__(node)
-        self.signals = _compSignals()
+        self._connections_cache = {}
+
+    @property
+    def signals(self):
+        """Component signals. Created on first access and shared by all instances wrapping the same meta node.
+
+        :rtype: _compSignals
+        """
+        return _COMPONENT_SIGNALS.get(self.pynode.__apimobject__())
+
+    def _list_connections(self, attr_name, plugs=False):
+        """Cached listConnections of meta node attribute.
+        Cache is valid until any attribute of meta node is connected or disconnected.
+
+        :param attr_name: Meta node attribute name
+        :type attr_name: str
+        :param plugs: List connected plugs instead of nodes, defaults to False
+        :type plugs: bool, optional
+        :return: Connected nodes or plugs
+        :rtype: list
+        """
+        generation = cacheFn.get_node_generation(self.pynode.__apimobject__())
+        cache_key = (attr_name, plugs)
+        cached = self._connections_cache.get(cache_key)
+        if cached is not None and cached[0] == generation:
+            Component.connections_cache_stats["hits"] += 1
+            return list(cached[1])
+        Component.connections_cache_stats["misses"] += 1
+        connections = self.pynode.attr(attr_name).listConnections(plugs=plugs)
+        self._connections_cache[cache_key] = (generation, connections)
+        return list(connections)
+
+    def _invalidate_connections(self):
+        """Clear connections cache of this and other instances wrapping the same meta node."""
+        self._connections_cache.clear()
+        cacheFn.bump_node_generation(self.pynode.__apimobject__())
 
     @property
     def settings(self):
@@ -34,13 +78,13 @@ class Component(luna_rig.MetaNode):
         :rtype: dict
         """
         attr_dict = {}
-        for connected_attr in self.pynode.settings.listConnections(d=1, plugs=1):
+        for connected_attr in self._list_connections("settings", plugs=True):
             attr_dict[str(connected_attr)] = connected_attr.get()
         return attr_dict
 
     @property
     def util_nodes(self):
-        nodes = self.pynode.utilNodes.listConnections(d=1)  # type: list
+        nodes = self._list_connections("utilNodes")  # type: list
         return nodes
 
     @ classmethod
@@ -72,8 +116,43 @@ class Component(luna_rig.MetaNode):
             Logger.exception("{0}: Invalid meta parent type - {1}. Valid types: {2}".format(cls.as_str(name_only=True), parent, valid_types))
             raise TypeError
 
-    def remove(self):
-        pass
+    def remove(self, dry_run=False):
+        """Delete component and its meta children from scene
+
+        :param dry_run: Only log planned operations, defaults to False
+        :type dry_run: bool, optional
+        :return: Removal plan
+        :rtype: RemovalPlan
+        """
+        plan = self.plan_removal()
+        if dry_run:
+            Logger.info("{0}: Removal dry run - {1}".format(self, plan.as_data()))
+            return plan
+        # Signals have to be taken before meta nodes are deleted
+        removed_signals = [_COMPONENT_SIGNALS.pop(comp.pynode.__apimobject__()) for comp in plan.components]
+        plan.execute()
+        for comp_signals in removed_signals:
+            if comp_signals is not None:
+                comp_signals.removed.emit()
+        return plan
+
+    def plan_removal(self):
+        """Collect everything owned by this component and its meta children.
+
+        :return: Removal plan
+        :rtype: RemovalPlan
+        """
+        return RemovalPlan(self)
+
+    def _plan_removal(self, plan):
+        """Override: add owned nodes, attributes and reparent operations to removal plan.
+
+        :param plan: Plan to add to
+        :type plan: RemovalPlan
+        """
+        plan.add_collapse([node for node in self.util_nodes if isinstance(node, luna_rig.nt.DagNode)])
+        plan.add_nodes([node for node in self.util_nodes if not isinstance(node, luna_rig.nt.DagNode)])
+        plan.add_nodes([self.pynode])
 
     def set_outliner_color(self, color):
         raise NotImplementedError
@@ -86,47 +165,58 @@ class Component(luna_rig.MetaNode):
         """
         if not isinstance(other_comp, Component):
             other_comp = luna_rig.MetaNode(other_comp)
-        if other_comp.pynode not in self.pynode.metaParent.listConnections():
+        if self.meta_parent != other_comp:
             self.set_meta_parent(other_comp)
             Logger.info("Meta parent set: {0} ->> {1}".format(self, other_comp))
 
-    def _store_settings(self, attr):
-        """Store given attribute as component setting
-
-        :param attr: Node attribute
-        :type attr: pymel.core.Attribute
+    def _connect_to_multi(self, attr_name, plugs, unique_nodes=True):
+        """Connect plugs to next free indices of meta node multi attribute.
+        Existing connections are read once, already connected plugs are skipped.
+
+        :param attr_name: Meta node multi attribute name
+        :type attr_name: str
+        :param plugs: Source plugs
+        :type plugs: list[pm.Attribute]
+        :param unique_nodes: Skip plugs of already connected nodes instead of already connected plugs, defaults to True
+        :type unique_nodes: bool, optional
+        :return: Number of new connections
+        :rtype: int
+        """
+        dest_attr = "{0}.{1}".format(self.pynode.name(), attr_name)
+        if unique_nodes:
+            existing = set(mc.ls(mc.listConnections(dest_attr, s=True, d=False) or [], long=True))
+        else:
+            existing = set([str(plug) for plug in self.pynode.attr(attr_name).listConnections(s=True, d=False, plugs=True)])
+        indices = mc.getAttr(dest_attr, multiIndices=True) or []
+        next_index = max(indices) + 1 if indices else 0
+        connected = 0
+        for plug in plugs:
+            key = mc.ls(str(plug.node()), long=True)[0] if unique_nodes else str(plug)
+            if key in existing:
+                continue
+            mc.connectAttr(str(plug), "{0}[{1}]".format(dest_attr, next_index))
+            existing.add(key)
+            next_index += 1
+            connected += 1
+        if connected:
+            self._invalidate_connections()
+        return connected
+
+    def _store_settings(self, attrs):
+        """Store given attributes as component settings
+
+        :param attrs: Node attribute or list of attributes
+        :type attrs: pymel.core.Attribute or list[pymel.core.Attribute]
         """
-        # if not attr.isConnectedTo(self.pynode.settings, checkLocalArray=True, checkOtherArray=True):
-        if not isinstance(attr, pm.PyNode):
-            attr = pm.PyNode(attr)
-        if attr not in self.pynode.settings.listConnections(d=1, plugs=1):
-            attr.connect(self.pynode.settings, na=1)
+        if not isinstance(attrs, (list, tuple)):
+            attrs = [attrs]
+        attrs = [attr if isinstance(attr, pm.PyNode) else pm.PyNode(attr) for attr in attrs]
+        self._connect_to_multi("settings", attrs, unique_nodes=False)
 
     def _store_util_nodes(self, nodes):
-        if not isinstance(nodes, list):
+        if not isinstance(nodes, (list, tuple)):
             nodes = [nodes]
-        for each in nodes:
-            if each not in self.util_nodes:
-                each.message.connect(self.pynode.utilNodes, na=1)
-
-    def _delete_settings_attrs(self):
-        for source_attr in self.settings.keys():
-            if pm.objExists(source_attr):
-                pm.deleteAttr(source_attr)
-                Logger.info("{0}: Deleted settings attribute - {1}".format(self, source_attr))
-            else:
-                Logger.error("{0}: Settings attr doesn't exist - {1}".format(self, source_attr))
-
-    def _delete_util_nodes(self):
-        for util_node in self.util_nodes:
-            if isinstance(util_node, luna_rig.nt.DagNode):
-                if util_node.numChildren():
-                    try:
-                        util_node.childAtIndex(0).setParent(util_node.getParent())
-                    except RuntimeError:
-                        Logger.warning("Failed to parent {0} children ({1}) to {2}".format(util_node, util_node.getChildren(), util_node.getParent()))
-            pm.delete(util_node)
-            Logger.debug("{0}: Deleted util node {1}".format(self, util_node))
+        self._connect_to_multi("utilNodes", [pm.PyNode(each).message for each in nodes])
 
     def copy_keyframes(self, time_range, target_component, time_offset=0.0):
         pass
@@ -198,64 +288,73 @@ class AnimComponent(Component):
 
     @ property
     def root(self):
-        node = self.pynode.rootGroup.listConnections()[0]  # type: luna_rig.nt.Transform
+        node = self._list_connections("rootGroup")[0]  # type: luna_rig.nt.Transform
         return node
 
     @ property
     def group_ctls(self):
-        node = self.pynode.ctlsGroup.listConnections()[0]  # type: luna_rig.nt.Transform
+        node = self._list_connections("ctlsGroup")[0]  # type: luna_rig.nt.Transform
         return node
 
     @ property
     def group_joints(self):
-        node = self.pynode.jointsGroup.listConnections()[0]  # type: luna_rig.nt.Transform
+        node = self._list_connections("jointsGroup")[0]  # type: luna_rig.nt.Transform
         return node
 
     @ property
     def group_parts(self):
-        node = self.pynode.partsGroup.listConnections()[0]  # type: luna_rig.nt.Transform
+        node = self._list_connections("partsGroup")[0]  # type: luna_rig.nt.Transform
         return node
 
     @ property
     def group_noscale(self):
-        node = self.pynode.noScaleGroup.listConnections()[0]  # type: luna_rig.nt.Transform
+        node = self._list_connections("noScaleGroup")[0]  # type: luna_rig.nt.Transform
         return node
 
     @ property
     def group_out(self):
-        node = self.pynode.outGroup.listConnections(d=1)[0]  # type: luna_rig.nt.Transform
+        node = self._list_connections("outGroup")[0]  # type: luna_rig.nt.Transform
         return node
 
     @ property
     def controls(self):
-        connected_nodes = self.pynode.controls.listConnections()  # type: list[luna_rig.nt.Transform]
+        connected_nodes = self._list_connections("controls")  # type: list[luna_rig.nt.Transform]
         all_ctls = [luna_rig.Control(node) for node in connected_nodes]
         return all_ctls
 
     @ property
     def bind_joints(self):
-        joint_list = self.pynode.bindJoints.listConnections()  # type: list[luna_rig.nt.Joint]
+        joint_list = self._list_connections("bindJoints")  # type: list[luna_rig.nt.Joint]
         return joint_list
 
     @ property
     def ctl_chain(self):
-        ctl_chain = self.pynode.ctlChain.listConnections()  # type: list[luna_rig.nt.Joint]
+        ctl_chain = self._list_connections("ctlChain")  # type: list[luna_rig.nt.Joint]
         return ctl_chain
 
     @ property
     def character(self):
-        connections = self.pynode.character.listConnections()
+        connections = self._list_connections("character")
         result = luna_rig.MetaNode(connections[0]) if connections else None  # type: luna_rig.components.Character
         return result
 
+    @ property
+    def attach_method(self):
+        """Skeleton attach method set on character, "constr" or "matrix".
+
+        :rtype: str
+        """
+        character = self.character
+        return character.attach_method if character else "constr"
+
     @ property
     def out_hooks(self):
-        hooks = [Hook(node) for node in self.pynode.outHooks.listConnections()]
+        hooks = [Hook(node) for node in self._list_connections("outHooks")]
         return hooks
 
     @ property
     def in_hook(self):
-        connections = self.pynode.inHook.listConnections()
+        connections = self._list_connections("inHook")
         result = Hook(connections[0]) if connections else None  # type: Hook
         return result
 
@@ -268,23 +367,19 @@ class AnimComponent(Component):
         outlinerFn.set_color(self.root, color)
 
     def _store_bind_joints(self, joint_chain):
-        for jnt in joint_chain:
-            if not isinstance(jnt, pm.PyNode):
-                jnt = pm.PyNode(jnt)
-            attrFn.add_meta_attr(jnt)
-            if jnt not in self.pynode.bindJoints.listConnections(d=1):
-                jnt.metaParent.connect(self.pynode.bindJoints, na=1)
+        joint_chain = [jnt if isinstance(jnt, pm.PyNode) else pm.PyNode(jnt) for jnt in joint_chain]
+        attrFn.add_meta_attr(joint_chain)
+        self._connect_to_multi("bindJoints", [jnt.metaParent for jnt in joint_chain])
 
     def _store_ctl_chain(self, joint_chain):
-        for jnt in joint_chain:
-            attrFn.add_meta_attr(jnt)
-            if jnt not in self.pynode.ctlChain.listConnections(d=1):
-                jnt.metaParent.connect(self.pynode.ctlChain, na=1)
+        joint_chain = [jnt if isinstance(jnt, pm.PyNode) else pm.PyNode(jnt) for jnt in joint_chain]
+        attrFn.add_meta_attr(joint_chain)
+        self._connect_to_multi("ctlChain", [jnt.metaParent for jnt in joint_chain])
 
     def _store_controls(self, ctl_list):
-        for ctl in ctl_list:
-            if ctl.transform not in self.pynode.controls.listConnections(d=1):
-                ctl.transform.metaParent.connect(self.pynode.controls, na=1)
+        if isinstance(ctl_list, luna_rig.Control):
+            ctl_list = [ctl_list]
+        self._connect_to_multi("controls", [ctl.transform.metaParent for ctl in ctl_list])
 
     def list_controls(self, tag=None):
         """Get list of component controls. Extra attr for tag sorting.
@@ -292,7 +387,7 @@ class AnimComponent(Component):
         :return: List of all component controls.
         :rtype: list[luna_rig.Control]
         """
-        connected_nodes = self.pynode.controls.listConnections()
+        connected_nodes = self._list_connections("controls")
         all_ctls = [luna_rig.Control(node) for node in connected_nodes]
         if tag:
             taged_list = [ctl for ctl in all_ctls if ctl.tag == tag]
@@ -310,19 +405,34 @@ class AnimComponent(Component):
         for each in ctls:
             pm.setKeyframe(each.transform)
 
+    def _attach_joints(self, ctl_joints, bind_joints, scale=False, method=None):
+        """Attach bind joints to control joints using character attach method.
+
+        :param ctl_joints: Driver joints
+        :type ctl_joints: list[luna_rig.nt.Joint]
+        :param bind_joints: Driven joints
+        :type bind_joints: list[luna_rig.nt.Joint]
+        :param scale: Attach scale as well, defaults to False
+        :type scale: bool, optional
+        :param method: Override attach method, defaults to None
+        :type method: str, optional
+        """
+        if not method:
+            method = self.attach_method
+        for ctl_jnt, bind_jnt in zip(ctl_joints, bind_joints):
+            if attachFn.list_attach_nodes(bind_jnt):
+                Logger.info("Replacing {0} attachment to {1}".format(bind_jnt, ctl_jnt))
+                attachFn.detach(bind_jnt)
+            attachFn.attach(ctl_jnt, bind_jnt, method=method, scale=scale)
+
     def attach_to_skeleton(self):
         """Override: attach to skeleton"""
         Logger.info("{0}: Attaching to skeleton...".format(self))
-        for ctl_jnt, bind_jnt in zip(self.ctl_chain, self.bind_joints):
-            if bind_jnt.listConnections(type="parentConstraint"):
-                Logger.info("Replacing {0} attachment to {1}".format(bind_jnt, ctl_jnt))
-                pm.delete(bind_jnt.listConnections(type="parentConstraint"))
-            pm.parentConstraint(ctl_jnt, bind_jnt, mo=1)
+        self._attach_joints(self.ctl_chain, self.bind_joints)
 
     def detach_from_sekelton(self):
         for skel_jnt in self.bind_joints:
-            pconstr = skel_jnt.listConnections(type="parentConstraint")
-            pm.delete(pconstr)
+            attachFn.detach(skel_jnt)
         Logger.info("{0}: Detached from skeleton.".format(self))
 
     def bake_to_skeleton(self, time_range=None):
@@ -331,6 +441,9 @@ class AnimComponent(Component):
             return
         if not time_range:
             time_range = animFn.get_playback_range()
+        # Matrix attachment doesn't drive joint channels, switch to constraints for baking.
+        for bind_jnt in self.bind_joints:
+            attachFn.to_constraint(bind_jnt)
         pm.bakeResults(self.bind_joints, time=time_range, simulation=True)
         Logger.info("{0}: Baked to skeleton.".format(self))
 
@@ -347,16 +460,10 @@ class AnimComponent(Component):
         for ctl in self.controls:
             ctl.to_bind_pose()
 
-    def remove(self):
-        """Delete component from scene"""
-        self.detach_from_sekelton()
-        for child in self.meta_children:
-            child.remove()
-        pm.delete(self.root)
-        self._delete_util_nodes()
-        pm.delete(self.pynode)
-        Logger.info("Removed {0}".format(self))
-        self.signals.removed.emit()
+    def _plan_removal(self, plan):
+        plan.add_detach(self.bind_joints)
+        plan.add_nodes([self.root])
+        super(AnimComponent, self)._plan_removal(plan)
 
     def add_hook(self, node, name):
         """Set given node as attach point
@@ -384,10 +491,21 @@ class AnimComponent(Component):
         return hook
 
     def copy_keyframes(self, time_range, target_component, time_offset=0.0):
-        for source_ctl in self.controls:
-            for target_ctl in target_component.controls:
-                if target_ctl.transform.stripNamespace() == source_ctl.transform.stripNamespace():
-                    source_ctl.copy_keyframes(time_range, target_ctl, time_offset=time_offset)
+        """Copy controls animation to other component. Controls are matched by name without namespace.
+
+        :param time_range: Keys range
+        :type time_range: tuple
+        :param target_component: Component to copy animation to
+        :type target_component: AnimComponent
+        :param time_offset: Keys time offset, defaults to 0.0
+        :type time_offset: float, optional
+        :return: Transfer report with unmatched controls
+        :rtype: dict
+        """
+        return animFn.transfer_keyframes([ctl.transform for ctl in self.controls],
+                                         [ctl.transform for ctl in target_component.controls],
+                                         time_range=time_range,
+                                         time_offset=time_offset)
 
     def attach_to_component(self, other_comp, hook_index=None):
         """Attach to other AnimComponent
@@ -411,7 +529,7 @@ class AnimComponent(Component):
             except Exception:
                 Logger.error("Failed to connect {0} to {1} at point {2}".format(self, other_comp, hook))
                 raise
-        self.signals.attached.emit(other_comp)
+        _COMPONENT_SIGNALS.emit(self.pynode.__apimobject__(), "attached", other_comp)
 
     def connect_to_character(self, character_component=None, character_name=None, parent=False):
         """Connect component to character
@@ -434,7 +552,7 @@ class AnimComponent(Component):
             raise RuntimeError("{0} is not a valid Character".format(character_component))
 
         # Connect
-        if self.pynode not in character_component.pynode.metaChildren.listConnections(d=1):
+        if self.character != character_component:
             self.pynode.character.connect(character_component.pynode.metaChildren, na=1)
         if parent:
             self.root.setParent(character_component.control_rig)
@@ -456,11 +574,18 @@ class Hook(object):
 
     def __eq__(self, other):
         if not isinstance(other, Hook):
-            raise TypeError("Can't compare Hook and {0}".format(type(other)))
-        return self.transform == other.transform
+            return False
+        return self._handle.objectRef() == other._handle.objectRef()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return self._handle.hashCode()
 
     def __init__(self, node):
         self.transform = node  # type: luna_rig.nt.Transform
+        self._handle = om.MObjectHandle(node.__apimobject__())
 
     def add_output(self, anim_component):
         self.transform.children.connect(anim_component.pynode.inHook)
@@ -476,8 +601,7 @@ class Hook(object):
         if not isinstance(object_node, pm.PyNode):
             object_node = pm.PyNode(object_node)
 
-        pm.pointConstraint(object_node, hook_transform)
-        pm.orientConstraint(object_node, hook_transform)
+        attachFn.attach(object_node, hook_transform, method=anim_component.attach_method, maintain_offset=False)
 
         # Attributes
         attrFn.add_meta_attr(hook_transform)
@@ -505,4 +629,12 @@ class Hook(object):
 
     @property
     def index(self):
-        return self.component.out_hooks.index(self)
+        """Position in component's out hooks, found from connected plug without listing other hooks.
+
+        :rtype: int
+        """
+        out_plug = mc.listConnections("{0}.metaParent".format(self.transform), s=False, d=True, plugs=True)[0]
+        multi_attr, logical_index = out_plug[:-1].rsplit("[", 1)
+        connected_plugs = mc.listConnections(multi_attr, s=True, d=False, connections=True, plugs=True)[::2]
+        connected_indices = sorted([int(plug[:-1].rsplit("[", 1)[-1]) for plug in connected_plugs])
+        return bisect.bisect_left(connected_indices, int(logical_index))
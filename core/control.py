@@ -1,6 +1,7 @@
 
 import json
 import pymel.core as pm
+import maya.OpenMaya as om
 from luna import Logger
 from luna import Config
 from luna import RigVars
@@ -13,34 +14,90 @@ import luna_rig.functions.nodeFn as nodeFn
 import luna_rig.functions.transformFn as transformFn
 import luna_rig.functions.outlinerFn as outlinerFn
 import luna_rig.functions.animFn as animFn
+import luna_rig.functions.cacheFn as cacheFn
 from luna_rig.core.shape_manager import ShapeManager
 
 
+# Transform node hash code -> Control instance
+_CONTROLS = cacheFn.SceneCache("controls", events=[cacheFn.SceneEvent.NODE_REMOVED, cacheFn.SceneEvent.NAME_CHANGED])
+
+
 class Control(object):
+    """Control wrapper. Instances are shared: Control(node) returns existing instance for the same transform
+    until any node is deleted or renamed.
+    """
+
+    __slots__ = ["transform", "_handle", "_tag_node", "_members"]
 
     def __repr__(self):
         return "Control({0})".format(self.transform)
 
+    def __eq__(self, other):
+        if not isinstance(other, Control):
+            return False
+        return self._handle.objectRef() == other._handle.objectRef()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return self._handle.hashCode()
+
+    def __new__(cls, node):
+        transform = cls.__get_transform(node)
+        mobject = transform.__apimobject__()
+        key = om.MObjectHandle(mobject).hashCode()
+        instance = _CONTROLS.get(key)
+        if instance is not None and instance._handle.isAlive() and instance.transform == transform:
+            return instance
+
+        if not cls.is_control(transform):
+            Logger.error("Invalid control transform - {0}".format(transform))
+            raise TypeError
+        instance = object.__new__(cls)
+        instance.transform = transform  # type: luna_rig.nt.Transform
+        instance._handle = om.MObjectHandle(mobject)
+        instance._tag_node = None
+        # Member name -> (tag node generation, nodes)
+        instance._members = {}
+        return _CONTROLS.set(key, instance)
+
     def __init__(self, node):
+        # Initialized in __new__
+        pass
+
+    @staticmethod
+    def __get_transform(node):
         # Type casting
         if isinstance(node, Control):
-            node = node.transform
+            return node.transform
         if not isinstance(node, pm.PyNode):
             node = pm.PyNode(node)
-
         # Find transform
         if isinstance(node, luna_rig.nt.Controller):
-            self.transform = node.controllerObject.listConnections()[0]  # type: luna_rig.nt.Transform
+            return node.controllerObject.listConnections()[0]  # type: luna_rig.nt.Transform
         elif isinstance(node, luna_rig.nt.Transform):
-            self.transform = pm.PyNode(node)  # type: luna_rig.nt.Transform
+            return node
         elif isinstance(node, luna_rig.nt.Shape):
-            self.transform = node.getTransform()  # type: luna_rig.nt.Transform
-        else:
-            raise TypeError("Control requires node with transform to initialize.")
+            return node.getTransform()  # type: luna_rig.nt.Transform
+        raise TypeError("Control requires node with transform to initialize.")
 
-        if not self.is_control(self.transform):
-            Logger.error("Invalid control transform - {0}".format(self))
-            raise TypeError
+    def __get_members(self, attr_name):
+        """Cached connections of tag node attribute. Valid until tag node connections change.
+
+        :param attr_name: Tag node attribute
+        :type attr_name: str
+        :return: Connected nodes
+        :rtype: list
+        """
+        tag_node = self.tag_node
+        generation = cacheFn.get_node_generation(tag_node.__apimobject__())
+        cached = self._members.get(attr_name)
+        if cached is not None and cached[0] == generation:
+            return list(cached[1])
+        nodes = tag_node.attr(attr_name).listConnections()
+        self._members[attr_name] = (generation, nodes)
+        return list(nodes)
 
     @classmethod
     def create(cls,
@@ -224,8 +281,9 @@ class Control(object):
         :return: Control tag node as instance.
         :rtype: luna_rig.nt.Controller
         """
-        node = self.transform.listConnections(t="controller")[0]  # type: luna_rig.nt.Controller
-        return node
+        if self._tag_node is None or not self._tag_node.exists():
+            self._tag_node = self.transform.listConnections(t="controller")[0]  # type: luna_rig.nt.Controller
+        return self._tag_node
 
     @property
     def group(self):
@@ -234,7 +292,7 @@ class Control(object):
         :return: Group
         :rtype: luna_rig.nt.Transform
         """
-        node = self.tag_node.group.listConnections()[0]  # type: luna_rig.nt.Transform
+        node = self.__get_members("group")[0]  # type: luna_rig.nt.Transform
         return node
 
     @property
@@ -245,7 +303,7 @@ class Control(object):
         :rtype: luna_rig.nt.Joint
         """
         result = None  # type: luna_rig.nt.Joint
-        child_joints = self.tag_node.joint.listConnections()
+        child_joints = self.__get_members("joint")
         if child_joints:
             result = child_joints[0]  # type: luna_rig.nt.Joint
         return result
@@ -272,7 +330,7 @@ class Control(object):
         :return: List of transform nodes
         :rtype: list, luna_rig.nt.Transform
         """
-        offsets = self.tag_node.offset.listConnections()  # type: list
+        offsets = self.__get_members("offset")  # type: list
         return offsets
 
     @property
@@ -573,11 +631,10 @@ class Control(object):
             self.__add_constr_space(target, name)
         # Store as component setting
         if self.connected_component:
-            self.connected_component._store_settings(self.transform.space)
+            settings = [self.transform.space]
             if method == "matrix":
-                self.connected_component._store_settings(self.transform.spaceUseTranslate)
-                self.connected_component._store_settings(self.transform.spaceUseRotate)
-                self.connected_component._store_settings(self.transform.spaceUseScale)
+                settings += [self.transform.spaceUseTranslate, self.transform.spaceUseRotate, self.transform.spaceUseScale]
+            self.connected_component._store_settings(settings)
         Logger.info("{0}: added space {1}".format(self, target))
 
     def __add_matrix_space(self, target, name):
@@ -775,11 +832,11 @@ class Control(object):
         # Store old values
         old_translate = destination_transform.translate.get()
         old_rotate = destination_transform.rotate.get()
-        # Apply matrix
+        # Apply matrix, same engine as character wide mirror
+        source_matrices = transformFn.get_matrices([source_transform], space="object")
         if behavior:
-            destination_transform.setMatrix(source_transform.getMatrix(os=1).inverse(), os=1)
-        else:
-            destination_transform.setMatrix(source_transform.getMatrix(os=1), os=1)
+            source_matrices = transformFn.invert_matrices(source_matrices)
+        transformFn.set_matrices([destination_transform], source_matrices, space="object")
         # Apply skipped values
         if any(skip_translate):
             for is_skipped, attr_name, old_value in zip(skip_translate, ["tx", "ty", "tz"], old_translate):
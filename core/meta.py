@@ -1,10 +1,15 @@
 """Based on 2015 GDC talk by David Hunt & Forrest Sderlind https://www.youtube.com/watch?v=U_4u0kbf-JE"""
 
+import importlib
 import pymel.core as pm
+import maya.OpenMaya as om
 import luna_rig
 from luna import Logger
 from luna_rig.functions import nameFn
 
+# metaType string -> class
+_META_CLASSES = {}
+
 
 class MetaNode(object):
 
@@ -26,7 +31,15 @@ class MetaNode(object):
         return "{0} ({1})".format(self.as_str(name_only=True), self.pynode.name())
 
     def __eq__(self, other):
-        return self.pynode == other.pynode
+        if not isinstance(other, MetaNode):
+            return False
+        return self._handle.objectRef() == other._handle.objectRef()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return self._handle.hashCode()
 
     def __new__(cls, node=None):
         """Initialize class stored in metaType attribute and return a intance of it.
@@ -36,13 +49,12 @@ class MetaNode(object):
         :return: Evaluated meta class
         :rtype: Meta rig node class instance
         """
-        import luna_rig  # noqa: F401
         result = None
         if node:
             node = pm.PyNode(node)
             class_string = node.metaType.get()
             try:
-                eval_class = eval(class_string, globals(), locals())
+                eval_class = MetaNode.get_class(class_string)
                 result = eval_class.__new__(eval_class, node)
             except Exception:
                 Logger.exception("{0}: Failed to evaluate class string: {1}".format(cls, class_string))
@@ -52,6 +64,22 @@ class MetaNode(object):
 
         return result
 
+    @staticmethod
+    def get_class(class_string):
+        """Import meta class from metaType string.
+
+        :param class_string: Class path e.g luna_rig.components.fk_component.FKComponent
+        :type class_string: str
+        :return: Meta class
+        :rtype: type
+        """
+        meta_class = _META_CLASSES.get(class_string)
+        if meta_class is None:
+            module_path, class_name = class_string.rsplit(".", 1)
+            meta_class = getattr(importlib.import_module(module_path), class_name)
+            _META_CLASSES[class_string] = meta_class
+        return meta_class
+
     def __init__(self, node):
         """Stores created network node as instance field
 
@@ -63,6 +91,8 @@ class MetaNode(object):
         if not self.is_metanode(node):
             raise TypeError("{0} is not a valid meta rig node".format(str(node)))
         self.pynode = node  # type: luna_rig.nt.Network
+        # Identity for hashing and comparison, survives renames
+        self._handle = om.MObjectHandle(node.__apimobject__())
 
     @property
     def namespace_list(self):
@@ -1,6 +1,5 @@
 import pymel.core as pm
 import timeit
-from PySide2 import QtCore
 
 from luna import Logger
 from luna import Config
@@ -9,16 +8,25 @@ from luna.utils import maya_utils
 from luna.workspace import project
 from luna.workspace import asset
 import luna_rig
+from luna_rig.core import signals
 from luna_rig.functions import asset_files
 
 
-class _buildSignals(QtCore.QObject):
-    started = QtCore.Signal()
-    done = QtCore.Signal()
+_buildSignals = signals.signal_group_class("_buildSignals", {"started": (), "done": ()})
 
 
 class PyBuild(object):
-    def __init__(self, asset_type, asset_name, existing_character=None):
+    def __init__(self, asset_type, asset_name, existing_character=None, model_mode="cache"):
+        """
+        :param asset_type: Asset type
+        :type asset_type: str
+        :param asset_name: Asset name
+        :type asset_name: str
+        :param existing_character: Character meta node to build on, defaults to None
+        :type existing_character: str, optional
+        :param model_mode: Model import mode, one of asset_files.MODEL_MODES, defaults to "cache"
+        :type model_mode: str, optional
+        """
         self.signals = _buildSignals()
 
         # Get project instance
@@ -36,7 +44,7 @@ class PyBuild(object):
 
         self.asset = asset.Asset(self.project, asset_name, asset_type)
         # Import model and componets files
-        asset_files.import_model()
+        asset_files.import_model(mode=model_mode)
         asset_files.import_skeleton()
         # Setup character
         if existing_character:
@@ -0,0 +1,201 @@
+import maya.cmds as mc
+from luna import Logger
+import luna_rig.functions.attachFn as attachFn
+
+IDENTITY_MATRIX = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+
+
+class RemovalPlan(object):
+    """Teardown plan of component and all its meta children.
+
+    Everything owned by the subtree is collected in one traversal of meta graph.
+    Each component adds its own items in Component._plan_removal.
+    Plan is executed as single undo chunk: pre actions, detach, attributes deletion, reparenting and one delete call.
+    """
+
+    def __repr__(self):
+        return "RemovalPlan({0}, {1} components, {2} nodes)".format(self.component, len(self.components), len(self.nodes))
+
+    def __init__(self, component):
+        self.component = component
+        self.components = []
+        self.nodes = []
+        self.collapse = []
+        self.attrs = []
+        self.reparent = []
+        self.detach = []
+        self.pre_actions = []
+        self._collect()
+
+    def _collect(self):
+        visited = set()
+        queue = [self.component]
+        while queue:
+            comp = queue.pop(0)
+            if comp in visited:
+                continue
+            visited.add(comp)
+            self.components.append(comp)
+            comp._plan_removal(self)
+            queue.extend(comp.meta_children)
+
+    def add_nodes(self, nodes):
+        """Nodes to delete. DAG nodes are deleted with all descendants.
+
+        :param nodes: Nodes
+        :type nodes: list[str or PyNode]
+        """
+        self.nodes.extend([str(node) for node in nodes if node is not None])
+
+    def add_collapse(self, nodes):
+        """Nodes to delete while keeping their children, children are moved to the closest kept parent.
+
+        :param nodes: DAG nodes
+        :type nodes: list[str or PyNode]
+        """
+        self.collapse.extend([str(node) for node in nodes if node is not None])
+
+    def add_attrs(self, attrs, unlock=False):
+        """Attributes to delete.
+
+        :param attrs: Attributes
+        :type attrs: list[str or pm.Attribute]
+        :param unlock: Unlock attributes before deleting, defaults to False
+        :type unlock: bool, optional
+        """
+        self.attrs.extend([(str(attr), unlock) for attr in attrs])
+
+    def add_reparent(self, child, parent=None):
+        """Reparent node before deletion.
+
+        :param child: Node to reparent
+        :type child: str or PyNode
+        :param parent: New parent, defaults to None (world)
+        :type parent: str or PyNode, optional
+        """
+        self.reparent.append((str(child), str(parent) if parent is not None else None))
+
+    def add_detach(self, driven_nodes):
+        """Transforms to detach keeping current pose.
+
+        :param driven_nodes: Driven transforms
+        :type driven_nodes: list[str or PyNode]
+        """
+        for driven in driven_nodes:
+            attach_nodes = attachFn.list_attach_nodes(driven)
+            if attach_nodes:
+                is_matrix = any([node.nodeType() in ["multMatrix", "pickMatrix"] for node in attach_nodes])
+                self.detach.append((str(driven), [str(node) for node in attach_nodes], is_matrix))
+
+    def add_pre_action(self, description, action):
+        """Callable executed before any deletion.
+
+        :param description: Action description for dry run listing
+        :type description: str
+        :param action: Callable without arguments
+        :type action: callable
+        """
+        self.pre_actions.append((description, action))
+
+    def _get_doomed(self):
+        """Long names of all nodes removed by plan, including descendants of deleted DAG nodes."""
+        doomed = mc.ls(self.nodes + self.collapse, long=True) or []
+        dag_nodes = mc.ls(self.nodes, dag=True, long=True) or []
+        if dag_nodes:
+            doomed += mc.listRelatives(dag_nodes, ad=True, f=True) or []
+        return set(doomed)
+
+    @staticmethod
+    def _is_doomed(attr, doomed):
+        node_name = attr.split(".")[0]
+        return (mc.ls(node_name, long=True) or [node_name])[0] in doomed
+
+    def _list_collapse_reparents(self, doomed):
+        collapse = set(mc.ls(self.collapse, long=True) or [])
+        reparents = []
+        for node in collapse:
+            parent = (mc.listRelatives(node, p=True, f=True) or [None])[0]
+            while parent in collapse:
+                parent = (mc.listRelatives(parent, p=True, f=True) or [None])[0]
+            for child in mc.listRelatives(node, c=True, f=True, type="transform") or []:
+                if child not in collapse and child not in doomed:
+                    reparents.append((child, parent))
+        return reparents
+
+    def as_data(self):
+        """Dry run listing of planned operations.
+
+        :rtype: dict
+        """
+        doomed = self._get_doomed()
+        return {"components": [str(comp) for comp in self.components],
+                "pre_actions": [description for description, _ in self.pre_actions],
+                "detach": [driven for driven, _, _ in self.detach],
+                "attrs": [attr for attr, _ in self.attrs if not self._is_doomed(attr, doomed)],
+                "reparent": self.reparent + self._list_collapse_reparents(doomed),
+                "nodes": sorted(doomed)}
+
+    def execute(self):
+        """Run planned operations. Whole removal is undone with single undo."""
+        mc.undoInfo(openChunk=True, chunkName="Remove {0}".format(self.component))
+        try:
+            for description, action in self.pre_actions:
+                Logger.debug("{0}: {1}".format(self, description))
+                action()
+            self._execute_detach()
+            doomed = self._get_doomed()
+            self._execute_attrs(doomed)
+            self._execute_reparent(self.reparent + self._list_collapse_reparents(doomed))
+            to_delete = mc.ls(self.nodes + self.collapse, long=True)
+            if to_delete:
+                mc.delete(to_delete)
+        finally:
+            mc.undoInfo(closeChunk=True)
+        Logger.info("Removed {0} components, {1} nodes.".format(len(self.components), len(doomed)))
+
+    def _execute_detach(self):
+        # Matrix attachment doesn't drive channels, so world matrices are restored after disconnecting.
+        world_matrices = {}
+        for driven, _, is_matrix in self.detach:
+            if is_matrix:
+                world_matrices[driven] = mc.xform(driven, q=True, m=True, ws=True)
+        for driven in world_matrices.keys():
+            opm_plug = "{0}.offsetParentMatrix".format(driven)
+            source = mc.listConnections(opm_plug, s=True, d=False, plugs=True)
+            if source:
+                mc.disconnectAttr(source[0], opm_plug)
+            mc.setAttr(opm_plug, *IDENTITY_MATRIX, type="matrix")
+        for driven, world_matrix in world_matrices.items():
+            attachFn.restore_rest_channels(driven, world_matrix)
+        attach_nodes = mc.ls([node for _, nodes, _ in self.detach for node in nodes])
+        if attach_nodes:
+            mc.delete(attach_nodes)
+
+    def _execute_attrs(self, doomed):
+        for attr, unlock in self.attrs:
+            if not mc.objExists(attr):
+                Logger.warning("{0}: Attribute doesn't exist - {1}".format(self, attr))
+                continue
+            if self._is_doomed(attr, doomed):
+                continue
+            if unlock:
+                mc.setAttr(attr, lock=False)
+            mc.deleteAttr(attr)
+
+    def _execute_reparent(self, reparents):
+        by_parent = {}
+        for child, parent in reparents:
+            if not mc.objExists(child):
+                continue
+            current_parent = (mc.listRelatives(child, p=True, f=True) or [None])[0]
+            if current_parent == ((mc.ls(parent, long=True) or [None])[0] if parent else None):
+                continue
+            by_parent.setdefault(parent, []).append(child)
+        for parent, children in by_parent.items():
+            try:
+                if parent:
+                    mc.parent(children, parent)
+                else:
+                    mc.parent(children, world=True)
+            except RuntimeError:
+                Logger.warning("Failed to parent {0} to {1}".format(children, parent))
@@ -0,0 +1,146 @@
+"""Signals of rig objects. Qt signals are used when PySide2 is available, pure python signals otherwise (mayapy, batch)."""
+
+import maya.OpenMaya as om
+try:
+    from PySide2 import QtCore
+except ImportError:
+    QtCore = None
+
+
+class Signal(object):
+    """Pure python signal with Qt compatible connect/disconnect/emit interface."""
+
+    def __repr__(self):
+        return "Signal({0} slots)".format(len(self._slots))
+
+    def __init__(self):
+        self._slots = []
+
+    def connect(self, slot):
+        if slot not in self._slots:
+            self._slots.append(slot)
+
+    def disconnect(self, slot=None):
+        """Disconnect slot, all slots if None is given.
+
+        :param slot: Connected callable, defaults to None
+        :type slot: callable, optional
+        :raises RuntimeError: If slot is not connected
+        """
+        if slot is None:
+            del self._slots[:]
+            return
+        if slot not in self._slots:
+            raise RuntimeError("Failed to disconnect signal: {0} is not connected.".format(slot))
+        self._slots.remove(slot)
+
+    def emit(self, *args):
+        for slot in list(self._slots):
+            slot(*args)
+
+
+class _PySignalGroup(object):
+    SIGNALS = []
+
+    def __init__(self):
+        for signal_name in self.SIGNALS:
+            setattr(self, signal_name, Signal())
+
+
+def signal_group_class(class_name, signatures, use_qt=None):
+    """Create class holding named signals.
+
+    :param class_name: Class name
+    :type class_name: str
+    :param signatures: Dictionary of {signal name: tuple of argument types}
+    :type signatures: dict
+    :param use_qt: Use QObject with Qt signals, defaults to None (if PySide2 is available)
+    :type use_qt: bool, optional
+    :return: Signal group class
+    :rtype: type
+    """
+    if use_qt is None:
+        use_qt = QtCore is not None
+    if use_qt:
+        class_dict = dict([(signal_name, QtCore.Signal(*arg_types)) for signal_name, arg_types in signatures.items()])
+        return type(class_name, (QtCore.QObject,), class_dict)
+    return type(class_name, (_PySignalGroup,), {"SIGNALS": sorted(signatures.keys())})
+
+
+class NodeSignals(object):
+    """Signal groups shared by all wrappers of the same node.
+    Group is created on first access, emitting to node without group does nothing.
+    """
+
+    def __repr__(self):
+        return "NodeSignals({0}, {1} nodes)".format(self.group_class.__name__, len(self._groups))
+
+    def __init__(self, group_class):
+        """
+        :param group_class: Class created with signal_group_class
+        :type group_class: type
+        """
+        self.group_class = group_class
+        # Node hash code -> (MObjectHandle, group)
+        self._groups = {}
+
+    def __len__(self):
+        return len(self._groups)
+
+    def find(self, mobject):
+        """Get existing signal group of node.
+
+        :param mobject: Node
+        :type mobject: om.MObject
+        :return: Signal group or None
+        """
+        entry = self._groups.get(om.MObjectHandle(mobject).hashCode())
+        if entry is None:
+            return None
+        handle, group = entry
+        if not handle.isAlive() or not handle.objectRef() == mobject:
+            return None
+        return group
+
+    def get(self, mobject):
+        """Get signal group of node, create if node has none.
+
+        :param mobject: Node
+        :type mobject: om.MObject
+        :return: Signal group
+        """
+        group = self.find(mobject)
+        if group is None:
+            # Drop groups of deleted nodes and nodes from previous scenes
+            for key in [key for key, entry in self._groups.items() if not entry[0].isAlive()]:
+                del self._groups[key]
+            handle = om.MObjectHandle(mobject)
+            group = self.group_class()
+            self._groups[handle.hashCode()] = (handle, group)
+        return group
+
+    def pop(self, mobject):
+        """Remove signal group of node, used before node is deleted.
+
+        :param mobject: Node
+        :type mobject: om.MObject
+        :return: Removed group or None
+        """
+        group = self.find(mobject)
+        self._groups.pop(om.MObjectHandle(mobject).hashCode(), None)
+        return group
+
+    def emit(self, mobject, signal_name, *args):
+        """Emit signal only if node's group was created.
+
+        :param mobject: Node
+        :type mobject: om.MObject
+        :param signal_name: Signal name
+        :type signal_name: str
+        """
+        group = self.find(mobject)
+        if group is not None:
+            getattr(group, signal_name).emit(*args)
+
+    def clear(self):
+        self._groups.clear()
@@ -1,6 +1,255 @@
 import pymel.core as pm
+import maya.cmds as mc
+import maya.api.OpenMaya as om2
+import maya.api.OpenMayaAnim as oma2
+from luna import Logger
+
+
+TIME_CURVE_TYPES = ["animCurveTL", "animCurveTA", "animCurveTU", "animCurveTT"]
 
 
 def get_playback_range():
     time_range = (int(pm.playbackOptions(min=1, q=1)), int(pm.playbackOptions(max=1, q=1)))
     return time_range
+
+
+def get_anim_curve_fn(anim_curve):
+    """Get MFnAnimCurve for anim curve node name.
+
+    :param anim_curve: Anim curve node
+    :type anim_curve: str
+    :rtype: oma2.MFnAnimCurve
+    """
+    sel_list = om2.MSelectionList()
+    sel_list.add(str(anim_curve))
+    return oma2.MFnAnimCurve(sel_list.getDependNode(0))
+
+
+def get_curve_data(anim_curve, time_range=None):
+    """Read keys of anim curve with API. Values are in internal units (radians for angular curves).
+
+    :param anim_curve: Anim curve node
+    :type anim_curve: str or PyNode
+    :param time_range: Read only keys in (start, end) range, defaults to None
+    :type time_range: tuple, optional
+    :return: Dictionary with per key lists and curve settings.
+    :rtype: dict
+    """
+    fn_curve = anim_curve if isinstance(anim_curve, oma2.MFnAnimCurve) else get_anim_curve_fn(anim_curve)
+    ui_unit = om2.MTime.uiUnit()
+    data = {"times": [],
+            "values": [],
+            "in_types": [],
+            "out_types": [],
+            "in_angles": [],
+            "in_weights": [],
+            "out_angles": [],
+            "out_weights": [],
+            "weighted": fn_curve.isWeighted,
+            "pre_infinity": fn_curve.preInfinityType,
+            "post_infinity": fn_curve.postInfinityType}
+    for index in range(fn_curve.numKeys):
+        time = fn_curve.input(index).asUnits(ui_unit)
+        if time_range and not time_range[0] <= time <= time_range[1]:
+            continue
+        in_angle, in_weight = fn_curve.getTangentAngleWeight(index, True)
+        out_angle, out_weight = fn_curve.getTangentAngleWeight(index, False)
+        data["times"].append(time)
+        data["values"].append(fn_curve.value(index))
+        data["in_types"].append(fn_curve.inTangentType(index))
+        data["out_types"].append(fn_curve.outTangentType(index))
+        data["in_angles"].append(in_angle.value)
+        data["in_weights"].append(in_weight)
+        data["out_angles"].append(out_angle.value)
+        data["out_weights"].append(out_weight)
+    return data
+
+
+def set_curve_data(anim_curve, data, time_offset=0.0, replace_range=None, change=None):
+    """Write keys to anim curve with API. Existing keys in replace range are removed.
+    Note: API edits are not added to undo queue, pass change to be able to revert them with change.undoIt().
+
+    :param anim_curve: Anim curve node or MFnAnimCurve
+    :type anim_curve: str or PyNode or oma2.MFnAnimCurve
+    :param data: Curve data from get_curve_data
+    :type data: dict
+    :param time_offset: Offset added to key times, defaults to 0.0
+    :type time_offset: float, optional
+    :param replace_range: Range to clear before writing keys, defaults to None (range of new keys)
+    :type replace_range: tuple, optional
+    :param change: Cache of curve edits, defaults to None
+    :type change: oma2.MAnimCurveChange, optional
+    """
+    if not data["times"]:
+        return
+    if change is None:
+        change = oma2.MAnimCurveChange()
+    fn_curve = anim_curve if isinstance(anim_curve, oma2.MFnAnimCurve) else get_anim_curve_fn(anim_curve)
+    ui_unit = om2.MTime.uiUnit()
+    times = [time + time_offset for time in data["times"]]
+    if not replace_range:
+        replace_range = (times[0], times[-1])
+    # Clear range
+    for index in reversed(range(fn_curve.numKeys)):
+        if replace_range[0] <= fn_curve.input(index).asUnits(ui_unit) <= replace_range[1]:
+            fn_curve.remove(index, change)
+
+    fn_curve.setIsWeighted(data["weighted"], change)
+    fn_curve.addKeys([om2.MTime(time, ui_unit) for time in times],
+                     data["values"],
+                     oma2.MFnAnimCurve.kTangentAuto,
+                     oma2.MFnAnimCurve.kTangentAuto,
+                     True,
+                     change)
+    for key_index, time in enumerate(times):
+        index = fn_curve.find(om2.MTime(time, ui_unit))
+        if index is None:
+            continue
+        fn_curve.setInTangentType(index, data["in_types"][key_index], change)
+        fn_curve.setOutTangentType(index, data["out_types"][key_index], change)
+        fn_curve.setTangent(index, om2.MAngle(data["in_angles"][key_index]), data["in_weights"][key_index], True, change)
+        fn_curve.setTangent(index, om2.MAngle(data["out_angles"][key_index]), data["out_weights"][key_index], False, change)
+    fn_curve.setPreInfinityType(data["pre_infinity"], change)
+    fn_curve.setPostInfinityType(data["post_infinity"], change)
+
+
+def copy_curve(anim_curve, target_plug, time_range=None, time_offset=0.0):
+    """Undoable copy of anim curve keys to plug with few cmds calls per curve.
+    Curve is duplicated and connected when target keys are replaced entirely,
+    otherwise keys are merged into target curve with copyKey/pasteKey.
+
+    :param anim_curve: Source anim curve
+    :type anim_curve: str
+    :param target_plug: Plug to copy keys to
+    :type target_plug: str
+    :param time_range: Copy keys in (start, end) range, defaults to None (all keys)
+    :type time_range: tuple, optional
+    :param time_offset: Offset added to copied keys, defaults to 0.0
+    :type time_offset: float, optional
+    :return: True if any keys were copied
+    :rtype: bool
+    """
+    anim_curve = str(anim_curve)
+    range_flags = {"time": tuple(time_range)} if time_range else {}
+    if not mc.keyframe(anim_curve, q=True, keyframeCount=True, **range_flags):
+        return False
+    replace_range = (time_range[0] + time_offset, time_range[1] + time_offset) if time_range else None
+    existing = mc.listConnections(target_plug, s=True, d=False, type="animCurve") or []
+    replace_all = not existing or not replace_range
+    if not replace_all:
+        target_times = mc.keyframe(existing[0], q=True, timeChange=True) or []
+        replace_all = all([replace_range[0] <= time <= replace_range[1] for time in target_times])
+
+    if not replace_all:
+        mc.copyKey(anim_curve, **range_flags)
+        mc.pasteKey(target_plug, option="replace", time=replace_range, timeOffset=time_offset)
+        return True
+
+    new_curve = mc.duplicate(anim_curve, n=target_plug.split("|")[-1].replace(".", "_"))[0]
+    if time_range:
+        outside = [(time, time) for time in mc.keyframe(new_curve, q=True, timeChange=True) if not time_range[0] <= time <= time_range[1]]
+        if outside:
+            mc.cutKey(new_curve, clear=True, time=outside)
+    if time_offset:
+        mc.keyframe(new_curve, edit=True, relative=True, timeChange=time_offset)
+    mc.connectAttr(new_curve + ".output", target_plug, force=True)
+    if existing:
+        mc.delete(existing)
+    return True
+
+
+def list_anim_curves(node):
+    """List time based anim curves directly connected to node attributes.
+
+    :param node: Animated node
+    :type node: str or PyNode
+    :return: Dictionary of {attribute name: anim curve}
+    :rtype: dict
+    """
+    connections = mc.listConnections(str(node), s=True, d=False, type="animCurve", connections=True, plugs=True) or []
+    curves = {}
+    for node_plug, curve_plug in zip(connections[::2], connections[1::2]):
+        anim_curve = curve_plug.split(".")[0]
+        # Skip driven keys
+        if mc.nodeType(anim_curve) in TIME_CURVE_TYPES:
+            curves[node_plug.split(".", 1)[-1]] = anim_curve
+    return curves
+
+
+def get_anim_curve_for_plug(plug):
+    """Get MFnAnimCurve connected to plug, create new curve if plug is not animated.
+
+    :param plug: Plug name
+    :type plug: str
+    :rtype: oma2.MFnAnimCurve
+    """
+    curves = mc.listConnections(plug, s=True, d=False, type="animCurve") or []
+    if curves:
+        return get_anim_curve_fn(curves[0])
+    sel_list = om2.MSelectionList()
+    sel_list.add(plug)
+    fn_curve = oma2.MFnAnimCurve()
+    fn_curve.create(sel_list.getPlug(0))
+    return fn_curve
+
+
+def strip_namespace(node_name):
+    return str(node_name).split("|")[-1].split(":")[-1]
+
+
+def transfer_keyframes(source_nodes, target_nodes, time_range=None, time_offset=0.0, undoable=True):
+    """Copy animation between nodes matched by namespace-stripped names.
+    Curves are copied directly between anim curve nodes, clipboard is not used.
+    Undoable transfer copies each curve with copy_curve in single undo chunk,
+    otherwise keys are written with API and edits can be reverted with report["change"].undoIt().
+
+    :param source_nodes: Animated nodes
+    :type source_nodes: list[str or PyNode]
+    :param target_nodes: Nodes to copy animation to
+    :type target_nodes: list[str or PyNode]
+    :param time_range: Copy keys in (start, end) range, defaults to None (all keys)
+    :type time_range: tuple, optional
+    :param time_offset: Offset added to copied keys, defaults to 0.0
+    :type time_offset: float, optional
+    :param undoable: Add edits to undo queue, defaults to True
+    :type undoable: bool, optional
+    :return: Report dictionary with "matched", "curves", "unmatched", "unmatched_targets" and "change" keys
+    :rtype: dict
+    """
+    target_map = dict([(strip_namespace(node), str(node)) for node in target_nodes])
+    replace_range = (time_range[0] + time_offset, time_range[1] + time_offset) if time_range else None
+    report = {"matched": 0, "curves": 0, "unmatched": [], "unmatched_targets": [], "change": None}
+    if not undoable:
+        report["change"] = oma2.MAnimCurveChange()
+    matched_names = set()
+    if undoable:
+        mc.undoInfo(openChunk=True)
+    try:
+        for source_node in source_nodes:
+            target_node = target_map.get(strip_namespace(source_node))
+            if not target_node:
+                report["unmatched"].append(str(source_node))
+                continue
+            report["matched"] += 1
+            matched_names.add(strip_namespace(source_node))
+            for attr_name, anim_curve in list_anim_curves(source_node).items():
+                target_plug = "{0}.{1}".format(target_node, attr_name)
+                if not mc.objExists(target_plug) or mc.getAttr(target_plug, lock=True):
+                    continue
+                if undoable:
+                    if not copy_curve(anim_curve, target_plug, time_range=time_range, time_offset=time_offset):
+                        continue
+                else:
+                    curve_data = get_curve_data(anim_curve, time_range=time_range)
+                    if not curve_data["times"]:
+                        continue
+                    set_curve_data(get_anim_curve_for_plug(target_plug), curve_data, time_offset=time_offset, replace_range=replace_range, change=report["change"])
+                report["curves"] += 1
+    finally:
+        if undoable:
+            mc.undoInfo(closeChunk=True)
+    report["unmatched_targets"] = sorted([target_map[name] for name in set(target_map.keys()) - matched_names])
+    if report["unmatched"]:
+        Logger.warning("Unmatched nodes: {0}".format(report["unmatched"]))
+    Logger.info("Transferred {0} curves for {1} nodes.".format(report["curves"], report["matched"]))
+    return report
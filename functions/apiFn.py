@@ -1,5 +1,5 @@
-from PySide2 import QtWidgets
 import pymel.api as pma
+import luna_rig.functions.cacheFn as cacheFn
 
 
 def get_MObject(name):
@@ -29,21 +29,113 @@ def get_dag_path(node):
     return dag_path
 
 
-def get_all_dgnodes(in_node, direction, mfn_type):
-    nodes = []
-    # Create selection list
-    sel = pma.MSelectionList()
-    sel.add(in_node)
-    mobj = pma.MObject()
-    sel.getDependNode(0, mobj)
-    # Create dg iterator
-    iter_dg = pma.MItDependencyGraph(mobj, direction, pma.MItDependencyGraph.kPlugLevel)
+def get_history_root(node):
+    """Get MObject history queries should start from. Transforms are resolved to their first non intermediate shape.
+
+    :param node: Node
+    :type node: str or PyNode
+    :return: Node MObject
+    :rtype: MObject
+    """
+    mobj = get_MObject(node)
+    if not mobj.hasFn(pma.MFn.kTransform):
+        return mobj
+    dag_path = get_dag_path(node)
+    for index in range(dag_path.childCount()):
+        child = dag_path.child(index)
+        if child.hasFn(pma.MFn.kShape) and not pma.MFnDagNode(child).isIntermediateObject():
+            return child
+    return mobj
+
+
+def get_node_name(mobj):
+    """Get unique name of node MObject.
+
+    :param mobj: Node
+    :type mobj: MObject
+    :return: Partial path for DAG nodes, node name otherwise.
+    :rtype: str
+    """
+    if mobj.hasFn(pma.MFn.kDagNode):
+        dag_path = pma.MDagPath()
+        pma.MDagPath.getAPathTo(mobj, dag_path)
+        return dag_path.partialPathName()
+    return pma.MFnDependencyNode(mobj).name()
+
+
+def iter_dgnodes(in_node, direction=pma.MItDependencyGraph.kUpstream, mfn_type=pma.MFn.kInvalid, type_name=None, prune=None, as_names=True):
+    """Iterate over nodes connected to in_node. Each node is visited once.
+
+    :param in_node: Node to start from
+    :type in_node: str, PyNode or MObject
+    :param direction: Traversal direction, defaults to kUpstream
+    :type direction: MItDependencyGraph.Direction, optional
+    :param mfn_type: Only yield nodes of this function set type, defaults to kInvalid (any)
+    :type mfn_type: MFn.Type, optional
+    :param type_name: Only yield nodes with this exact type name, defaults to None
+    :type type_name: str, optional
+    :param prune: Function taking MObject, if it returns True traversal won't go past that node, defaults to None
+    :type prune: callable, optional
+    :param as_names: Yield node names instead of MObjects, defaults to True
+    :type as_names: bool, optional
+    :return: Node names or MObjects
+    :rtype: generator
+    """
+    mobj = in_node if isinstance(in_node, pma.MObject) else get_MObject(in_node)
+    iter_dg = pma.MItDependencyGraph(mobj, mfn_type, direction, pma.MItDependencyGraph.kDepthFirst, pma.MItDependencyGraph.kNodeLevel)
+    iter_dg.disablePruningOnFilter()
+    visited = set()
     while not iter_dg.isDone():
         current_item = iter_dg.currentItem()
-        depend_node_fn = pma.MFnDependencyNode(current_item)
-        if current_item.hasFn(mfn_type):
-            name = depend_node_fn.name()
-            nodes.append(name)
+        handle_hash = pma.MObjectHandle(current_item).hashCode()
+        if handle_hash not in visited:
+            visited.add(handle_hash)
+            if not type_name or pma.MFnDependencyNode(current_item).typeName() == type_name:
+                yield get_node_name(current_item) if as_names else current_item
+            if prune and prune(current_item):
+                iter_dg.prune()
         iter_dg.next()
 
-    return nodes
+
+# (root, direction, mfn type, type name) -> list of node names
+_DG_NODES_CACHE = cacheFn.SceneCache("dg_nodes", events=[cacheFn.SceneEvent.CONNECTION,
+                                                          cacheFn.SceneEvent.NODE_REMOVED,
+                                                          cacheFn.SceneEvent.NAME_CHANGED])
+
+
+def get_all_dgnodes(in_node, direction, mfn_type, type_name=None, use_cache=True):
+    """Get names of nodes connected to in_node. Results are cached until graph changes.
+
+    :param in_node: Node to start from
+    :type in_node: str or PyNode
+    :param direction: Traversal direction
+    :type direction: MItDependencyGraph.Direction
+    :param mfn_type: Function set type filter
+    :type mfn_type: MFn.Type
+    :param type_name: Exact node type filter, defaults to None
+    :type type_name: str, optional
+    :param use_cache: Use cached result, defaults to True
+    :type use_cache: bool, optional
+    :return: Node names
+    :rtype: list[str]
+    """
+    if not use_cache:
+        return list(iter_dgnodes(in_node, direction, mfn_type, type_name=type_name))
+    cache_key = (str(in_node), direction, mfn_type, type_name)
+    return list(_DG_NODES_CACHE.get_or_create(cache_key, lambda: list(iter_dgnodes(in_node, direction, mfn_type, type_name=type_name))))
+
+
+def get_history(node, type_name=None, mfn_type=pma.MFn.kInvalid):
+    """Cached listHistory alternative. Transforms are resolved to shapes.
+
+    :param node: Node to get history of
+    :type node: str or PyNode
+    :param type_name: Exact node type filter, defaults to None
+    :type type_name: str, optional
+    :param mfn_type: Function set type filter, defaults to kInvalid (any)
+    :type mfn_type: MFn.Type, optional
+    :return: Node names
+    :rtype: list[str]
+    """
+    history_root = get_node_name(get_history_root(node))
+    return get_all_dgnodes(history_root, pma.MItDependencyGraph.kUpstream, mfn_type, type_name=type_name)
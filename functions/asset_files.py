@@ -1,8 +1,16 @@
 import pymel.core as pm
+import maya.cmds as mc
 import os
+import json
+import timeit
+import hashlib
 import luna
 from luna import Logger
-from PySide2 import QtWidgets
+
+# Model import modes: import source file, import binary cache of source file, reference binary cache
+MODEL_MODES = ["import", "cache", "reference"]
+# Binary model copies directory, relative to asset directory
+MODEL_CACHE_DIR = os.path.join("cache", "model")
 
 
 def clear_all_references(*args):
@@ -12,6 +20,7 @@ def clear_all_references(*args):
 
 
 def browse_model():
+    from PySide2 import QtWidgets  # UI only, not needed in batch builds
     current_asset = luna.workspace.Asset.get()
     file_filters = "Maya (*.ma *mb);;Maya ASCII (*.ma);;Maya Binary(*.mb);;All Files (*.*)"
     selected_filter = "Maya (*.ma *mb)"
@@ -22,21 +31,157 @@ def browse_model():
     return model_path
 
 
-def import_model():
+def get_model_cache_dir():
+    """Directory with binary model copies of current asset. Kept with the asset, so work scenes referencing a copy open on any machine."""
+    return os.path.join(luna.workspace.Asset.get().path, MODEL_CACHE_DIR)
+
+
+def get_model_cache_path(model_path):
+    """Binary cache path for model file. Cache key is source path, size and modification time,
+    so any change to the source file results in a new cache file.
+
+    :param model_path: Source model file
+    :type model_path: str
+    :return: Path to .mb cache file
+    :rtype: str
+    """
+    model_path = os.path.abspath(model_path)
+    stat = os.stat(model_path)
+    key = hashlib.sha1("{0}|{1}|{2}".format(os.path.normcase(model_path), stat.st_size, stat.st_mtime).encode("utf-8")).hexdigest()
+    base_name = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(get_model_cache_dir(), "{0}_{1}.mb".format(base_name, key[:12]))
+
+
+def _import_file(file_path):
+    start_time = timeit.default_timer()
+    try:
+        new_nodes = mc.file(file_path, i=True, returnNewNodes=True) or []
+    except RuntimeError as e:
+        Logger.exception("Failed to load model file: {0}".format(file_path))
+        raise e
+    return new_nodes, timeit.default_timer() - start_time
+
+
+def build_model_cache(model_path, keep_nodes=True):
+    """Import source model and export its nodes to binary cache file.
+
+    :param model_path: Source model file
+    :type model_path: str
+    :param keep_nodes: Keep imported source nodes in scene, defaults to True
+    :type keep_nodes: bool, optional
+    :return: Cache file path
+    :rtype: str
+    """
+    cache_path = get_model_cache_path(model_path)
+    new_nodes, import_time = _import_file(model_path)
+    if not os.path.isdir(os.path.dirname(cache_path)):
+        os.makedirs(os.path.dirname(cache_path))
+    # Export to temp file first, parallel builds only see complete cache files
+    temp_path = "{0}.{1}.tmp.mb".format(os.path.splitext(cache_path)[0], os.getpid())
+    selection = mc.ls(sl=True)
+    # All imported nodes, sets are exported as sets and not their members
+    mc.select(mc.ls(new_nodes), r=True, noExpand=True)
+    try:
+        mc.file(temp_path, exportSelected=True, type="mayaBinary", constructionHistory=True, channels=True, shader=True, force=True)
+    finally:
+        mc.select(selection, r=True)
+    if not keep_nodes:
+        mc.delete(mc.ls(new_nodes))
+    if os.path.isfile(cache_path):
+        os.remove(temp_path)
+    else:
+        os.rename(temp_path, cache_path)
+    with open(cache_path + ".json", "w") as json_file:
+        json.dump({"source": os.path.abspath(model_path), "import_time": import_time}, json_file)
+    Logger.info("Cached model: {0} -> {1}".format(model_path, cache_path))
+    return cache_path
+
+
+def _log_time_saved(cache_path, elapsed):
+    try:
+        with open(cache_path + ".json", "r") as json_file:
+            source_time = json.load(json_file)["import_time"]
+    except (IOError, OSError, ValueError, KeyError):
+        return
+    Logger.info("Model cache: {0:.2f}s (source import {1:.2f}s, saved {2:.2f}s)".format(elapsed, source_time, source_time - elapsed))
+
+
+def import_model(mode="cache"):
+    """Import asset model.
+
+    :param mode: One of MODEL_MODES, defaults to "cache".
+        "import" - import source file,
+        "cache" - import binary copy of source file, copy is created on first build,
+        "reference" - reference binary copy, reference is imported by import_model_references when rig is published.
+    :type mode: str, optional
+    :raises ValueError: If mode is not valid
+    :return: Source model path
+    :rtype: str
+    """
+    if mode not in MODEL_MODES:
+        raise ValueError("Invalid model mode: {0}, valid modes: {1}".format(mode, MODEL_MODES))
     current_asset = luna.workspace.Asset.get()
     model_path = current_asset.model_path
     if not os.path.isfile(model_path):
         model_path = browse_model()
         current_asset.set_data("model", model_path)
-    try:
-        pm.importFile(model_path)
-    except RuntimeError as e:
-        Logger.exception("Failed to load model file: {0}".format(model_path))
-        raise e
-    Logger.info("Imported model: {0}".format(model_path))
+
+    if mode == "import" or (mode == "cache" and model_path.lower().endswith(".mb")):
+        _import_file(model_path)
+        Logger.info("Imported model: {0}".format(model_path))
+        return model_path
+
+    cache_path = get_model_cache_path(model_path)
+    if mode == "cache":
+        if os.path.isfile(cache_path):
+            elapsed = _import_file(cache_path)[1]
+            _log_time_saved(cache_path, elapsed)
+        else:
+            build_model_cache(model_path)
+        Logger.info("Imported model: {0}".format(model_path))
+        return model_path
+
+    if not os.path.isfile(cache_path):
+        try:
+            build_model_cache(model_path, keep_nodes=False)
+        except RuntimeError:
+            Logger.exception("Failed to cache model: {0}".format(model_path))
+    if os.path.isfile(cache_path):
+        reference_path = cache_path
+    else:
+        Logger.warning("Model cache is missing, referencing source file: {0}".format(model_path))
+        reference_path = model_path
+    start_time = timeit.default_timer()
+    mc.file(reference_path, reference=True, namespace=":", mergeNamespacesOnClash=True)
+    if reference_path == cache_path:
+        _log_time_saved(cache_path, timeit.default_timer() - start_time)
+    Logger.info("Referenced model: {0} ({1})".format(model_path, reference_path))
     return model_path
 
 
+def import_model_references():
+    """Import model references created by import_model in reference mode. Edits made to referenced geometry are kept.
+    Nothing is done if asset or its model is not set.
+
+    :return: Imported reference files
+    :rtype: list[str]
+    """
+    imported = []
+    current_asset = luna.workspace.Asset.get()
+    if not current_asset or not current_asset.model_path:
+        return imported
+    cache_dir = os.path.normcase(os.path.abspath(get_model_cache_dir()))
+    model_path = os.path.normcase(os.path.abspath(current_asset.model_path))
+    for ref_file in mc.file(q=True, reference=True) or []:
+        ref_path = os.path.normcase(os.path.abspath(mc.referenceQuery(ref_file, filename=True, withoutCopyNumber=True)))
+        if not ref_path.startswith(cache_dir) and ref_path != model_path:
+            continue
+        mc.file(ref_file, importReference=True)
+        imported.append(ref_file)
+        Logger.info("Imported model reference: {0}".format(ref_file))
+    return imported
+
+
 def reference_model(*args):
     current_asset = luna.workspace.Asset.get()
     if current_asset:
@@ -46,8 +191,16 @@ def reference_model(*args):
 
 
 def import_skeleton():
+    """Create skeleton from latest skeleton data (.skel), latest skeleton scene is imported if data is missing or older."""
+    from luna_rig.importexport.skeleton import SkeletonManager
     current_asset = luna.workspace.Asset.get()
     latest_skeleton_path = current_asset.latest_skeleton_path
+    skeleton_data_path = SkeletonManager().get_latest_file()
+    if skeleton_data_path and os.path.isfile(skeleton_data_path):
+        if latest_skeleton_path and os.path.isfile(latest_skeleton_path) and os.path.getmtime(latest_skeleton_path) > os.path.getmtime(skeleton_data_path):
+            Logger.warning("Skeleton data is older than skeleton scene, importing scene: {0}".format(latest_skeleton_path))
+        else:
+            return SkeletonManager.import_skeleton(skeleton_data_path)
     pm.importFile(latest_skeleton_path, loadReferenceDepth="none", dns=1)
     Logger.info("Imported skeleton: {0}".format(latest_skeleton_path))
     return latest_skeleton_path
@@ -63,6 +216,7 @@ def increment_save_file(typ="skeleton"):
 
 
 def save_file_as(typ="skeleton"):
+    from PySide2 import QtWidgets  # UI only, not needed in batch builds
     current_asset = luna.workspace.Asset.get()
     if not current_asset:
         pm.warning("Asset is not set!")
@@ -0,0 +1,234 @@
+import json
+import pymel.core as pm
+import maya.cmds as mc
+from luna import Logger
+import luna_rig
+import luna_rig.functions.transformFn as transformFn
+
+METHODS = ["constr", "matrix"]
+# String attribute holding driven local channels from before matrix attach
+REST_CHANNELS_ATTR = "attachRestChannels"
+
+
+def is_matrix_supported():
+    """Matrix method relies on offsetParentMatrix (Maya 2020+)"""
+    return pm.about(api=1) >= 20200100
+
+
+def validate_method(method):
+    """Check method name and fall back to constraints on older Maya versions.
+
+    :param method: Attach method, "constr" or "matrix"
+    :type method: str
+    :raises ValueError: If method is not valid
+    :return: Method to use
+    :rtype: str
+    """
+    if method not in METHODS:
+        raise ValueError("Invalid attach method {0}. Valid: {1}".format(method, METHODS))
+    if method == "matrix" and not is_matrix_supported():
+        Logger.warning("Matrix attach method requires Maya 2020+. Using constraint method instead.")
+        method = "constr"
+    return method
+
+
+def attach(driver, driven, method="constr", maintain_offset=True, translate=True, rotate=True, scale=False):
+    """Make driven transform follow driver.
+
+    Constraint method creates parent/point/orient/scale constraints.
+    Matrix method connects driver.worldMatrix * driven.parentInverseMatrix to driven.offsetParentMatrix
+    with offset baked into multMatrix and resets driven local transformations.
+    Original local channels are stored on driven node and restored on detach.
+
+    :param driver: Driver transform
+    :type driver: str or PyNode
+    :param driven: Driven transform
+    :type driven: str or PyNode
+    :param method: "constr" or "matrix", defaults to "constr"
+    :type method: str, optional
+    :param maintain_offset: Keep current offset, defaults to True
+    :type maintain_offset: bool, optional
+    :param translate: Follow translation, defaults to True
+    :type translate: bool, optional
+    :param rotate: Follow rotation, defaults to True
+    :type rotate: bool, optional
+    :param scale: Follow scale, defaults to False
+    :type scale: bool, optional
+    :return: Created nodes
+    :rtype: list[PyNode]
+    """
+    driver = pm.PyNode(driver)  # type: luna_rig.nt.Transform
+    driven = pm.PyNode(driven)  # type: luna_rig.nt.Transform
+    method = validate_method(method)
+    if method == "constr":
+        return _attach_constr(driver, driven, maintain_offset, translate, rotate, scale)
+    return _attach_matrix(driver, driven, maintain_offset, translate, rotate, scale)
+
+
+def _attach_constr(driver, driven, maintain_offset, translate, rotate, scale):
+    nodes = []
+    if translate and rotate:
+        nodes.append(pm.parentConstraint(driver, driven, mo=maintain_offset))
+    elif translate:
+        nodes.append(pm.pointConstraint(driver, driven, mo=maintain_offset))
+    elif rotate:
+        nodes.append(pm.orientConstraint(driver, driven, mo=maintain_offset))
+    if scale:
+        nodes.append(pm.scaleConstraint(driver, driven, mo=maintain_offset))
+    return nodes
+
+
+def _attach_matrix(driver, driven, maintain_offset, translate, rotate, scale):
+    name_base = "{0}_attach".format(driven.nodeName().split(":")[-1])
+    mult_mtx = pm.createNode("multMatrix", n=name_base + "_mmtx")  # type: luna_rig.nt.MultMatrix
+    if maintain_offset:
+        offset_mtx = driven.worldMatrix.get() * driver.worldInverseMatrix.get()
+        mult_mtx.matrixIn[0].set(transformFn.matrix_to_list(offset_mtx))
+    driver.worldMatrix.connect(mult_mtx.matrixIn[1])
+    driven.parentInverseMatrix.connect(mult_mtx.matrixIn[2])
+    nodes = [mult_mtx]
+    out_plug = mult_mtx.matrixSum
+    if not (translate and rotate and scale):
+        pick_mtx = pm.createNode("pickMatrix", n=name_base + "_pmtx")
+        mult_mtx.matrixSum.connect(pick_mtx.inputMatrix)
+        pick_mtx.useTranslate.set(translate)
+        pick_mtx.useRotate.set(rotate)
+        pick_mtx.useScale.set(scale)
+        pick_mtx.useShear.set(scale)
+        out_plug = pick_mtx.outputMatrix
+        nodes.append(pick_mtx)
+    # Move local transformations into offset
+    store_rest_channels(driven)
+    out_plug.connect(driven.offsetParentMatrix, f=1)
+    if translate:
+        driven.translate.set(0, 0, 0)
+    if rotate:
+        driven.rotate.set(0, 0, 0)
+        if isinstance(driven, luna_rig.nt.Joint):
+            driven.jointOrient.set(0, 0, 0)
+    if scale:
+        driven.scale.set(1, 1, 1)
+    return nodes
+
+
+def store_rest_channels(driven):
+    """Store local translate, rotate, scale and joint orient of driven transform.
+    Values already stored by previous attach are kept.
+
+    :param driven: Driven transform
+    :type driven: str or PyNode
+    """
+    driven = str(driven)
+    if mc.attributeQuery(REST_CHANNELS_ATTR, n=driven, ex=True):
+        return
+    attrs = ["translate", "rotate", "scale"]
+    if mc.objectType(driven, isAType="joint"):
+        attrs.append("jointOrient")
+    channels = dict([(attr, list(mc.getAttr("{0}.{1}".format(driven, attr))[0])) for attr in attrs])
+    mc.addAttr(driven, ln=REST_CHANNELS_ATTR, dt="string")
+    mc.setAttr("{0}.{1}".format(driven, REST_CHANNELS_ATTR), json.dumps(channels), type="string")
+
+
+def restore_rest_channels(driven, world_matrix=None):
+    """Restore local channels stored by matrix attach. Call after offsetParentMatrix is reset.
+
+    :param driven: Driven transform
+    :type driven: str or PyNode
+    :param world_matrix: World matrix to keep, pose is matched after restoring if it differs, defaults to None
+    :type world_matrix: list[float], optional
+    """
+    driven = str(driven)
+    if mc.attributeQuery(REST_CHANNELS_ATTR, n=driven, ex=True):
+        channels = json.loads(mc.getAttr("{0}.{1}".format(driven, REST_CHANNELS_ATTR)) or "{}")
+        for attr, values in channels.items():
+            mc.setAttr("{0}.{1}".format(driven, attr), *values)
+        mc.deleteAttr(driven, at=REST_CHANNELS_ATTR)
+    if world_matrix is None:
+        return
+    current_matrix = mc.xform(driven, q=True, m=True, ws=True)
+    if any([abs(current - value) > 1e-5 for current, value in zip(current_matrix, world_matrix)]):
+        mc.xform(driven, m=list(world_matrix), ws=True)
+
+
+# Type names instead of nt classes, pickMatrix type is not registered before Maya 2020
+MATRIX_NODE_TYPES = ("multMatrix", "pickMatrix")
+
+
+def list_attach_nodes(driven):
+    """List nodes driving given transform, constraints and matrix nodes.
+
+    :param driven: Driven transform
+    :type driven: str or PyNode
+    :return: Attach nodes
+    :rtype: list[PyNode]
+    """
+    driven = pm.PyNode(driven)  # type: luna_rig.nt.Transform
+    nodes = driven.listConnections(type="constraint", s=1, d=0)
+    matrix_nodes = driven.offsetParentMatrix.listConnections(s=1, d=0) if driven.hasAttr("offsetParentMatrix") else []
+    for matrix_node in matrix_nodes:
+        node_type = mc.nodeType(str(matrix_node))
+        if node_type == "pickMatrix":
+            nodes.append(matrix_node)
+            nodes += matrix_node.inputMatrix.listConnections(s=1, d=0, type="multMatrix")
+        elif node_type == "multMatrix":
+            nodes.append(matrix_node)
+    return list(set(nodes))
+
+
+def detach(driven):
+    """Remove attachment keeping current pose.
+
+    :param driven: Driven transform
+    :type driven: str or PyNode
+    """
+    driven = pm.PyNode(driven)  # type: luna_rig.nt.Transform
+    attach_nodes = list_attach_nodes(driven)
+    if not attach_nodes:
+        return
+    is_matrix = any([mc.nodeType(str(node)) in MATRIX_NODE_TYPES for node in attach_nodes])
+    if is_matrix:
+        world_matrix = mc.xform(str(driven), q=True, m=True, ws=True)
+        driven.offsetParentMatrix.disconnect()
+        driven.offsetParentMatrix.set(pm.dt.Matrix())
+        restore_rest_channels(driven, world_matrix)
+    pm.delete(attach_nodes)
+
+
+def count_attach_nodes(root):
+    """Count constraint and matrix attach nodes under root hierarchy.
+
+    :param root: Root transform
+    :type root: str or PyNode
+    :return: Dictionary of {node type: count}
+    :rtype: dict
+    """
+    counts = {}
+    for child in pm.listRelatives(root, ad=True, type="transform") or []:
+        for node in list_attach_nodes(child):
+            counts[node.nodeType()] = counts.get(node.nodeType(), 0) + 1
+    return counts
+
+
+def to_constraint(driven):
+    """Replace matrix attachment with constraints keeping the same driver and offset.
+    Used for baking, as matrix attachment doesn't drive transform channels.
+
+    :param driven: Driven transform
+    :type driven: str or PyNode
+    :return: Created constraints
+    :rtype: list[PyNode]
+    """
+    driven = pm.PyNode(driven)  # type: luna_rig.nt.Transform
+    mult_mtx = [node for node in list_attach_nodes(driven) if mc.nodeType(str(node)) == "multMatrix"]
+    if not mult_mtx:
+        return []
+    drivers = mult_mtx[0].matrixIn[1].listConnections(s=1, d=0)
+    pick_mtx = driven.offsetParentMatrix.listConnections(s=1, d=0, type="pickMatrix")
+    if pick_mtx:
+        channels = [pick_mtx[0].useTranslate.get(), pick_mtx[0].useRotate.get(), pick_mtx[0].useScale.get()]
+    else:
+        channels = [True, True, True]
+    detach(driven)
+    if not drivers:
+        return []
+    return attach(drivers[0], driven, method="constr", translate=channels[0], rotate=channels[1], scale=channels[2])
@@ -1,4 +1,7 @@
+from collections import namedtuple
 import pymel.core as pm
+import maya.cmds as mc
+import maya.api.OpenMaya as om2
 from luna import Logger
 
 
@@ -31,16 +34,15 @@ def get_enums(attribute):
     """Get enums values as sorted list
 
     :param attribute: Attribute to get enums from.
-    :type attribute: pm.Attribute
+    :type attribute: pm.Attribute or str
     :return: List of enums as list of tuples (name, index)
     :rtype: list[(str, int)]
     """
-    try:
-        enum_list = attribute.getEnums().items()
-        enum_list = sorted(enum_list, key=lambda pair: pair[1])
-    except TypeError:
+    plug = str(attribute)
+    if mc.getAttr(plug, type=True) != "enum":
         return []
-    return enum_list
+    node_name, attr_name = plug.split(".")[0], plug.split(".")[-1]
+    return parse_enums(mc.attributeQuery(attr_name, node=node_name, listEnum=True)[0])
 
 
 def add_divider(node, attr_name="divider"):
@@ -51,44 +53,175 @@ def add_divider(node, attr_name="divider"):
     node.attr(attr_name).lock()
 
 
-def transfer_attr(source, destination, attr_list=[], connect=False, ** kwargs):
-    attr_alias = {}
+def parse_enums(enum_string):
+    """Parse enum string returned by attributeQuery(listEnum=True)
+
+    :param enum_string: Enum string, e.g "off:on" or "off=0:on=5"
+    :type enum_string: str
+    :return: List of enums as list of tuples (name, index) sorted by index
+    :rtype: list[(str, int)]
+    """
+    enum_list = []
+    next_index = 0
+    for enum_field in enum_string.split(":"):
+        if "=" in enum_field:
+            enum_name, enum_index = enum_field.rsplit("=", 1)
+            next_index = int(enum_index)
+        else:
+            enum_name = enum_field
+        enum_list.append((enum_name, next_index))
+        next_index += 1
+    return sorted(enum_list, key=lambda pair: pair[1])
+
+
+AttrDescriptor = namedtuple("AttrDescriptor", ["node", "name", "type", "min", "max", "value", "enums", "connected"])
+
+# MFnNumericData type -> getAttr type name
+_NUMERIC_TYPES = {om2.MFnNumericData.kBoolean: "bool",
+                  om2.MFnNumericData.kByte: "byte",
+                  om2.MFnNumericData.kChar: "char",
+                  om2.MFnNumericData.kShort: "short",
+                  om2.MFnNumericData.kInt: "long",
+                  om2.MFnNumericData.kFloat: "float",
+                  om2.MFnNumericData.kDouble: "double"}
+# MFnUnitAttribute type -> (getAttr type name, unit class)
+_UNIT_TYPES = {om2.MFnUnitAttribute.kDistance: ("doubleLinear", om2.MDistance),
+               om2.MFnUnitAttribute.kAngle: ("doubleAngle", om2.MAngle),
+               om2.MFnUnitAttribute.kTime: ("time", om2.MTime)}
+
+
+def _get_attr_info(attr_object):
+    """Type, range and enums of attribute read from API function sets.
+
+    :param attr_object: Attribute
+    :type attr_object: om2.MObject
+    :return: Type name (None if not supported), min, max and enums. Range values are in UI units.
+    :rtype: (str, float, float, list)
+    """
+    if attr_object.hasFn(om2.MFn.kEnumAttribute):
+        fn_enum = om2.MFnEnumAttribute(attr_object)
+        enums = []
+        for enum_index in range(fn_enum.getMin(), fn_enum.getMax() + 1):
+            try:
+                enums.append((fn_enum.fieldName(enum_index), enum_index))
+            except RuntimeError:
+                continue
+        return "enum", None, None, enums
+    if attr_object.hasFn(om2.MFn.kNumericAttribute):
+        fn_numeric = om2.MFnNumericAttribute(attr_object)
+        attr_type = _NUMERIC_TYPES.get(fn_numeric.numericType())
+        min_value = fn_numeric.getMin() if fn_numeric.hasMin() else None
+        max_value = fn_numeric.getMax() if fn_numeric.hasMax() else None
+        return attr_type, min_value, max_value, []
+    if attr_object.hasFn(om2.MFn.kUnitAttribute):
+        fn_unit = om2.MFnUnitAttribute(attr_object)
+        attr_type, unit_class = _UNIT_TYPES.get(fn_unit.unitType(), (None, None))
+        if not attr_type:
+            return None, None, None, []
+        ui_unit = unit_class.uiUnit()
+        min_value = fn_unit.getMin().asUnits(ui_unit) if fn_unit.hasMin() else None
+        max_value = fn_unit.getMax().asUnits(ui_unit) if fn_unit.hasMax() else None
+        return attr_type, min_value, max_value, []
+    return None, None, None, []
+
+
+def get_attr_descriptors(node, attr_list=[], **kwargs):
+    """Query names, types, ranges, values, enums and connection state of node attributes in one pass.
+    Attribute definitions are read from single function set of the node, only values are queried with cmds.
+    Compound, ramp and missing attributes are skipped.
+
+    :param node: Node to query
+    :type node: str or PyNode
+    :param attr_list: Attributes to query, if empty keyable scalar attributes are used, defaults to []
+    :type attr_list: list[str or pm.Attribute], optional
+    :return: List of attribute descriptors
+    :rtype: list[AttrDescriptor]
+    """
+    node_name = str(node)
     if not attr_list:
-        transfer_list = source.listAttr(k=1, r=1, s=1, **kwargs)
+        attr_names = mc.listAttr(node_name, k=1, r=1, s=1, **kwargs) or []
     else:
-        transfer_list = attr_list
-    for attr in transfer_list:
-        if not attr.exists() or attr.isCompound() or attr in source.listAttr(ra=1):
+        attr_names = [attr.attrName(longName=True) if isinstance(attr, pm.Attribute) else str(attr).split(".")[-1] for attr in attr_list]
+    # Queried once for the whole node
+    ramp_attrs = set(mc.listAttr(node_name, ra=1) or [])
+    input_connections = mc.listConnections(node_name, s=1, d=0, c=1, p=1) or []
+    connected_attrs = set([plug.split(".", 1)[-1] for plug in input_connections[::2]])
+    sel_list = om2.MSelectionList()
+    sel_list.add(node_name)
+    fn_node = om2.MFnDependencyNode(sel_list.getDependNode(0))
+
+    descriptors = []
+    for attr_name in attr_names:
+        plug = "{0}.{1}".format(node_name, attr_name)
+        if attr_name in ramp_attrs or not fn_node.hasAttribute(attr_name):
             continue
-        if destination.hasAttr(attr.attrName(longName=True)):
-            Logger.warning("{0}: clashing attr {1}, skipping transfer...".format(destination, attr.attrName()))
+        try:
+            attr_object = fn_node.attribute(attr_name)
+            if fn_node.findPlug(attr_object, False).isCompound:
+                continue
+            attr_type, min_value, max_value, enums = _get_attr_info(attr_object)
+            if attr_type is None:
+                attr_type = mc.getAttr(plug, type=True)
+            descriptors.append(AttrDescriptor(node_name,
+                                              attr_name,
+                                              attr_type,
+                                              min_value,
+                                              max_value,
+                                              mc.getAttr(plug),
+                                              enums,
+                                              attr_name in connected_attrs))
+        except (RuntimeError, TypeError):
+            Logger.exception("Failed to query attr: {0}".format(plug))
+    return descriptors
+
+
+def transfer_attr(source, destination, attr_list=[], connect=False, proxy=False, **kwargs):
+    """Copy attributes from source to destination node.
+
+    :param source: Node to copy attributes from
+    :type source: str or PyNode
+    :param destination: Node to add attributes to
+    :type destination: str or PyNode
+    :param attr_list: Attributes to transfer, if empty keyable scalar attributes are used, defaults to []
+    :type attr_list: list, optional
+    :param connect: Drive source attributes with copied ones, defaults to False
+    :type connect: bool, optional
+    :param proxy: Create proxy attributes instead of copying and connecting, defaults to False
+    :type proxy: bool, optional
+    :return: Dictionary of {source attr: destination attr}
+    :rtype: dict
+    """
+    attr_alias = {}
+    destination_name = str(destination)
+    existing_attrs = set(mc.listAttr(destination_name) or [])
+    for descriptor in get_attr_descriptors(source, attr_list, **kwargs):
+        source_plug = "{0}.{1}".format(descriptor.node, descriptor.name)
+        destination_plug = "{0}.{1}".format(destination_name, descriptor.name)
+        if descriptor.name in existing_attrs:
+            Logger.warning("{0}: clashing attr {1}, skipping transfer...".format(destination, descriptor.name))
             continue
         try:
-            if attr.type() == "enum":
-                enum_names = [enum[0] for enum in get_enums(attr)]
-                destination.addAttr(attr.attrName(longName=True), at="enum", en=enum_names, dv=attr.get(), k=1)
+            if proxy:
+                mc.addAttr(destination_name, ln=descriptor.name, proxy=source_plug)
+                mc.setAttr(destination_plug, e=True, k=True)
+            elif descriptor.type == "enum":
+                enum_string = ":".join(["{0}={1}".format(enum_name, enum_index) for enum_name, enum_index in descriptor.enums])
+                mc.addAttr(destination_name, ln=descriptor.name, at="enum", en=enum_string, dv=descriptor.value, k=True)
             else:
-                min_value = attr.getMin()
-                max_value = attr.getMax()
-                default_val = attr.get()
-                if min_value is None and max_value is None:
-                    destination.addAttr(attr.attrName(longName=True), at=attr.type(), k=1, dv=default_val)
-                elif min_value is None and max_value is not None:
-                    destination.addAttr(attr.attrName(longName=True), at=attr.type(), k=1, max=max_value, dv=default_val)
-                elif min_value is not None and max_value is None:
-                    destination.addAttr(attr.attrName(longName=True), at=attr.type(), k=1, min=min_value, dv=default_val)
-                else:
-                    destination.addAttr(attr.attrName(longName=True), at=attr.type(), k=1, min=min_value, max=max_value, dv=default_val)
+                range_flags = {}
+                if descriptor.min is not None:
+                    range_flags["min"] = descriptor.min
+                if descriptor.max is not None:
+                    range_flags["max"] = descriptor.max
+                mc.addAttr(destination_name, ln=descriptor.name, at=descriptor.type, k=True, dv=descriptor.value, **range_flags)
+            existing_attrs.add(descriptor.name)
+            if connect and not proxy and not descriptor.connected:
+                mc.connectAttr(destination_plug, source_plug)
             # Store attr aliases
-            attr_alias[attr] = destination.attr(attr.attrName(longName=True))
+            attr_alias[pm.Attribute(source_plug)] = pm.Attribute(destination_plug)
         except Exception:
-            Logger.exception("Failed to transfer attr: {0}".format(attr))
+            Logger.exception("Failed to transfer attr: {0}".format(source_plug))
 
-    if connect:
-        for orig_attr, copied_attr in attr_alias.items():
-            if orig_attr.isConnected():
-                continue
-            copied_attr.connect(orig_attr)
     return attr_alias
 
 
@@ -0,0 +1,261 @@
+import maya.cmds as mc
+from luna import Logger
+from luna.utils import fileFn
+import luna_rig
+import luna_rig.functions.animFn as animFn
+
+
+# Category -> node types or inherited base types
+NODE_CATEGORIES = {
+    "constraint": ["constraint"],
+    "follicle": ["follicle"],
+    "dynamics": ["hairSystem", "nucleus", "nRigid", "nCloth", "dynamicConstraint"],
+    "expression": ["expression", "script"],
+    "unit_conversion": ["unitConversion"],
+    "deformer": ["geometryFilter"],
+    "matrix": ["multMatrix", "decomposeMatrix", "composeMatrix", "pickMatrix", "blendMatrix", "aimMatrix", "inverseMatrix"],
+    "utility": ["multiplyDivide", "plusMinusAverage", "condition", "blendColors", "reverse", "clamp", "setRange",
+                "remapValue", "distanceBetween", "curveInfo", "pointOnCurveInfo", "pointOnSurfaceInfo",
+                "nearestPointOnCurve", "vectorProduct", "blendTwoAttr", "addDoubleLinear", "multDoubleLinear"],
+    "ik": ["ikHandle", "ikEffector"],
+    "animCurve": ["animCurve"],
+    "dag": ["transform"],
+}
+# Relative cost used for ranking when no timings are available
+CATEGORY_COST = {
+    "constraint": 4.0,
+    "follicle": 6.0,
+    "dynamics": 20.0,
+    "expression": 10.0,
+    "unit_conversion": 1.0,
+    "deformer": 8.0,
+    "matrix": 1.0,
+    "utility": 1.0,
+    "ik": 5.0,
+    "animCurve": 0.5,
+    "dag": 0.5,
+    "other": 1.0,
+}
+# Categories that are flagged whenever present
+SLOW_CATEGORIES = ["follicle", "dynamics", "expression", "unit_conversion"]
+
+
+def classify_node(node):
+    """Get audit category of node.
+
+    :param node: Node name
+    :type node: str
+    :return: Category name, "other" if node doesn't match any category.
+    :rtype: str
+    """
+    inherited = mc.nodeType(node, inherited=True) or [mc.nodeType(node)]
+    for category, node_types in NODE_CATEGORIES.items():
+        if category == "dag":
+            continue
+        if any([node_type in inherited for node_type in node_types]):
+            return category
+    if "transform" in inherited:
+        return "dag"
+    return "other"
+
+
+def list_component_nodes(component):
+    """List nodes owned by component: root group descendants, their direct non-DAG inputs,
+    util nodes, settings and controls.
+
+    :param component: Component to collect nodes for
+    :type component: luna_rig.AnimComponent
+    :return: Set of long node names
+    :rtype: set[str]
+    """
+    dag_nodes = [component.root.longName()] + (mc.listRelatives(component.root.longName(), ad=True, f=True) or [])
+    for ctl in component.controls:
+        dag_nodes.append(ctl.transform.longName())
+    nodes = set(mc.ls(dag_nodes, long=True))
+    # Utility nodes feeding component DAG nodes
+    inputs = set(mc.ls(mc.listConnections(list(nodes), s=True, d=False) or [], long=True))
+    inputs -= set(mc.ls(list(inputs), dag=True, long=True) + mc.ls(list(inputs), type="network", long=True))
+    nodes.update(inputs)
+    nodes.update([util_node.longName() if hasattr(util_node, "longName") else str(util_node) for util_node in component.util_nodes])
+    nodes.update([attr.split(".")[0] for attr in component.settings.keys()])
+    return set(mc.ls(list(nodes), long=True))
+
+
+# Constraint target attributes receiving driver transformations
+TARGET_TRANSFORM_ATTRS = ["targetParentMatrix", "targetTranslate", "targetRotate", "targetScale", "targetMatrix"]
+
+
+def find_constraint_chains(nodes):
+    """Find constraints driven by objects that are constrained themselves.
+
+    :param nodes: Nodes to check
+    :type nodes: list[str]
+    :return: List of (constraint, constrained driver) pairs
+    :rtype: list[tuple]
+    """
+    chains = []
+    for constraint in mc.ls(list(nodes), type="constraint", long=True):
+        # Only transform inputs of targets, weights are driven by constraint itself
+        connections = mc.listConnections(constraint, s=True, d=False, c=True, p=True, fullNodeName=True) or []
+        drivers = set()
+        for dest_plug, source_plug in zip(connections[::2], connections[1::2]):
+            if ".target[" not in dest_plug or dest_plug.rsplit(".", 1)[-1] not in TARGET_TRANSFORM_ATTRS:
+                continue
+            driver = source_plug.split(".")[0]
+            if mc.ls(driver, long=True) != [constraint]:
+                drivers.add(driver)
+        for driver in drivers:
+            if mc.listConnections(driver, type="constraint", s=True, d=False):
+                chains.append((constraint, driver))
+    return chains
+
+
+def sample_timings(nodes):
+    """Query time spent in given nodes during last run_timer call.
+
+    :param nodes: Nodes to time
+    :type nodes: list[str]
+    :return: Total time in seconds spent in nodes
+    :rtype: float
+    """
+    total = 0.0
+    # dgtimer -name accepts single node
+    for node in nodes:
+        total += mc.dgtimer(query=True, name=node, returnType="total") or 0.0
+    return total
+
+
+def run_timer(time_range=None):
+    """Play frame range with dgtimer enabled. Timings are queried with sample_timings after.
+
+    :param time_range: Frame range, defaults to None (playback range)
+    :type time_range: tuple, optional
+    """
+    if not time_range:
+        time_range = animFn.get_playback_range()
+    mc.dgtimer(on=True, reset=True)
+    try:
+        for frame in range(int(time_range[0]), int(time_range[1]) + 1):
+            mc.currentTime(frame, update=True)
+            mc.refresh(force=True)
+    finally:
+        mc.dgtimer(off=True)
+
+
+def audit_component(component, timings=False):
+    """Audit single component. Call run_timer before if timings are requested.
+
+    :param component: Component to audit
+    :type component: luna_rig.AnimComponent
+    :param timings: Query dgtimer timings, defaults to False
+    :type timings: bool, optional
+    :return: Component report
+    :rtype: dict
+    """
+    nodes = list_component_nodes(component)
+    categories = {}
+    node_types = {}
+    for node in nodes:
+        category = classify_node(node)
+        categories[category] = categories.get(category, 0) + 1
+        node_type = mc.nodeType(node)
+        node_types[node_type] = node_types.get(node_type, 0) + 1
+
+    flags = []
+    for category in SLOW_CATEGORIES:
+        if categories.get(category):
+            flags.append("{0} x{1}".format(category, categories[category]))
+    constraint_chains = find_constraint_chains(nodes)
+    if constraint_chains:
+        flags.append("constraint_chain x{0}".format(len(constraint_chains)))
+
+    report = {"component": str(component.pynode.nodeName()),
+              "type": component.as_str(name_only=True),
+              "character": str(component.character.pynode.nodeName()) if component.character else None,
+              "nodes": len(nodes),
+              "categories": categories,
+              "node_types": node_types,
+              "flags": flags,
+              "cost": sum([CATEGORY_COST.get(category, 1.0) * count for category, count in categories.items()])}
+    if timings:
+        report["time"] = sample_timings(nodes)
+    return report
+
+
+def audit_rig(character=None, timings=False, time_range=None):
+    """Audit all AnimComponents. Components are ranked by measured time if timings are enabled, by estimated cost otherwise.
+
+    :param character: Audit only components of this character, defaults to None
+    :type character: luna_rig.components.Character, optional
+    :param timings: Sample evaluation timings over time range, defaults to False
+    :type timings: bool, optional
+    :param time_range: Frame range for timings, defaults to None (playback range)
+    :type time_range: tuple, optional
+    :return: Report dictionary with "components" and "characters" keys
+    :rtype: dict
+    """
+    if timings:
+        run_timer(time_range)
+    components = luna_rig.MetaNode.list_nodes(of_type=luna_rig.AnimComponent)
+    if character:
+        components = [comp for comp in components if comp.character == character]
+
+    component_reports = [audit_component(comp, timings=timings) for comp in components]
+    rank_key = "time" if timings else "cost"
+    component_reports.sort(key=lambda report: report[rank_key], reverse=True)
+
+    characters = {}
+    for comp_report in component_reports:
+        char_report = characters.setdefault(str(comp_report["character"]), {"nodes": 0, "cost": 0.0, "categories": {}, "flags": []})
+        char_report["nodes"] += comp_report["nodes"]
+        char_report["cost"] += comp_report["cost"]
+        if timings:
+            char_report["time"] = char_report.get("time", 0.0) + comp_report["time"]
+        for category, count in comp_report["categories"].items():
+            char_report["categories"][category] = char_report["categories"].get(category, 0) + count
+        char_report["flags"] += ["{0}: {1}".format(comp_report["component"], flag) for flag in comp_report["flags"]]
+
+    Logger.info("Audited {0} components.".format(len(component_reports)))
+    return {"ranked_by": rank_key,
+            "components": component_reports,
+            "characters": characters}
+
+
+def write_report(report, file_path):
+    """Write report to json with sorted keys to keep it diffable.
+
+    :param report: Report from audit_rig
+    :type report: dict
+    :param file_path: Output file path
+    :type file_path: str
+    """
+    fileFn.write_json(file_path, data=report, sort_keys=True)
+    Logger.info("Audit report written: {0}".format(file_path))
+
+
+def diff_reports(old_report, new_report):
+    """Compare two reports per component.
+
+    :param old_report: Previous report
+    :type old_report: dict
+    :param new_report: Current report
+    :type new_report: dict
+    :return: Dictionary of {component: {"nodes": delta, "cost": delta, "categories": {category: delta}}}
+    :rtype: dict
+    """
+    old_components = dict([(report["component"], report) for report in old_report["components"]])
+    new_components = dict([(report["component"], report) for report in new_report["components"]])
+    result = {}
+    for name in sorted(set(old_components.keys()) | set(new_components.keys())):
+        old = old_components.get(name, {"nodes": 0, "cost": 0.0, "categories": {}})
+        new = new_components.get(name, {"nodes": 0, "cost": 0.0, "categories": {}})
+        category_deltas = {}
+        for category in set(old["categories"].keys()) | set(new["categories"].keys()):
+            delta = new["categories"].get(category, 0) - old["categories"].get(category, 0)
+            if delta:
+                category_deltas[category] = delta
+        if new["nodes"] != old["nodes"] or category_deltas:
+            result[name] = {"nodes": new["nodes"] - old["nodes"],
+                            "cost": new["cost"] - old["cost"],
+                            "categories": category_deltas}
+    return result
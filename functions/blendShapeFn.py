@@ -1,6 +1,9 @@
 import pymel.core as pm
+import maya.cmds as mc
 import luna_rig
 from luna import Logger
+import luna_rig.functions.apiFn as apiFn
+import luna_rig.functions.meshFn as meshFn
 
 
 # Based on bSpiritCorrective MEL script
@@ -12,11 +15,12 @@ class Corrective:
         self.output_mesh = None  # type: luna_rig.nt.Transform
 
         # Base mesh skin nodes
-        self.skin_clusters = self.base_mesh.listHistory(type="skinCluster")  # type: list
-        self.tweaks = self.base_mesh.listHistory(type="tweak")  # type: list
+        self.skin_clusters = [pm.PyNode(node) for node in apiFn.get_history(self.base_mesh, type_name="skinCluster")]  # type: list
+        self.tweaks = [pm.PyNode(node) for node in apiFn.get_history(self.base_mesh, type_name="tweak")]  # type: list
         if not self.skin_clusters or not self.tweaks:
             Logger.error("Corrective: No skin cluster/tweaks found for {0}".format(self.base_mesh))
             raise ValueError
+        self.blendshapes = [pm.PyNode(node) for node in apiFn.get_history(self.base_mesh, type_name="blendShape")]  # type: list
 
         # Vertex count and names
         # ? Might be better to use world position instead
@@ -114,7 +118,8 @@ class Corrective:
                       rel_vtx_position[0], rel_vtx_position[1], rel_vtx_position[2]]
         return result
 
-    def _get_vtx_data(self):
+    def _get_vtx_data_per_vertex(self):
+        # Fallback without numpy
         for index in range(0, self.base_mesh_vtx_count):
             self.selected_vtx_number_array.append(index)
 
@@ -130,23 +135,35 @@ class Corrective:
             if positions_array[0] == 1:
                 self.vtx_name_array.append(base_mesh_vtx_name)
                 self.tweak_vtx_array.append("{0}.vlist[0].vertex[{1}]".format(str(self.tweaks[0]), self.selected_vtx_number_array[index]))
+                self.abs_positions_array.extend(positions_array[1:4])
+                self.target_positions_array.extend(positions_array[4:7])
+                self.rel_positions_array.extend(positions_array[7:10])
 
-                self.abs_positions_array.append(positions_array[1])
-                self.abs_positions_array.append(positions_array[2])
-                self.abs_positions_array.append(positions_array[3])
-
-                self.target_positions_array.append(positions_array[4])
-                self.target_positions_array.append(positions_array[5])
-                self.target_positions_array.append(positions_array[6])
+    def _get_vtx_data(self):
+        if meshFn.np is None:
+            self._get_vtx_data_per_vertex()
+            return
+        # Read all points at once and find moved ones
+        base_points = meshFn.get_points(self.base_mesh, space="world")
+        pose_points = meshFn.get_points(self.pose_mesh, space="world")
+        moved_indices, target_positions = meshFn.get_deltas(base_points, pose_points, offset=list(self.offset))
+        self.selected_vtx_number_array = list(range(self.base_mesh_vtx_count))
+        if not len(moved_indices):
+            return
+        rel_positions = mc.getAttr("{0}.vtx[0:{1}]".format(self.base_mesh, self.base_mesh_vtx_count - 1))
 
-                self.rel_positions_array.append(positions_array[7])
-                self.rel_positions_array.append(positions_array[8])
-                self.rel_positions_array.append(positions_array[9])
+        # Fill move arrays data
+        for vtx_index, target_position in zip(moved_indices.tolist(), target_positions.tolist()):
+            self.vtx_name_array.append("{0}.vtx[{1}]".format(self.base_mesh, vtx_index))
+            self.tweak_vtx_array.append("{0}.vlist[0].vertex[{1}]".format(str(self.tweaks[0]), vtx_index))
+            self.abs_positions_array.extend(base_points[vtx_index].tolist())
+            self.target_positions_array.extend(target_position)
+            self.rel_positions_array.extend(rel_positions[vtx_index])
 
     def _duplicate_mesh(self):
         for skin in self.skin_clusters:
             skin.nodeState.set(1)
-        for bs_node in pm.listHistory(self.base_mesh, type="blendShape"):
+        for bs_node in self.blendshapes:
             bs_node.nodeState.set(1)
 
         self.output_mesh = pm.duplicate(self.base_mesh, rr=1, rc=1)[0]
@@ -162,7 +179,7 @@ class Corrective:
 
         for skin in self.skin_clusters:
             skin.nodeState.set(0)
-        for bs in pm.listHistory(self.base_mesh, type="blendShape"):
+        for bs in self.blendshapes:
             bs.nodeState.set(0)
 
     @classmethod
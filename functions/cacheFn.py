@@ -0,0 +1,213 @@
+import itertools
+import maya.OpenMaya as om
+from luna import Logger
+
+
+class SceneEvent(object):
+    NAME_CHANGED = "name_changed"
+    CONNECTION = "connection"
+    DAG_CHANGED = "dag_changed"
+    NODE_ADDED = "node_added"
+    NODE_REMOVED = "node_removed"
+
+
+# Event name -> list of functions to call
+_LISTENERS = {}
+# Event name -> Maya callback id
+_CALLBACK_IDS = {}
+_SCENE_CALLBACK_IDS = []
+# Node hash code -> connection generation. Numbers are never reused.
+_NODE_GENERATIONS = {}
+_GENERATION_COUNTER = itertools.count(1)
+# Node hash code -> list of Maya callback ids
+_NODE_CALLBACK_IDS = {}
+
+
+def _notify(event):
+    for listener in _LISTENERS.get(event, []):
+        listener()
+
+
+def _notify_all():
+    for event in list(_LISTENERS.keys()):
+        _notify(event)
+
+
+def _install_callback(event):
+    """Register Maya API callback for event if not registered yet.
+
+    :param event: Event name
+    :type event: str
+    """
+    if event in _CALLBACK_IDS:
+        return
+
+    def handler(*args):
+        _notify(event)
+
+    if event == SceneEvent.NAME_CHANGED:
+        callback_id = om.MNodeMessage.addNameChangedCallback(om.MObject(), handler)
+    elif event == SceneEvent.CONNECTION:
+        callback_id = om.MDGMessage.addConnectionCallback(handler)
+    elif event == SceneEvent.DAG_CHANGED:
+        callback_id = om.MDagMessage.addAllDagChangesCallback(handler)
+    elif event == SceneEvent.NODE_ADDED:
+        callback_id = om.MDGMessage.addNodeAddedCallback(handler, "dependNode")
+    elif event == SceneEvent.NODE_REMOVED:
+        callback_id = om.MDGMessage.addNodeRemovedCallback(handler, "dependNode")
+    else:
+        raise ValueError("Unknown scene event: {0}".format(event))
+    _CALLBACK_IDS[event] = callback_id
+
+    _install_scene_callbacks()
+
+
+def _on_scene_reset(*args):
+    _remove_node_callbacks()
+    _notify_all()
+
+
+def _install_scene_callbacks():
+    # Everything is invalid after new scene or file open
+    if not _SCENE_CALLBACK_IDS:
+        for message in [om.MSceneMessage.kBeforeNew, om.MSceneMessage.kBeforeOpen]:
+            _SCENE_CALLBACK_IDS.append(om.MSceneMessage.addCallback(message, _on_scene_reset))
+
+
+def _remove_node_callbacks(node_key=None):
+    keys = [node_key] if node_key is not None else list(_NODE_CALLBACK_IDS.keys())
+    for key in keys:
+        for callback_id in _NODE_CALLBACK_IDS.pop(key, []):
+            try:
+                om.MMessage.removeCallback(callback_id)
+            except RuntimeError:
+                Logger.exception("Failed to remove callback {0}".format(callback_id))
+        _NODE_GENERATIONS.pop(key, None)
+
+
+def get_node_generation(mobject):
+    """Get connection generation of node. Generation changes every time
+    any attribute of the node is connected or disconnected.
+
+    :param mobject: Node
+    :type mobject: om.MObject
+    :return: Generation number
+    :rtype: int
+    """
+    node_key = om.MObjectHandle(mobject).hashCode()
+    if node_key not in _NODE_CALLBACK_IDS:
+        _install_scene_callbacks()
+        connection_flags = om.MNodeMessage.kConnectionMade | om.MNodeMessage.kConnectionBroken
+
+        def on_attribute_changed(message, *args):
+            if message & connection_flags:
+                _NODE_GENERATIONS[node_key] = next(_GENERATION_COUNTER)
+
+        def on_removed(*args):
+            _remove_node_callbacks(node_key)
+
+        _NODE_CALLBACK_IDS[node_key] = [om.MNodeMessage.addAttributeChangedCallback(mobject, on_attribute_changed),
+                                        om.MNodeMessage.addNodePreRemovalCallback(mobject, on_removed)]
+        _NODE_GENERATIONS[node_key] = next(_GENERATION_COUNTER)
+    return _NODE_GENERATIONS[node_key]
+
+
+def bump_node_generation(mobject):
+    """Explicitly invalidate anything cached against node generation.
+
+    :param mobject: Node
+    :type mobject: om.MObject
+    """
+    node_key = om.MObjectHandle(mobject).hashCode()
+    if node_key in _NODE_GENERATIONS:
+        _NODE_GENERATIONS[node_key] = next(_GENERATION_COUNTER)
+
+
+def subscribe(event, listener):
+    """Call listener every time scene event happens.
+
+    :param event: Event name, one of SceneEvent values.
+    :type event: str
+    :param listener: Function without arguments.
+    :type listener: callable
+    """
+    _install_callback(event)
+    _LISTENERS.setdefault(event, []).append(listener)
+
+
+def remove_callbacks():
+    """Remove all registered Maya callbacks."""
+    for callback_id in list(_CALLBACK_IDS.values()) + _SCENE_CALLBACK_IDS:
+        try:
+            om.MMessage.removeCallback(callback_id)
+        except RuntimeError:
+            Logger.exception("Failed to remove callback {0}".format(callback_id))
+    _CALLBACK_IDS.clear()
+    del _SCENE_CALLBACK_IDS[:]
+    _remove_node_callbacks()
+
+
+class SceneCache(object):
+    """Dictionary that is cleared when any of the given scene events happen."""
+
+    def __repr__(self):
+        return "SceneCache({0})".format(self.name)
+
+    def __init__(self, name, events=[]):
+        """
+        :param name: Cache name, used for reporting.
+        :type name: str
+        :param events: Scene events that invalidate the cache, defaults to []
+        :type events: list[str], optional
+        """
+        self.name = name
+        self.events = list(events)
+        self.hits = 0
+        self.misses = 0
+        self._data = {}
+        for event in self.events:
+            subscribe(event, self.clear)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        if key in self._data:
+            self.hits += 1
+            return self._data[key]
+        self.misses += 1
+        return default
+
+    def set(self, key, value):
+        self._data[key] = value
+        return value
+
+    def get_or_create(self, key, factory):
+        """Get cached value or store the one returned by factory.
+
+        :param key: Cache key
+        :type key: hashable
+        :param factory: Function without arguments creating value.
+        :type factory: callable
+        :return: Cached value
+        """
+        if key in self._data:
+            self.hits += 1
+            return self._data[key]
+        self.misses += 1
+        return self.set(key, factory())
+
+    def pop(self, key, default=None):
+        return self._data.pop(key, default)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        return {"name": self.name,
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses}
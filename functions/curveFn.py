@@ -1,7 +1,12 @@
 import pymel.core as pm
+import maya.api.OpenMaya as om2
 from luna import Logger
 import luna_rig
 from luna_rig.functions import transformFn
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 def get_curve_data(curve):
@@ -26,6 +31,187 @@ def get_curve_data(curve):
     return data_dict
 
 
+class CurveSampler(object):
+    """Evaluates NURBS curve from its CV and knot data. All parameters are evaluated in one vectorized pass.
+
+    Spacing modes:
+        "param" - uniform parameter, same as pointOnCurve with turnOnPercentage.
+        "length" - uniform arc length.
+    """
+
+    SPACINGS = ["param", "length"]
+
+    def __repr__(self):
+        return "CurveSampler(degree={0}, cvs={1})".format(self.degree, len(self.points))
+
+    def __init__(self, points, knots, degree, resolution=256):
+        """
+        :param points: Control points
+        :type points: list[list[float]]
+        :param knots: Knot vector in Maya format (number of CVs + degree - 1 knots)
+        :type knots: list[float]
+        :param degree: Curve degree
+        :type degree: int
+        :param resolution: Number of samples in arc length table, defaults to 256
+        :type resolution: int, optional
+        """
+        if np is None:
+            Logger.error("CurveSampler requires numpy to be available in Maya's python.")
+            raise RuntimeError("numpy is not available")
+        self.points = np.array(points, dtype=float)[:, :3]
+        self.degree = int(degree)
+        # Maya omits first and last knots
+        self.knots = np.concatenate([[knots[0]], np.array(knots, dtype=float), [knots[-1]]])
+        self.domain = (self.knots[self.degree], self.knots[len(self.points)])
+        self.resolution = resolution
+        self._length_table = None
+
+    @classmethod
+    def from_curve(cls, curve, space="world", **kwargs):
+        """Create sampler from scene curve.
+
+        :param curve: Curve transform or shape
+        :type curve: str or PyNode
+        :param space: Points space, "world" or "object", defaults to "world"
+        :type space: str, optional
+        :rtype: CurveSampler
+        """
+        sel_list = om2.MSelectionList()
+        sel_list.add(str(curve))
+        dag_path = sel_list.getDagPath(0)
+        if not dag_path.hasFn(om2.MFn.kNurbsCurve):
+            dag_path.extendToShape()
+        fn_curve = om2.MFnNurbsCurve(dag_path)
+        mspace = om2.MSpace.kWorld if space == "world" else om2.MSpace.kObject
+        points = [[pt.x, pt.y, pt.z] for pt in fn_curve.cvPositions(mspace)]
+        return cls(points, list(fn_curve.knots()), fn_curve.degree, **kwargs)
+
+    @classmethod
+    def from_data(cls, data, **kwargs):
+        """Create sampler from curve data dictionary (see get_curve_data).
+
+        :param data: Dictionary with "points", "knots" and "degree" keys.
+        :type data: dict
+        :rtype: CurveSampler
+        """
+        return cls(data["points"], data["knots"], data["degree"], **kwargs)
+
+    def evaluate(self, params):
+        """Evaluate curve points at parameters using de Boor's algorithm.
+
+        :param params: Curve parameters
+        :type params: list[float] or numpy.ndarray
+        :return: Points array of shape (N, 3)
+        :rtype: numpy.ndarray
+        """
+        degree = self.degree
+        knots = self.knots
+        params = np.clip(np.asarray(params, dtype=float), self.domain[0], self.domain[1])
+        spans = np.searchsorted(knots, params, side="right") - 1
+        spans = np.clip(spans, degree, len(self.points) - 1)
+        # (N, degree + 1, 3) points affecting each parameter
+        cv_indices = spans[:, None] - degree + np.arange(degree + 1)[None, :]
+        result = self.points[cv_indices]
+        for level in range(1, degree + 1):
+            for j in range(degree, level - 1, -1):
+                knot_index = spans - degree + j
+                start = knots[knot_index]
+                denom = knots[knot_index + 1 + degree - level] - start
+                alpha = np.divide(params - start, denom, out=np.zeros_like(params), where=denom != 0)
+                result[:, j] = (1.0 - alpha)[:, None] * result[:, j - 1] + alpha[:, None] * result[:, j]
+        return result[:, degree]
+
+    def tangents(self, params):
+        """Normalized tangents at parameters.
+
+        :param params: Curve parameters
+        :type params: list[float] or numpy.ndarray
+        :return: Tangents array of shape (N, 3)
+        :rtype: numpy.ndarray
+        """
+        params = np.asarray(params, dtype=float)
+        delta = (self.domain[1] - self.domain[0]) * 1e-4
+        before = np.clip(params - delta, self.domain[0], self.domain[1])
+        after = np.clip(params + delta, self.domain[0], self.domain[1])
+        tangents = self.evaluate(after) - self.evaluate(before)
+        lengths = np.linalg.norm(tangents, axis=1)
+        lengths[lengths == 0] = 1.0
+        return tangents / lengths[:, None]
+
+    @property
+    def length_table(self):
+        """Parameters and cumulative arc lengths used for length parametrization.
+
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        if self._length_table is None:
+            params = np.linspace(self.domain[0], self.domain[1], self.resolution)
+            points = self.evaluate(params)
+            lengths = np.concatenate([[0.0], np.cumsum(np.linalg.norm(np.diff(points, axis=0), axis=1))])
+            self._length_table = (params, lengths)
+        return self._length_table
+
+    def length(self):
+        return float(self.length_table[1][-1])
+
+    def params_at_fractions(self, fractions, spacing="param"):
+        """Convert 0-1 fractions to curve parameters.
+
+        :param fractions: Fractions along the curve
+        :type fractions: list[float] or numpy.ndarray
+        :param spacing: "param" or "length", defaults to "param"
+        :type spacing: str, optional
+        :rtype: numpy.ndarray
+        """
+        fractions = np.asarray(fractions, dtype=float)
+        if spacing == "param":
+            return self.domain[0] + fractions * (self.domain[1] - self.domain[0])
+        elif spacing == "length":
+            params, lengths = self.length_table
+            return np.interp(fractions * lengths[-1], lengths, params)
+        raise ValueError("Invalid spacing: {0}. Valid: {1}".format(spacing, self.SPACINGS))
+
+    def sample(self, count, spacing="param"):
+        """Evaluate evenly distributed points, including both curve ends.
+
+        :param count: Number of points
+        :type count: int
+        :param spacing: "param" or "length", defaults to "param"
+        :type spacing: str, optional
+        :return: Parameters and points of shape (N, 3)
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        fractions = np.linspace(0.0, 1.0, count) if count > 1 else np.zeros(count)
+        params = self.params_at_fractions(fractions, spacing=spacing)
+        return params, self.evaluate(params)
+
+
+def sample_points(curve, count, spacing="param"):
+    """Get evenly distributed world space points on curve.
+    Falls back to pointOnCurve queries if numpy is not available.
+
+    :param curve: Curve transform or shape
+    :type curve: str or PyNode
+    :param count: Number of points
+    :type count: int
+    :param spacing: "param" or "length", defaults to "param"
+    :type spacing: str, optional
+    :return: List of points
+    :rtype: list[list[float]]
+    """
+    if np is not None:
+        return CurveSampler.from_curve(curve).sample(count, spacing=spacing)[1].tolist()
+
+    fractions = [float(index) / float(count - 1) if count > 1 else 0.0 for index in range(count)]
+    if spacing == "length":
+        shape = pm.PyNode(curve)
+        if not isinstance(shape, luna_rig.nt.NurbsCurve):
+            shape = shape.getShape()
+        curve_length = shape.length()
+        return [list(shape.getPointAtParam(shape.findParamFromLength(curve_length * fraction), space="world")) for fraction in fractions]
+    return [list(pm.pointOnCurve(curve, pr=fraction, top=1)) for fraction in fractions]
+
+
 def curve_from_points(name, degree=1, points=[], parent=None):
     knot_len = len(points) + degree - 1
     knot_vecs = [v for v in range(knot_len)]
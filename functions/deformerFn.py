@@ -1,7 +1,10 @@
+from collections import OrderedDict
 import pymel.core as pm
 import maya.cmds as mc
 from luna import Logger
 import luna_rig
+import luna_rig.functions.apiFn as apiFn
+import luna_rig.functions.cacheFn as cacheFn
 
 
 class Twist(object):
@@ -83,17 +86,95 @@ def is_painted(deformer_node):
 
 
 def get_deformer(node, type):
-    def_list = pm.listHistory(node, type=type)
-    return def_list[0] if def_list else None
+    def_list = apiFn.get_history(node, type_name=type)
+    return pm.PyNode(def_list[0]) if def_list else None
+
+
+class DeformerInventory(object):
+    """Deformer stacks of all geometry under a group, gathered with one history query per shape."""
+
+    def __repr__(self):
+        return "DeformerInventory({0})".format(self.group)
+
+    def __init__(self, under_group=None):
+        self.group = str(under_group) if under_group else None
+        self.geometry_deformers = OrderedDict()  # type: OrderedDict
+        self.deformers = OrderedDict()  # type: OrderedDict
+        self.collect()
+
+    @classmethod
+    def get(cls, under_group=None, refresh=False):
+        """Get cached inventory. Cache is cleared when scene graph changes.
+
+        :param under_group: Group to collect geometry under, defaults to None (all scene geometry)
+        :type under_group: str or PyNode, optional
+        :param refresh: Collect new inventory, defaults to False
+        :type refresh: bool, optional
+        :rtype: DeformerInventory
+        """
+        cache_key = str(under_group) if under_group else None
+        if refresh:
+            _INVENTORY_CACHE.pop(cache_key)
+        return _INVENTORY_CACHE.get_or_create(cache_key, lambda: cls(under_group))
+
+    def collect(self):
+        self.geometry_deformers.clear()
+        self.deformers.clear()
+        if self.group:
+            descendants = mc.listRelatives(self.group, ad=1, f=1) or []
+            shapes = mc.ls(descendants, shapes=True, noIntermediate=True, long=True) if descendants else []
+        else:
+            shapes = mc.ls(type="deformableShape", noIntermediate=True, long=True)
+        for shape in shapes:
+            history = mc.listHistory(shape) or []
+            deformer_set = set(mc.ls(history, type="geometryFilter")) if history else set()
+            stack = [node for node in history if node in deformer_set]
+            self.geometry_deformers[shape] = stack
+            for deformer_node in stack:
+                self.deformers[deformer_node] = None
+
+    def list_deformers(self, type=None):
+        """Get deformers of given type in discovery order.
+
+        :param type: Deformer node type, inherited types are included, defaults to None (all)
+        :type type: str, optional
+        :return: Deformer nodes
+        :rtype: list[PyNode]
+        """
+        names = list(self.deformers.keys())
+        if type and names:
+            matching = set(mc.ls(names, type=type))
+            names = [name for name in names if name in matching]
+        elif type:
+            names = []
+        return [pm.PyNode(name) for name in names]
+
+    def get_stack(self, geometry):
+        """Get deformers order for geometry, from last applied to first.
+
+        :param geometry: Geometry transform or shape
+        :type geometry: str or PyNode
+        :return: Deformer names
+        :rtype: list[str]
+        """
+        # Same long names as collect
+        shapes = mc.ls(str(geometry), shapes=True, noIntermediate=True, long=True)
+        if not shapes:
+            shapes = mc.ls(mc.listRelatives(str(geometry), s=True, ni=True, f=True) or [], long=True)
+        if not shapes:
+            return []
+        return list(self.geometry_deformers.get(shapes[0], []))
+
+
+# Group name -> DeformerInventory
+_INVENTORY_CACHE = cacheFn.SceneCache("deformer_inventory", events=[cacheFn.SceneEvent.CONNECTION,
+                                                                    cacheFn.SceneEvent.NODE_REMOVED,
+                                                                    cacheFn.SceneEvent.NAME_CHANGED])
 
 
 def list_deformers(type, under_group=None):
-    deformers_list = []
     if under_group:
-        for child_node in pm.listRelatives(under_group, ad=1):
-            for deformer_node in child_node.listHistory(type=type):
-                if deformer_node not in deformers_list:
-                    deformers_list.append(deformer_node)
+        deformers_list = DeformerInventory.get(under_group).list_deformers(type)
     else:
         deformers_list = pm.ls(typ=type)
     return deformers_list
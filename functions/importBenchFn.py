@@ -0,0 +1,172 @@
+"""Import time benchmark that runs outside of Maya. Maya, pymel and luna modules are replaced with stubs,
+so only luna_rig's own import cost is measured. Only standard library is used here.
+
+Usage:
+    python importBenchFn.py --runs 20 --max-seconds 0.5
+"""
+
+import os
+import sys
+import json
+import types
+import timeit
+import argparse
+import subprocess
+
+# Top level packages replaced with stubs
+STUBBED_PACKAGES = ["maya", "pymel", "luna", "shiboken2", "ngSkinTools", "ngSkinTools2"]
+# Case name -> statements to time
+CASES = {
+    "import": "import luna_rig",
+    "components": "import luna_rig; luna_rig.components.Character",
+    "importexport": "import luna_rig.importexport; luna_rig.importexport.SkinManager",
+}
+
+
+class _StubMeta(type):
+    """Stub classes return new stubs for any attribute and for calls, and can be subclassed."""
+
+    def __getattr__(cls, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _StubMeta(name, (cls,), {})
+
+    def __call__(cls, *args, **kwargs):
+        return cls
+
+    def __iter__(cls):
+        return iter([])
+
+
+_Stub = _StubMeta("_Stub", (object,), {})
+
+
+class _StubModule(types.ModuleType):
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _StubMeta(name, (_Stub,), {})
+
+
+class _StubFinder(object):
+    """Meta path finder/loader creating stub modules for STUBBED_PACKAGES."""
+
+    def find_module(self, fullname, path=None):
+        if fullname.split(".")[0] in STUBBED_PACKAGES:
+            return self
+        return None
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname.split(".")[0] not in STUBBED_PACKAGES:
+            return None
+        import importlib.util
+        return importlib.util.spec_from_loader(fullname, self, is_package=True)
+
+    def create_module(self, spec):
+        module = _StubModule(spec.name)
+        module.__path__ = []
+        return module
+
+    def exec_module(self, module):
+        pass
+
+    def load_module(self, fullname):
+        module = sys.modules.setdefault(fullname, _StubModule(fullname))
+        module.__path__ = []
+        module.__loader__ = self
+        return module
+
+
+def install_stubs():
+    sys.meta_path.insert(0, _StubFinder())
+
+
+def _run_child(case):
+    install_stubs()
+    start_time = timeit.default_timer()
+    exec(CASES[case], {})
+    elapsed = timeit.default_timer() - start_time
+    luna_rig_modules = [name for name in sys.modules.keys() if name.startswith("luna_rig")]
+    sys.stdout.write(json.dumps({"time": elapsed, "modules": len(luna_rig_modules)}))
+
+
+def measure(case, runs=10, eager=False, path=None):
+    """Time case in fresh interpreters.
+
+    :param case: Case name from CASES
+    :type case: str
+    :param runs: Number of interpreters to start, defaults to 10
+    :type runs: int, optional
+    :param eager: Disable lazy imports, defaults to False
+    :type eager: bool, optional
+    :param path: Directory containing luna_rig package, defaults to None (parent of this package)
+    :type path: str, optional
+    :return: Dictionary with "min", "median", "max" seconds and number of imported luna_rig "modules"
+    :rtype: dict
+    """
+    if not path:
+        path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([path] + [each for each in [env.get("PYTHONPATH")] if each])
+    env["PYTHONDONTWRITEBYTECODE"] = ""
+    env.pop("LUNA_RIG_EAGER_IMPORT", None)
+    if eager:
+        env["LUNA_RIG_EAGER_IMPORT"] = "1"
+    times = []
+    modules = 0
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__), "--child", case], env=env)
+        result = json.loads(output.decode("utf-8"))
+        times.append(result["time"])
+        modules = result["modules"]
+    times.sort()
+    return {"min": times[0],
+            "median": times[len(times) // 2],
+            "max": times[-1],
+            "modules": modules}
+
+
+def benchmark(runs=10, path=None):
+    """Measure all cases with lazy and eager imports.
+
+    :param runs: Runs per case, defaults to 10
+    :type runs: int, optional
+    :param path: Directory containing luna_rig package, defaults to None
+    :type path: str, optional
+    :return: Dictionary of {case: {"lazy": result, "eager": result}}
+    :rtype: dict
+    """
+    results = {}
+    for case in sorted(CASES.keys()):
+        results[case] = {"lazy": measure(case, runs=runs, eager=False, path=path),
+                         "eager": measure(case, runs=runs, eager=True, path=path)}
+    return results
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="luna_rig import time benchmark")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--path", default=None, help="Directory containing luna_rig package")
+    parser.add_argument("--max-seconds", type=float, default=None, help="Fail if lazy import median is slower")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(args)
+    if args.child:
+        _run_child(args.child)
+        return 0
+
+    results = benchmark(runs=args.runs, path=args.path)
+    for case, case_results in sorted(results.items()):
+        sys.stdout.write("{0}: lazy {1:.4f}s ({2} modules), eager {3:.4f}s ({4} modules)\n".format(case,
+                                                                                                  case_results["lazy"]["median"],
+                                                                                                  case_results["lazy"]["modules"],
+                                                                                                  case_results["eager"]["median"],
+                                                                                                  case_results["eager"]["modules"]))
+    if args.max_seconds is not None and results["import"]["lazy"]["median"] > args.max_seconds:
+        sys.stdout.write("Import time {0:.4f}s exceeds {1}s\n".format(results["import"]["lazy"]["median"], args.max_seconds))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
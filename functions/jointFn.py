@@ -1,11 +1,15 @@
 from __future__ import division
 import pymel.core as pm
 import pymel.api as pma
+import maya.cmds as mc
 from luna import Logger
 import luna_rig
 import luna.static as static
 import luna_rig.functions.nameFn as nameFn
 import luna_rig.functions.nodeFn as nodeFn
+import luna_rig.functions.transformFn as transformFn
+import luna_rig.functions.cacheFn as cacheFn
+import luna_rig.functions.curveFn as curveFn
 
 
 def duplicate_chain(original_chain=[],
@@ -44,6 +48,177 @@ def duplicate_chain(original_chain=[],
     return new_chain
 
 
+class SkeletonTopology(object):
+    """Joint hierarchy stored as parent index array. Built with one scene query or from serialized data."""
+
+    def __repr__(self):
+        return "SkeletonTopology({0}, {1} joints)".format(self.names[0] if self.names else None, len(self.names))
+
+    def __init__(self, names, parents):
+        """
+        :param names: Joint full path names, parents must come before children.
+        :type names: list[str]
+        :param parents: Parent index for each joint, -1 for roots.
+        :type parents: list[int]
+        """
+        self.names = list(names)
+        self.parents = list(parents)
+        self.indices = dict([(name, index) for index, name in enumerate(self.names)])
+        # Short names lookup
+        self.short_indices = {}
+        for index, name in enumerate(self.names):
+            self.short_indices.setdefault(name.split("|")[-1], index)
+        self.children = [[] for _ in self.names]
+        for index, parent_index in enumerate(self.parents):
+            if parent_index >= 0:
+                self.children[parent_index].append(index)
+        self.depths = []
+        for parent_index in self.parents:
+            self.depths.append(self.depths[parent_index] + 1 if parent_index >= 0 else 0)
+
+    @classmethod
+    def from_scene(cls, root_joint):
+        """Read joint hierarchy under root joint.
+
+        :param root_joint: Top joint of the hierarchy
+        :type root_joint: str or PyNode
+        :rtype: SkeletonTopology
+        """
+        root_name = mc.ls(str(root_joint), long=True)[0]
+        descendants = mc.listRelatives(root_name, ad=True, type="joint", f=True) or []
+        # Full paths sorted by depth keep parents before children
+        names = [root_name] + sorted(descendants, key=lambda path: path.count("|"))
+        indices = dict([(name, index) for index, name in enumerate(names)])
+        parents = [indices.get(name.rsplit("|", 1)[0], -1) for name in names]
+        return cls(names, parents)
+
+    @classmethod
+    def from_data(cls, data):
+        """Create from serialized data.
+
+        :param data: Dictionary with "names" and "parents" lists.
+        :type data: dict
+        :rtype: SkeletonTopology
+        """
+        return cls(data["names"], data["parents"])
+
+    @classmethod
+    def get(cls, joint, refresh=False):
+        """Get cached topology of hierarchy joint belongs to. Cache is cleared when DAG changes.
+
+        :param joint: Any joint in the hierarchy
+        :type joint: str or PyNode
+        :param refresh: Read hierarchy again, defaults to False
+        :type refresh: bool, optional
+        :rtype: SkeletonTopology
+        """
+        joint_path = mc.ls(str(joint), long=True)[0]
+        # Walk up while parents are joints
+        path_parts = joint_path.split("|")
+        ancestors = ["|".join(path_parts[:index]) for index in range(2, len(path_parts))]
+        joint_ancestors = set(mc.ls(ancestors, type="joint", long=True) or []) if ancestors else set()
+        root_path = joint_path
+        for parent_path in reversed(ancestors):
+            if parent_path not in joint_ancestors:
+                break
+            root_path = parent_path
+        if refresh:
+            _TOPOLOGY_CACHE.pop(root_path)
+        return _TOPOLOGY_CACHE.get_or_create(root_path, lambda: cls.from_scene(root_path))
+
+    def as_data(self):
+        return {"names": self.names, "parents": self.parents}
+
+    def index(self, joint):
+        """Get joint index from full path, short name or PyNode.
+
+        :param joint: Joint
+        :type joint: str or PyNode
+        :raises KeyError: If joint is not part of this topology.
+        :rtype: int
+        """
+        if isinstance(joint, pm.PyNode):
+            joint = joint.longName()
+        joint = str(joint)
+        if joint in self.indices:
+            return self.indices[joint]
+        return self.short_indices[joint.split("|")[-1]]
+
+    def path_to_root(self, joint):
+        """Indices from joint up to its root, joint included.
+
+        :rtype: list[int]
+        """
+        path = []
+        current = self.index(joint)
+        while current >= 0:
+            path.append(current)
+            current = self.parents[current]
+        return path
+
+    def chain(self, start_joint, end_joint):
+        """Joints from start to end joint, both included.
+
+        :raises ValueError: If end joint is not a descendant of start joint.
+        :rtype: list[str]
+        """
+        start_index = self.index(start_joint)
+        path = self.path_to_root(end_joint)
+        if start_index not in path:
+            raise ValueError("{0} is not a descendant of {1}".format(end_joint, start_joint))
+        chain = path[:path.index(start_index) + 1]
+        chain.reverse()
+        return [self.names[index] for index in chain]
+
+    def branch(self, start_joint):
+        """Joints from start joint following first child until end of the branch.
+
+        :rtype: list[str]
+        """
+        current = self.index(start_joint)
+        branch = [current]
+        while self.children[current]:
+            current = self.children[current][0]
+            branch.append(current)
+        return [self.names[index] for index in branch]
+
+    def subtree(self, start_joint):
+        """Start joint and all its descendants in depth first order.
+
+        :rtype: list[str]
+        """
+        result = []
+        stack = [self.index(start_joint)]
+        while stack:
+            current = stack.pop()
+            result.append(current)
+            stack.extend(reversed(self.children[current]))
+        return [self.names[index] for index in result]
+
+    def common_ancestor(self, first_joint, second_joint):
+        """Closest joint both joints descend from.
+
+        :return: Joint name or None if joints are in different hierarchies.
+        :rtype: str
+        """
+        first = self.index(first_joint)
+        second = self.index(second_joint)
+        while self.depths[first] > self.depths[second]:
+            first = self.parents[first]
+        while self.depths[second] > self.depths[first]:
+            second = self.parents[second]
+        while first != second and first >= 0:
+            first = self.parents[first]
+            second = self.parents[second]
+        return self.names[first] if first >= 0 else None
+
+
+# Root joint path -> SkeletonTopology
+_TOPOLOGY_CACHE = cacheFn.SceneCache("skeleton_topology", events=[cacheFn.SceneEvent.DAG_CHANGED,
+                                                                  cacheFn.SceneEvent.NODE_REMOVED,
+                                                                  cacheFn.SceneEvent.NAME_CHANGED])
+
+
 def joint_chain(start_joint, end_joint=None):
     """Get joint chain from start joint. Optionally slice the chain at end joint.
 
@@ -56,20 +231,14 @@ def joint_chain(start_joint, end_joint=None):
     """
     start_joint = pm.PyNode(start_joint)
     assert isinstance(start_joint, luna_rig.nt.Joint), "{0} is not a joint".format(start_joint)
-    start_joint = pm.PyNode(start_joint)  # type: luna_rig.nt.Joint
-    chain = start_joint.getChildren(type="joint", ad=1) + [start_joint]
-    chain.reverse()
+    topology = SkeletonTopology.get(start_joint)
     if not end_joint:
-        return chain
+        return [pm.PyNode(name) for name in topology.subtree(start_joint)]
 
     # Handle end joint
     assert pm.nodeType(end_joint) == 'joint', "{0} is not a joint".format(end_joint)
     end_joint = pm.PyNode(end_joint)
-    cut_chain = []
-    for jnt in chain:
-        if str(jnt) in end_joint.fullPath().split("|"):
-            cut_chain.append(jnt)
-    return cut_chain
+    return [pm.PyNode(name) for name in topology.chain(start_joint, end_joint)]
 
 
 def create_chain(joint_list=[], reverse=False):
@@ -88,12 +257,13 @@ def reverse_chain(joint_list=[]):
     create_chain(joint_list)
 
 
-def mirror_chain(chains=[]):
+def mirror_chain(chains=[], across="yz", behaviour=True):
     if not chains:
         chains = pm.selected()
+    across = transformFn.validate_mirror_plane(across)
     valid_chains = [obj for obj in chains if isinstance(obj, luna_rig.nt.Joint)]
     for joint in valid_chains:
-        result_chain = pm.mirrorJoint(joint, mb=1, myz=1)
+        result_chain = pm.mirrorJoint(joint, mb=behaviour, **{"m" + across: 1})
         try:
             for new_joint in result_chain:
                 new_joint = pm.PyNode(new_joint)
@@ -105,14 +275,51 @@ def mirror_chain(chains=[]):
             Logger.exception("Failed to rename")
 
 
-def along_curve(curve, amount, joint_name="joint", joint_side="c", joint_suffix="jnt", delete_curve=False):
-    joints = []
-    for index in range(amount):
-        param = float(index) / float(amount - 1)
-        point = pm.pointOnCurve(curve, pr=param, top=1)
-        jnt = pm.createNode("joint", n=nameFn.generate_name(joint_name, joint_side, joint_suffix))  # type: luna_rig.nt.Joint
-        jnt.setTranslation(point, space="world")
-        joints.append(jnt)
+def along_curve(curve,
+                amount,
+                joint_name="joint",
+                joint_side="c",
+                joint_suffix="jnt",
+                delete_curve=False,
+                spacing="param",
+                orient=False,
+                up_vector=(0, 1, 0)):
+    """Create joints along curve. Positions are evaluated in one pass by curveFn.CurveSampler.
+
+    :param curve: Curve to create joints on.
+    :type curve: str or PyNode
+    :param amount: Number of joints
+    :type amount: int
+    :param spacing: Joints spacing, "param" or "length", defaults to "param"
+    :type spacing: str, optional
+    :param orient: Aim joints X axis to the next joint, defaults to False
+    :type orient: bool, optional
+    :param up_vector: Up vector used for orientation, defaults to (0, 1, 0)
+    :type up_vector: tuple, optional
+    :return: Created joints
+    :rtype: list[luna_rig.nt.Joint]
+    """
+    points = curveFn.sample_points(curve, amount, spacing=spacing)
+    names = nameFn.generate_names(joint_name, joint_side, joint_suffix, amount)
+    joint_names = []
+    for name, point in zip(names, points):
+        jnt = mc.createNode("joint", n=name)
+        mc.xform(jnt, t=point, ws=True)
+        joint_names.append(jnt)
+
+    if orient and len(points) > 1:
+        up_vector = pm.dt.Vector(up_vector)
+        for index, jnt in enumerate(joint_names):
+            if index < len(points) - 1:
+                aim_vector = (pm.dt.Vector(points[index + 1]) - pm.dt.Vector(points[index])).normal()
+            x_axis = aim_vector
+            z_axis = (x_axis ^ up_vector).normal()
+            y_axis = z_axis ^ x_axis
+            matrix = list(x_axis) + [0.0] + list(y_axis) + [0.0] + list(z_axis) + [0.0] + list(points[index]) + [1.0]
+            mc.xform(jnt, m=matrix, ws=True)
+        mc.makeIdentity(joint_names, apply=True, r=True)
+
+    joints = [pm.PyNode(jnt) for jnt in joint_names]
     if delete_curve:
         pm.delete(curve)
     return joints
@@ -0,0 +1,61 @@
+"""Lazy module attributes. Only standard library is imported here, as this module is used by package __init__ files."""
+
+import os
+import sys
+import importlib
+
+# Set to import everything on package import, e.g. to catch import errors early.
+EAGER_ENV_VAR = "LUNA_RIG_EAGER_IMPORT"
+
+
+def is_lazy_supported():
+    """Module level __getattr__ (PEP 562) requires python 3.7+"""
+    return sys.version_info >= (3, 7) and not os.environ.get(EAGER_ENV_VAR)
+
+
+def resolve(path):
+    """Import object from "module.path:Attribute" string. Module itself is returned if attribute is omitted.
+
+    :param path: Object path
+    :type path: str
+    :return: Imported object
+    """
+    if ":" not in path:
+        return importlib.import_module(path)
+    module_path, attr_name = path.split(":", 1)
+    return getattr(importlib.import_module(module_path), attr_name)
+
+
+def install(module_name, attributes):
+    """Load module attributes on first access.
+    On python older than 3.7 attributes are imported immediately.
+
+    :param module_name: Module to add attributes to, usually __name__
+    :type module_name: str
+    :param attributes: List of (attribute name, "module.path:Attribute" or "module.path") pairs in eager import order
+    :type attributes: list[tuple]
+    """
+    module = sys.modules[module_name]
+    if not is_lazy_supported():
+        for attr_name, path in attributes:
+            setattr(module, attr_name, resolve(path))
+        return
+    import importlib.util
+    attributes = dict(attributes)
+
+    def __getattr__(attr_name):
+        path = attributes.get(attr_name)
+        if path is None:
+            # Not yet imported submodule
+            if importlib.util.find_spec("{0}.{1}".format(module_name, attr_name)) is None:
+                raise AttributeError("module {0} has no attribute {1}".format(module_name, attr_name))
+            path = "{0}.{1}".format(module_name, attr_name)
+        value = resolve(path)
+        setattr(module, attr_name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(list(module.__dict__.keys()) + list(attributes.keys())))
+
+    module.__getattr__ = __getattr__
+    module.__dir__ = __dir__
@@ -0,0 +1,177 @@
+"""Rig manifest reader. Manifest is written by Character.write_manifest next to the rig scene
+and can be queried without Maya. Only standard library is used here.
+
+Example:
+    manifest = RigManifest.load(get_manifest_path("/assets/hero/rig/hero_rig.ma"))
+    fk_controls = manifest.list_controls(tag="fk", side="l")
+"""
+
+import os
+import json
+
+VERSION = 1
+EXTENSION = ".manifest.json"
+
+
+def get_manifest_path(scene_path):
+    """Manifest file path for rig scene.
+
+    :param scene_path: Rig scene path
+    :type scene_path: str
+    :return: Manifest path, e.g. hero_rig.ma -> hero_rig.manifest.json
+    :rtype: str
+    """
+    return os.path.splitext(scene_path)[0] + EXTENSION
+
+
+def strip_namespace(node_name):
+    return str(node_name).split("|")[-1].split(":")[-1]
+
+
+class RigManifest(object):
+    """Read only view of manifest data with prebuilt lookups."""
+
+    def __repr__(self):
+        return "RigManifest({0}, {1} components, {2} controls)".format(self.character.get("name"), len(self.components), len(self.controls))
+
+    def __init__(self, data, file_path=None):
+        """
+        :param data: Manifest data
+        :type data: dict
+        :param file_path: File data was loaded from, defaults to None
+        :type file_path: str, optional
+        :raises ValueError: If manifest version is newer than supported
+        """
+        if data.get("version", 0) > VERSION:
+            raise ValueError("Unsupported manifest version {0}, max supported: {1}".format(data.get("version"), VERSION))
+        self.data = data
+        self.file_path = file_path
+        self._components = dict([(comp["node"], comp) for comp in self.components])
+        self._controls = dict([(strip_namespace(name), ctl) for name, ctl in self.controls.items()])
+
+    @classmethod
+    def load(cls, file_path):
+        """Load manifest file.
+
+        :param file_path: Manifest path
+        :type file_path: str
+        :rtype: RigManifest
+        """
+        with open(file_path, "r") as json_file:
+            data = json.load(json_file)
+        return cls(data, file_path=file_path)
+
+    @property
+    def character(self):
+        return self.data["character"]
+
+    @property
+    def components(self):
+        return self.data["components"]
+
+    @property
+    def controls(self):
+        return self.data["controls"]
+
+    def get_component(self, node):
+        """Get component data by meta node name.
+
+        :param node: Meta node name
+        :type node: str
+        :rtype: dict
+        """
+        return self._components.get(node)
+
+    def list_components(self, of_type=None, side=None, tag=None):
+        """List components in meta graph traversal order.
+
+        :param of_type: Class name e.g FKComponent, defaults to None
+        :type of_type: str, optional
+        :param side: Side filter, defaults to None
+        :type side: str, optional
+        :param tag: Tag filter, defaults to None
+        :type tag: str, optional
+        :rtype: list[dict]
+        """
+        result = []
+        for comp in self.components:
+            if of_type and comp["type"] != of_type:
+                continue
+            if side and comp["side"] != side:
+                continue
+            if tag and comp["tag"] != tag:
+                continue
+            result.append(comp)
+        return result
+
+    def get_parent(self, node):
+        comp = self.get_component(node)
+        return self.get_component(comp["parent"]) if comp and comp["parent"] else None
+
+    def get_children(self, node):
+        comp = self.get_component(node)
+        return [self._components[child] for child in comp["children"]] if comp else []
+
+    def get_hook_children(self, node, hook_index):
+        """Components attached to component's out hook.
+
+        :param node: Component meta node name
+        :type node: str
+        :param hook_index: Out hook index
+        :type hook_index: int
+        :rtype: list[dict]
+        """
+        comp = self.get_component(node)
+        if not comp or hook_index >= len(comp["hooks"]):
+            return []
+        return [self._components[child] for child in comp["hooks"][hook_index]["children"] if child in self._components]
+
+    def get_control(self, name):
+        """Get control data. Name is matched without namespace.
+
+        :param name: Control transform name
+        :type name: str
+        :rtype: dict
+        """
+        return self._controls.get(strip_namespace(name))
+
+    def list_controls(self, tag=None, side=None, component=None):
+        """List control names.
+
+        :param tag: Tag filter, defaults to None
+        :type tag: str, optional
+        :param side: Side filter, defaults to None
+        :type side: str, optional
+        :param component: Component meta node name, defaults to None
+        :type component: str, optional
+        :rtype: list[str]
+        """
+        result = []
+        for name, ctl in sorted(self.controls.items()):
+            if tag and ctl["tag"] != tag:
+                continue
+            if side and ctl["side"] != side:
+                continue
+            if component and ctl["component"] != component:
+                continue
+            result.append(name)
+        return result
+
+    def get_spaces(self, name):
+        """Control spaces as list of (space name, index) pairs."""
+        ctl = self.get_control(name)
+        return [tuple(space) for space in ctl["spaces"]] if ctl else []
+
+    def get_bind_pose(self, name):
+        ctl = self.get_control(name)
+        return dict(ctl["bind_pose"]) if ctl else {}
+
+    def list_bind_joints(self, component=None):
+        """Bind joints of all components or single component.
+
+        :param component: Component meta node name, defaults to None
+        :type component: str, optional
+        :rtype: list[str]
+        """
+        comps = [self.get_component(component)] if component else self.components
+        return [jnt for comp in comps if comp for jnt in comp["bind_joints"]]
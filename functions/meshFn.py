@@ -0,0 +1,138 @@
+from collections import OrderedDict
+import maya.cmds as mc
+import maya.api.OpenMaya as om2
+from luna import Logger
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+_SPACES = {"world": om2.MSpace.kWorld,
+           "object": om2.MSpace.kObject}
+
+
+def _require_numpy():
+    if np is None:
+        Logger.error("meshFn requires numpy to be available in Maya's python.")
+        raise RuntimeError("numpy is not available")
+
+
+def get_mesh_dag_path(mesh):
+    """Get MDagPath to mesh shape.
+
+    :param mesh: Mesh transform or shape.
+    :type mesh: str or PyNode
+    :return: Dag path to mesh shape
+    :rtype: om2.MDagPath
+    """
+    sel_list = om2.MSelectionList()
+    sel_list.add(str(mesh))
+    dag_path = sel_list.getDagPath(0)
+    if not dag_path.hasFn(om2.MFn.kMesh):
+        dag_path.extendToShape()
+    return dag_path
+
+
+def get_points(mesh, indices=None, space="world"):
+    """Read vertex positions with single MFnMesh.getPoints call.
+
+    :param mesh: Mesh transform or shape.
+    :type mesh: str or PyNode
+    :param indices: Vertex indices to return, defaults to None (all verticies)
+    :type indices: list[int] or numpy.ndarray, optional
+    :param space: Point space, "world" or "object", defaults to "world"
+    :type space: str, optional
+    :return: Points array of shape (N, 3)
+    :rtype: numpy.ndarray
+    """
+    _require_numpy()
+    mfn_mesh = om2.MFnMesh(get_mesh_dag_path(mesh))
+    points = np.array(mfn_mesh.getPoints(_SPACES[space]), dtype=float)[:, :3]
+    if indices is not None:
+        points = points[np.asarray(indices, dtype=int)]
+    return points
+
+
+def get_component_indices(components):
+    """Resolve mesh components selection to vertex indices per mesh.
+    Faces and edges are converted to verticies.
+
+    :param components: Mesh components
+    :type components: list[str or pm.MeshVertex or pm.MeshFace or pm.MeshEdge]
+    :return: Dictionary of {mesh shape path: vertex indices array}
+    :rtype: OrderedDict
+    """
+    _require_numpy()
+    vertices = mc.polyListComponentConversion([str(comp) for comp in components], toVertex=True) or []
+    sel_list = om2.MSelectionList()
+    for vtx_range in vertices:
+        sel_list.add(vtx_range)
+
+    indices_dict = OrderedDict()
+    for index in range(sel_list.length()):
+        dag_path, components_obj = sel_list.getComponent(index)
+        mesh_path = dag_path.fullPathName()
+        elements = om2.MFnSingleIndexedComponent(components_obj).getElements()
+        indices_dict.setdefault(mesh_path, []).extend(elements)
+    for mesh_path, indices in indices_dict.items():
+        indices_dict[mesh_path] = np.unique(np.array(indices, dtype=int))
+    return indices_dict
+
+
+def get_component_points(components, space="world"):
+    """Get positions of all verticies in components selection.
+
+    :param components: Mesh components
+    :type components: list
+    :param space: Point space, "world" or "object", defaults to "world"
+    :type space: str, optional
+    :return: Points array of shape (N, 3)
+    :rtype: numpy.ndarray
+    """
+    points_list = [get_points(mesh, indices, space=space) for mesh, indices in get_component_indices(components).items()]
+    if not points_list:
+        return np.empty((0, 3))
+    return np.concatenate(points_list)
+
+
+def get_centroid(points):
+    """Get average position of points
+
+    :param points: Points array of shape (N, 3)
+    :type points: numpy.ndarray
+    :return: Centroid as [x, y, z]
+    :rtype: list[float]
+    """
+    return np.asarray(points, dtype=float).mean(axis=0).tolist()
+
+
+def get_bounding_box(points):
+    """Get axis aligned bounding box of points
+
+    :param points: Points array of shape (N, 3)
+    :type points: numpy.ndarray
+    :return: Min and max corners
+    :rtype: (list[float], list[float])
+    """
+    points = np.asarray(points, dtype=float)
+    return points.min(axis=0).tolist(), points.max(axis=0).tolist()
+
+
+def get_deltas(base_points, target_points, offset=(0.0, 0.0, 0.0), tolerance=0.001):
+    """Find moved points between two point arrays.
+
+    :param base_points: Base points of shape (N, 3)
+    :type base_points: numpy.ndarray
+    :param target_points: Target points of shape (N, 3)
+    :type target_points: numpy.ndarray
+    :param offset: Offset to subtract from target points, defaults to (0.0, 0.0, 0.0)
+    :type offset: list[float], optional
+    :param tolerance: Minimum delta on any axis, defaults to 0.001
+    :type tolerance: float, optional
+    :return: Indices of moved points and their deltas of shape (M, 3)
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    deltas = np.asarray(target_points, dtype=float) - np.asarray(base_points, dtype=float) - np.asarray(offset, dtype=float)
+    moved_indices = np.nonzero(np.any(np.abs(deltas) > tolerance, axis=1))[0]
+    return moved_indices, deltas[moved_indices]
@@ -68,6 +68,35 @@ def generate_name(name, side, suffix, override_index=None):
     return full_name
 
 
+def generate_names(name, side, suffix, count):
+    """Generate multiple unique names in one pass.
+    Unlike calling generate_name in a loop, index search is not restarted for every name.
+
+    :param name: Base name
+    :type name: str or list
+    :param side: Side
+    :type side: str
+    :param suffix: Suffix
+    :type suffix: str
+    :param count: Number of names
+    :type count: int
+    :return: List of unique names
+    :rtype: list[str]
+    """
+    if isinstance(name, list):
+        name = "_".join(name)
+    template = get_template()
+    index = luna.Config.get(luna.NamingVars.start_index, default=0, cached=True)  # type: int
+    zfill = luna.Config.get(luna.NamingVars.index_padding, default=2, cached=True)  # type: int
+    names = []
+    while len(names) < count:
+        full_name = template.format(side=side, name=name + "_" + str(index).zfill(zfill), suffix=suffix)
+        if not pm.objExists(full_name):
+            names.append(full_name)
+        index += 1
+    return names
+
+
 def rename(node, side=None, name=None, index=None, suffix=None):
     """Rename node
 
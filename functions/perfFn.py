@@ -0,0 +1,543 @@
+import abc
+import math
+import os
+import random
+import time
+import timeit
+import maya.cmds as mc
+from luna import Logger
+from luna.utils import fileFn
+import luna_rig
+import luna_rig.functions.animFn as animFn
+import luna_rig.functions.attachFn as attachFn
+import luna_rig.functions.deformerFn as deformerFn
+
+
+def count_nodes(root=None):
+    """Count nodes by type. If root is given only DAG hierarchy and its direct connections are counted.
+
+    :param root: Hierarchy root, defaults to None (whole scene)
+    :type root: str, optional
+    :return: Dictionary of {node type: count} and "total" key.
+    :rtype: dict
+    """
+    if root:
+        dag_nodes = [str(root)] + (mc.listRelatives(str(root), ad=True, f=True) or [])
+        connected = mc.listConnections(dag_nodes, s=True, d=True, skipConversionNodes=True) or []
+        nodes = set(mc.ls(dag_nodes + connected, long=True))
+    else:
+        nodes = set(mc.ls(long=True))
+    counts = {"total": len(nodes)}
+    for node in nodes:
+        node_type = mc.nodeType(node)
+        counts[node_type] = counts.get(node_type, 0) + 1
+    return counts
+
+
+def measure_playback(time_range=None, loops=1):
+    """Step through frames forcing evaluation and measure average FPS.
+
+    :param time_range: Frame range, defaults to None (playback range)
+    :type time_range: tuple, optional
+    :param loops: Number of times to play the range, defaults to 1
+    :type loops: int, optional
+    :return: Frames per second
+    :rtype: float
+    """
+    if not time_range:
+        time_range = animFn.get_playback_range()
+    start_frame, end_frame = int(time_range[0]), int(time_range[1])
+    frames_count = (end_frame - start_frame + 1) * loops
+    start_time = timeit.default_timer()
+    for _ in range(loops):
+        for frame in range(start_frame, end_frame + 1):
+            mc.currentTime(frame, update=True)
+            mc.refresh(force=True)
+    elapsed = timeit.default_timer() - start_time
+    return frames_count / elapsed if elapsed else 0.0
+
+
+def benchmark_attach_methods(build_fn, time_range=None, loops=3, methods=attachFn.METHODS):
+    """Build rig with each attach method and compare node count and playback speed.
+    Scene is cleared before every build.
+
+    Example:
+        benchmark_attach_methods(lambda method: build_biped(attach_method=method))
+
+    :param build_fn: Function accepting attach method and returning Character.
+    :type build_fn: callable
+    :param time_range: Frame range to play, defaults to None (playback range)
+    :type time_range: tuple, optional
+    :param loops: Number of playback loops, defaults to 3
+    :type loops: int, optional
+    :param methods: Attach methods to compare, defaults to all methods.
+    :type methods: list[str], optional
+    :return: Dictionary of {method: results dict}
+    :rtype: dict
+    """
+    results = {}
+    for method in methods:
+        mc.file(new=True, force=True)
+        build_start = timeit.default_timer()
+        character = build_fn(method)
+        build_time = timeit.default_timer() - build_start
+        root = str(character.root_control.group)
+        node_counts = count_nodes(root)
+        results[method] = {"build_time": build_time,
+                           "nodes": node_counts["total"],
+                           "attach_nodes": attachFn.count_attach_nodes(root),
+                           "fps": measure_playback(time_range, loops=loops)}
+    for method, result in results.items():
+        Logger.info("{0}: {1:.2f} fps, {2} nodes, build {3:.2f}s, attach nodes: {4}".format(method,
+                                                                                             result["fps"],
+                                                                                             result["nodes"],
+                                                                                             result["build_time"],
+                                                                                             result["attach_nodes"]))
+    return results
+
+
+EVALUATION_MODES = ["off", "serial", "parallel"]
+STRESS_CHANNELS = ["tx", "ty", "tz", "rx", "ry", "rz"]
+
+
+class Evaluator(object):
+    """Interface used by benchmark_playback to drive evaluation.
+    Following members must be implemented:
+    - method: set_mode
+    - method: get_mode
+    - method: evaluate
+    """
+    __metaclass__ = abc.ABCMeta
+
+    @abc.abstractmethod
+    def set_mode(self, mode):
+        """Switch evaluation mode, one of EVALUATION_MODES"""
+        pass
+
+    @abc.abstractmethod
+    def get_mode(self):
+        """Current evaluation mode"""
+        pass
+
+    @abc.abstractmethod
+    def evaluate(self, frame):
+        """Evaluate rig at frame"""
+        pass
+
+    def memory(self):
+        """Used memory in megabytes"""
+        return 0.0
+
+
+class StubEvaluator(Evaluator):
+    """In-memory evaluator for running benchmark_playback outside of Maya, e.g. in unit tests.
+    Records evaluated frames and can simulate per mode frame cost.
+    """
+
+    def __init__(self, mode="off", frame_costs=None, memory_mb=0.0):
+        """
+        :param mode: Initial mode, defaults to "off"
+        :type mode: str, optional
+        :param frame_costs: Dictionary of {mode: seconds to sleep per frame}, defaults to None
+        :type frame_costs: dict, optional
+        :param memory_mb: Value returned by memory(), defaults to 0.0
+        :type memory_mb: float, optional
+        """
+        self.mode = mode
+        self.frame_costs = dict(frame_costs or {})
+        self.memory_mb = memory_mb
+        # History of set modes and (mode, frame) evaluations
+        self.modes = [mode]
+        self.frames = []
+
+    def set_mode(self, mode):
+        if mode not in EVALUATION_MODES:
+            raise ValueError("Invalid evaluation mode: {0}".format(mode))
+        self.mode = mode
+        self.modes.append(mode)
+
+    def get_mode(self):
+        return self.mode
+
+    def evaluate(self, frame):
+        self.frames.append((self.mode, frame))
+        cost = self.frame_costs.get(self.mode, 0.0)
+        if cost:
+            time.sleep(cost)
+
+    def memory(self):
+        return self.memory_mb
+
+
+class MayaEvaluator(Evaluator):
+    """Evaluates scene through evaluation manager. In batch mode evaluation is forced by pulling given plugs."""
+
+    def __init__(self, pull_plugs=[]):
+        self.batch = mc.about(batch=True)
+        self.pull_plugs = list(pull_plugs)
+
+    def set_mode(self, mode):
+        mc.evaluationManager(mode=mode)
+
+    def get_mode(self):
+        return mc.evaluationManager(q=True, mode=True)[0]
+
+    def evaluate(self, frame):
+        mc.currentTime(frame, update=True)
+        if not self.batch:
+            mc.refresh(force=True)
+        for plug in self.pull_plugs:
+            mc.getAttr(plug)
+
+    def memory(self):
+        return mc.memory(heapMemory=True, megaByte=True)
+
+
+def percentile(values, percent):
+    """Linear interpolated percentile of values.
+
+    :param values: Values
+    :type values: list[float]
+    :param percent: Percentile in 0-100 range
+    :type percent: float
+    :rtype: float
+    """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    position = (len(values) - 1) * percent / 100.0
+    lower = int(math.floor(position))
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def create_stress_animation(controls, time_range=None, seed=0, amplitude=1.0, step=4):
+    """Key deterministic sine animation on all keyable translate/rotate channels of controls.
+    Existing keys on those channels are replaced.
+
+    :param controls: Controls to animate
+    :type controls: list[luna_rig.Control]
+    :param time_range: Frame range, defaults to None (playback range)
+    :type time_range: tuple, optional
+    :param seed: Random seed for phases and periods, defaults to 0
+    :type seed: int, optional
+    :param amplitude: Translation amplitude, rotation uses amplitude * 10 degrees, defaults to 1.0
+    :type amplitude: float, optional
+    :param step: Frames between keys, defaults to 4
+    :type step: int, optional
+    :return: Animated plugs
+    :rtype: list[str]
+    """
+    if not time_range:
+        time_range = animFn.get_playback_range()
+    rand = random.Random(seed)
+    plugs = []
+    for ctl in sorted(controls, key=lambda ctl: str(ctl.transform)):
+        transform = str(ctl.transform)
+        keyable = mc.listAttr(transform, keyable=True, unlocked=True, shortNames=True) or []
+        for channel in STRESS_CHANNELS:
+            if channel not in keyable:
+                continue
+            plug = "{0}.{1}".format(transform, channel)
+            if mc.listConnections(plug, s=True, d=False, type="animCurve") is None and mc.listConnections(plug, s=True, d=False):
+                continue
+            phase = rand.uniform(0.0, math.pi * 2)
+            period = rand.uniform(12.0, 48.0)
+            base_value = mc.getAttr(plug)
+            channel_amplitude = amplitude if channel.startswith("t") else amplitude * 10.0
+            mc.cutKey(plug, clear=True)
+            for frame in range(int(time_range[0]), int(time_range[1]) + 1, step):
+                value = base_value + channel_amplitude * math.sin(phase + 2 * math.pi * frame / period)
+                mc.setKeyframe(transform, attribute=channel, time=frame, value=value)
+            plugs.append(plug)
+    return plugs
+
+
+def benchmark_playback(character=None,
+                       time_range=None,
+                       modes=EVALUATION_MODES,
+                       loops=3,
+                       warmup=1,
+                       seed=0,
+                       evaluator=None,
+                       history_file=None,
+                       label=""):
+    """Play character with deterministic stress animation in every evaluation mode.
+
+    :param character: Character to animate. If None, stress animation is not created.
+    :type character: luna_rig.components.Character, optional
+    :param time_range: Frame range, defaults to None (playback range)
+    :type time_range: tuple, optional
+    :param modes: Evaluation manager modes, defaults to ["off", "serial", "parallel"]
+    :type modes: list[str], optional
+    :param loops: Number of measured loops, defaults to 3
+    :type loops: int, optional
+    :param warmup: Number of not measured loops before measurement, defaults to 1
+    :type warmup: int, optional
+    :param seed: Stress animation seed, defaults to 0
+    :type seed: int, optional
+    :param evaluator: Evaluator instance, defaults to None (MayaEvaluator). Use StubEvaluator and explicit time_range to run without Maya.
+    :type evaluator: Evaluator, optional
+    :param history_file: Json file to append results to, defaults to None
+    :type history_file: str, optional
+    :param label: Entry label stored in history, for example rig version, defaults to ""
+    :type label: str, optional
+    :return: Dictionary of {mode: results}
+    :rtype: dict
+    """
+    if not time_range:
+        time_range = animFn.get_playback_range()
+    if character:
+        create_stress_animation(character.list_controls(), time_range=time_range, seed=seed)
+    if evaluator is None:
+        pull_plugs = ["{0}.worldMatrix[0]".format(jnt) for jnt in character.bind_joints] if character else []
+        evaluator = MayaEvaluator(pull_plugs=pull_plugs)
+    frames = list(range(int(time_range[0]), int(time_range[1]) + 1))
+
+    initial_mode = evaluator.get_mode()
+    results = {}
+    try:
+        for mode in modes:
+            evaluator.set_mode(mode)
+            for _ in range(warmup):
+                for frame in frames:
+                    evaluator.evaluate(frame)
+            memory_start = evaluator.memory()
+            frame_times = []
+            for _ in range(loops):
+                for frame in frames:
+                    start_time = timeit.default_timer()
+                    evaluator.evaluate(frame)
+                    frame_times.append(timeit.default_timer() - start_time)
+            total_time = sum(frame_times)
+            results[mode] = {"fps": len(frame_times) / total_time if total_time else 0.0,
+                             "frames": len(frame_times),
+                             "p50_ms": percentile(frame_times, 50) * 1000.0,
+                             "p90_ms": percentile(frame_times, 90) * 1000.0,
+                             "p99_ms": percentile(frame_times, 99) * 1000.0,
+                             "max_ms": max(frame_times) * 1000.0 if frame_times else 0.0,
+                             "memory_mb": evaluator.memory(),
+                             "memory_delta_mb": evaluator.memory() - memory_start}
+            Logger.info("Playback [{0}]: {1:.2f} fps, p50 {2:.2f} ms, p99 {3:.2f} ms".format(mode,
+                                                                                             results[mode]["fps"],
+                                                                                             results[mode]["p50_ms"],
+                                                                                             results[mode]["p99_ms"]))
+    finally:
+        evaluator.set_mode(initial_mode)
+
+    if history_file:
+        write_history(history_file, results, label=label, character=str(character) if character else None)
+    return results
+
+
+def write_history(file_path, results, label="", **extra):
+    """Append benchmark results to json history file.
+
+    :param file_path: History file path
+    :type file_path: str
+    :param results: Benchmark results
+    :type results: dict
+    :param label: Entry label, defaults to ""
+    :type label: str, optional
+    """
+    history = fileFn.load_json(file_path) if os.path.isfile(file_path) else []
+    entry = {"time": time.strftime("%Y-%m-%d %H:%M:%S"),
+             "label": label,
+             "scene": mc.file(q=True, sn=True),
+             "results": results}
+    entry.update(extra)
+    history.append(entry)
+    fileFn.write_json(file_path, data=history, sort_keys=True)
+    Logger.info("Benchmark history updated: {0}".format(file_path))
+
+
+def benchmark_component_wrapping(loops=10):
+    """Measure time of listing and wrapping meta nodes of current scene.
+    Eager variant creates signals for every wrapper, the way components did before signals became lazy.
+
+    :param loops: Number of repetitions, defaults to 10
+    :type loops: int, optional
+    :return: Dictionary of {case: seconds per loop} and "components" count
+    :rtype: dict
+    """
+    import luna_rig
+    from luna_rig.core import component
+
+    network_nodes = [node for node in mc.ls(type="network") if mc.attributeQuery("metaType", node=node, exists=True)]
+
+    def wrap_lazy():
+        return [luna_rig.MetaNode(node) for node in network_nodes]
+
+    def wrap_eager():
+        wrappers = wrap_lazy()
+        for wrapper in wrappers:
+            if isinstance(wrapper, luna_rig.Component):
+                component._compSignals()
+        return wrappers
+
+    def list_lazy():
+        return luna_rig.MetaNode.list_nodes(of_type=luna_rig.Component)
+
+    def list_eager():
+        listed = list_lazy()
+        for _ in listed:
+            component._compSignals()
+        return listed
+
+    results = {"components": len(network_nodes)}
+    for case, func in [("wrap", wrap_lazy), ("wrap_eager_signals", wrap_eager), ("list", list_lazy), ("list_eager_signals", list_eager)]:
+        results[case] = timeit.timeit(func, number=loops) / loops
+    Logger.info("Wrapping {0} meta nodes: {1:.4f}s (eager signals {2:.4f}s), listing: {3:.4f}s (eager signals {4:.4f}s)".format(results["components"],
+                                                                                                                              results["wrap"],
+                                                                                                                              results["wrap_eager_signals"],
+                                                                                                                              results["list"],
+                                                                                                                              results["list_eager_signals"]))
+    return results
+
+
+# Performance level -> disabled subsystems. Every level includes categories of previous ones.
+PERFORMANCE_LEVELS = ["full", "no_dynamics", "no_secondary", "skeleton"]
+LEVEL_CATEGORIES = {"full": [],
+                    "no_dynamics": ["dynamics"],
+                    "no_secondary": ["dynamics", "follicles", "correctives"],
+                    "skeleton": ["dynamics", "follicles", "correctives", "deformers"]}
+# nodeState value that makes node pass through its input
+HAS_NO_EFFECT = 1
+
+
+def collect_performance_switches(character, categories):
+    """Find attributes to set and connections to break for given categories, tracked through character's meta graph.
+
+    dynamics - FKDynamicsComponent hair systems and their nucleus solvers are disabled.
+    follicles - follicle outputs in components are disconnected, driven transforms keep current (cached) values.
+    correctives - CorrectiveComponent driven offsets are disconnected, PSD pose interpolators driven by skeleton are muted.
+    deformers - geometry deformers pass through and geometry is hidden, only skeleton is displayed.
+
+    :param character: Character
+    :type character: luna_rig.components.Character
+    :param categories: Categories to collect
+    :type categories: list[str]
+    :return: Dictionary with "attrs" {plug: new value} and "connections" [(source, destination, reset to default)] to break
+    :rtype: dict
+    """
+    switches = {"attrs": {}, "connections": []}
+    components = []
+    queue = list(character.meta_children)
+    while queue:
+        comp = queue.pop(0)
+        components.append(comp)
+        queue.extend(comp.meta_children)
+
+    if "dynamics" in categories:
+        for comp in [comp for comp in components if isinstance(comp, luna_rig.components.FKDynamicsComponent)]:
+            hair_system = str(comp.hair_system)
+            switches["attrs"][hair_system + ".simulationMethod"] = 0
+            for nucleus in mc.listConnections(hair_system, type="nucleus") or []:
+                switches["attrs"][nucleus + ".enable"] = False
+
+    if "follicles" in categories:
+        roots = [comp.root.longName() for comp in components if isinstance(comp, luna_rig.AnimComponent)]
+        follicles = mc.ls(mc.listRelatives(roots, ad=True, f=True, type="follicle") or [], long=True) if roots else []
+        for follicle in follicles:
+            for attr_name in ["outTranslate", "outRotate"]:
+                connections = mc.listConnections("{0}.{1}".format(follicle, attr_name), s=False, d=True, plugs=True, connections=True) or []
+                switches["connections"] += [(source_plug, dest_plug, False) for source_plug, dest_plug in zip(connections[::2], connections[1::2])]
+
+    if "correctives" in categories:
+        for comp in [comp for comp in components if isinstance(comp, luna_rig.components.CorrectiveComponent)]:
+            for ctl in comp.controls:
+                sdk_offset = ctl.find_offset("sdk")
+                if not sdk_offset:
+                    continue
+                connections = mc.listConnections(str(sdk_offset), s=True, d=False, plugs=True, connections=True, skipConversionNodes=True) or []
+                for dest_plug, source_plug in zip(connections[::2], connections[1::2]):
+                    if not dest_plug.endswith(".metaParent"):
+                        switches["connections"].append((source_plug, dest_plug, True))
+        bind_joints = [str(jnt) for jnt in character.bind_joints]
+        interpolators = mc.ls(mc.listConnections(bind_joints, s=False, d=True) or [], type="poseInterpolator") if bind_joints else []
+        for interpolator in set(interpolators):
+            switches["attrs"][interpolator + ".nodeState"] = HAS_NO_EFFECT
+
+    if "deformers" in categories:
+        for deformer in deformerFn.DeformerInventory.get(character.geometry_grp, refresh=True).deformers.keys():
+            switches["attrs"][deformer + ".nodeState"] = HAS_NO_EFFECT
+        switches["attrs"][str(character.geometry_grp) + ".visibility"] = False
+        switches["attrs"][str(character.deformation_rig) + ".visibility"] = True
+    return switches
+
+
+def strip_plug_namespace(plug):
+    """Remove namespaces from every DAG path part of plug's node."""
+    node_name, attr_name = plug.split(".", 1)
+    return "{0}.{1}".format("|".join([part.split(":")[-1] for part in node_name.split("|")]), attr_name)
+
+
+def resolve_plug(plug, namespace=""):
+    """Add namespace to every DAG path part of namespace-free plug's node.
+
+    :param plug: Plug stored by apply_performance_switches
+    :type plug: str
+    :param namespace: Namespace, e.g. "shot:hero", defaults to "" (root namespace)
+    :type namespace: str, optional
+    :rtype: str
+    """
+    if not namespace:
+        return plug
+    node_name, attr_name = plug.split(".", 1)
+    return "{0}.{1}".format("|".join([namespace + ":" + part if part else part for part in node_name.split("|")]), attr_name)
+
+
+def apply_performance_switches(switches):
+    """Apply switches and return state needed to restore them exactly.
+    Plugs are stored without namespace, so state can be restored after rig is referenced, see restore_performance_state.
+
+    :param switches: Result of collect_performance_switches
+    :type switches: dict
+    :return: Restore state with "attrs" {plug: original value} and "connections" [(source, destination)]
+    :rtype: dict
+    """
+    state = {"attrs": {}, "connections": []}
+    for plug, value in switches["attrs"].items():
+        if not mc.objExists(plug) or mc.listConnections(plug, s=True, d=False) or mc.getAttr(plug, lock=True):
+            Logger.warning("Skipped performance switch for driven or locked attribute: {0}".format(plug))
+            continue
+        state["attrs"][strip_plug_namespace(plug)] = mc.getAttr(plug)
+        mc.setAttr(plug, value)
+    for source_plug, dest_plug, reset in switches["connections"]:
+        if not mc.isConnected(source_plug, dest_plug):
+            continue
+        mc.disconnectAttr(source_plug, dest_plug)
+        state["connections"].append([strip_plug_namespace(source_plug), strip_plug_namespace(dest_plug)])
+        if reset:
+            node_name, attr_name = dest_plug.split(".", 1)
+            mc.setAttr(dest_plug, *mc.attributeQuery(attr_name, node=node_name, listDefault=True))
+    return state
+
+
+def restore_performance_state(state, namespace=""):
+    """Restore values and connections recorded by apply_performance_switches.
+
+    :param state: Restore state
+    :type state: dict
+    :param namespace: Namespace of the rig, defaults to "" (root namespace)
+    :type namespace: str, optional
+    :return: Number of failed restores
+    :rtype: int
+    """
+    failed = 0
+    for source_plug, dest_plug in state.get("connections", []):
+        source_plug, dest_plug = resolve_plug(source_plug, namespace), resolve_plug(dest_plug, namespace)
+        try:
+            if not mc.isConnected(source_plug, dest_plug):
+                mc.connectAttr(source_plug, dest_plug, force=True)
+        except RuntimeError:
+            Logger.exception("Failed to restore connection {0} -> {1}".format(source_plug, dest_plug))
+            failed += 1
+    for plug, value in state.get("attrs", {}).items():
+        plug = resolve_plug(plug, namespace)
+        try:
+            mc.setAttr(plug, value)
+        except RuntimeError:
+            Logger.exception("Failed to restore {0} value".format(plug))
+            failed += 1
+    return failed
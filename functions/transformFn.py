@@ -1,6 +1,18 @@
 import pymel.core as pm
 import pymel.api as pma
+import maya.cmds as mc
 import luna_rig
+import luna_rig.functions.meshFn as meshFn
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Axis index flipped by each mirror plane
+MIRROR_PLANES = {"yz": 0,
+                 "xz": 1,
+                 "xy": 2}
 
 
 # Modified from https://gist.github.com/rondreas/1c6d4e5fc6535649780d5b65fc5a9283
@@ -25,21 +37,125 @@ def mirror_xform(transforms=[], across="yz", behaviour=True, space="world"):
         raise ValueError("Passed node which wasn't of type: Transform")
 
     # Validate plane which to mirror across
+    across = validate_mirror_plane(across)
+
+    # Read all matrices, mirror in one go, write back
+    matrices = get_matrices(transforms, space=space)
+    mirrored = mirror_matrices(matrices, across=across, behaviour=behaviour)
+    # Matrices mirrored in custom space are applied as local ones
+    set_matrices(transforms, mirrored, space="world" if space == "world" else "object")
+
+
+def validate_mirror_plane(across):
+    """Validate mirror plane name.
+
+    :param across: Plane to mirror across, options("YZ", "XY", "XZ")
+    :type across: str
+    :raises ValueError: If invalid mirror plane
+    :return: Lower case plane name
+    :rtype: str
+    """
     across = across.lower()
-    if across not in ('xy', 'yz', 'xz'):
+    if across not in MIRROR_PLANES:
         raise ValueError("Keyword Argument: 'across' not of accepted value ('xy', 'yz', 'xz').")
+    return across
+
+
+def get_matrices(transforms, space="world"):
+    """Read matrices of multiple transforms.
+
+    :param transforms: Transforms to read matrices from
+    :type transforms: list[str or pm.PyNode]
+    :param space: "world", "object" or transform to get relative matrices in, defaults to "world"
+    :type space: str or pm.PyNode, optional
+    :return: Matrices as (N, 4, 4) array if numpy is available, list of 16 float lists otherwise.
+    :rtype: numpy.ndarray or list
+    """
+    node_names = [str(node) for node in transforms]
+    if space in ("world", "object"):
+        flat_matrices = [mc.xform(node, q=True, ws=(space == "world"), m=True) for node in node_names]
+        space_matrix = None
+    else:
+        flat_matrices = [mc.xform(node, q=True, ws=True, m=True) for node in node_names]
+        space_matrix = mc.xform(str(space), q=True, ws=True, m=True)
+
+    if np is None:
+        if space_matrix is None:
+            return flat_matrices
+        space_inverse = pm.dt.Matrix(space_matrix).inverse()
+        return [matrix_to_list(pm.dt.Matrix(mtx) * space_inverse) for mtx in flat_matrices]
+
+    matrices = np.array(flat_matrices, dtype=float).reshape(-1, 4, 4)
+    if space_matrix is not None:
+        space_inverse = np.linalg.inv(np.array(space_matrix, dtype=float).reshape(4, 4))
+        # Maya matrices are row major: local = world * inverse(space)
+        matrices = np.matmul(matrices, space_inverse)
+    return matrices
+
 
-    stored_matrices = {}
-    for transform in transforms:
-        # Get the worldspace matrix, as a list of 16 float values
-        if space == "world":
-            mtx = pm.xform(transform, q=True, ws=True, m=True)
+def set_matrices(transforms, matrices, space="world"):
+    """Write matrices to multiple transforms.
+
+    :param transforms: Transforms to set matrices for
+    :type transforms: list[str or pm.PyNode]
+    :param matrices: Matrices in the same order as transforms
+    :type matrices: numpy.ndarray or list
+    :param space: "world", "object" or transform matrices are relative to, defaults to "world"
+    :type space: str or pm.PyNode, optional
+    """
+    node_names = [str(node) for node in transforms]
+    if space not in ("world", "object"):
+        space_matrix = mc.xform(str(space), q=True, ws=True, m=True)
+        if np is not None:
+            matrices = np.matmul(np.asarray(matrices, dtype=float).reshape(-1, 4, 4), np.array(space_matrix, dtype=float).reshape(4, 4))
         else:
-            mtx = matrix_to_list(relative_world_matrix(transform, space))
-        mtx = mirror_matrix(mtx, behaviour=behaviour, across=across)
-        stored_matrices[transform] = mtx
-    for transform in transforms:
-        transform.setMatrix(stored_matrices[transform], ws=(space == "world"))
+            matrices = [matrix_to_list(pm.dt.Matrix(list(mtx)) * pm.dt.Matrix(space_matrix)) for mtx in matrices]
+    if np is not None:
+        matrices = np.asarray(matrices, dtype=float).reshape(-1, 16).tolist()
+    # Relative matrices are converted to world above
+    world_space = space != "object"
+    for node, mtx in zip(node_names, matrices):
+        mc.xform(node, ws=world_space, m=list(mtx))
+
+
+def mirror_matrices(matrices, across="yz", behaviour=True):
+    """Mirror multiple matrices across plane in one operation.
+
+    :param matrices: Matrices to mirror, (N, 4, 4) or (N, 16) array-like
+    :type matrices: numpy.ndarray or list
+    :param across: Plane to mirror across, options("yz", "xy", "xz"), defaults to "yz"
+    :type across: str, optional
+    :param behaviour: If behavior should be mirrored, defaults to True
+    :type behaviour: bool, optional
+    :return: Mirrored matrices as (N, 4, 4) array if numpy is available, list of 16 float lists otherwise.
+    :rtype: numpy.ndarray or list
+    """
+    across = validate_mirror_plane(across)
+    if np is None:
+        return [mirror_matrix(list(mtx), behaviour=behaviour, across=across) for mtx in matrices]
+
+    mirror_axis = MIRROR_PLANES[across]
+    result = np.array(matrices, dtype=float).reshape(-1, 4, 4)
+    # Invert translation along mirror axis
+    result[:, 3, mirror_axis] *= -1.0
+    # Invert rotation columns but for the one on mirror axis
+    if behaviour:
+        other_axes = [axis for axis in range(3) if axis != mirror_axis]
+        result[:, :3, other_axes] *= -1.0
+    return result
+
+
+def invert_matrices(matrices):
+    """Invert multiple matrices in one operation.
+
+    :param matrices: Matrices to invert, (N, 4, 4) or (N, 16) array-like
+    :type matrices: numpy.ndarray or list
+    :return: Inverted matrices as (N, 4, 4) array if numpy is available, list of 16 float lists otherwise.
+    :rtype: numpy.ndarray or list
+    """
+    if np is None:
+        return [matrix_to_list(pm.dt.Matrix(list(mtx)).inverse()) for mtx in matrices]
+    return np.linalg.inv(np.array(matrices, dtype=float).reshape(-1, 4, 4))
 
 
 def mirror_matrix(mtx, behaviour=True, across="yz"):
@@ -122,11 +238,8 @@ def snap_to_object_center(target_object, snap_objects):
     centroid = pm.objectCenter(target_object)
     if not isinstance(snap_objects, list):
         snap_objects = [snap_objects]
-    center_locator = pm.spaceLocator(n="temp_center_loc")
-    center_locator.translate.set(centroid)
     for obj in snap_objects:
-        pm.matchTransform(obj, center_locator, pos=True)
-    pm.delete(center_locator)
+        pm.move(obj, centroid, rotatePivotRelative=True, worldSpace=True)
 
 
 def snap_to_components_center(components, snap_object):
@@ -137,26 +250,23 @@ def snap_to_components_center(components, snap_object):
         return
 
     # Mesh
-    if all([isinstance(comp, pm.MeshVertex) for comp in components]):
-        unpacked_verticies = []
-        for vtx_pack in components:
-            for vtx in vtx_pack:
-                unpacked_verticies.append(vtx)
-        all_points = [vtx.getPosition(space="world") for vtx in unpacked_verticies]
-    # Invalid
-    else:
+    if not all([isinstance(comp, (pm.MeshVertex, pm.MeshEdge, pm.MeshFace)) for comp in components]):
         pm.displayError("Invalid component types: {0}".format([type(comp) for comp in components]))
         return
-    # Calculate centroid
-    centroid = [0.0, 0.0, 0.0]
-    for pt in all_points:
-        centroid += pt
-    centroid = centroid / len(all_points)
+    if meshFn.np is not None:
+        all_points = meshFn.get_component_points(components, space="world")
+        if not len(all_points):
+            return
+        centroid = meshFn.get_centroid(all_points)
+    else:
+        # No numpy, average flattened vertex positions
+        verticies = mc.ls(mc.polyListComponentConversion([str(comp) for comp in components], toVertex=True), flatten=True)
+        if not verticies:
+            return
+        positions = mc.xform(verticies, q=True, ws=True, t=True)
+        centroid = [sum(positions[axis::3]) / len(verticies) for axis in range(3)]
     # Match to centroid
-    center_locator = pm.spaceLocator(n="temp_center_loc")
-    center_locator.translate.set(centroid)
-    pm.matchTransform(snap_object, center_locator, pos=True)
-    pm.delete(center_locator)
+    pm.move(snap_object, centroid, rotatePivotRelative=True, worldSpace=True)
 
 
 def get_axis_name_from_vector3(vector3):
@@ -1,12 +1,20 @@
 import sys
+from luna_rig.functions import lazyFn
 
-from luna_rig.importexport.control_shapes import CtlShapeManager
-from luna_rig.importexport.skin import SkinManager
-from luna_rig.importexport.blendshape import BlendShapeManager
-from luna_rig.importexport.posespace import PsdManager
-from luna_rig.importexport.driven_pose import DrivenPoseManager
-from luna_rig.importexport.sdk_corrective import SDKCorrectiveManager
-from luna_rig.importexport.nglayers2 import NgLayers2Manager
-
+MANAGERS = [
+    ("CtlShapeManager", "luna_rig.importexport.control_shapes:CtlShapeManager"),
+    ("SkinManager", "luna_rig.importexport.skin:SkinManager"),
+    ("BlendShapeManager", "luna_rig.importexport.blendshape:BlendShapeManager"),
+    ("PsdManager", "luna_rig.importexport.posespace:PsdManager"),
+    ("DrivenPoseManager", "luna_rig.importexport.driven_pose:DrivenPoseManager"),
+    ("SDKCorrectiveManager", "luna_rig.importexport.sdk_corrective:SDKCorrectiveManager"),
+    ("NgLayers2Manager", "luna_rig.importexport.nglayers2:NgLayers2Manager"),
+    ("AnimClipManager", "luna_rig.importexport.anim_clip:AnimClipManager"),
+    ("DynamicsCacheManager", "luna_rig.importexport.dynamics_cache:DynamicsCacheManager"),
+    ("SkeletonManager", "luna_rig.importexport.skeleton:SkeletonManager"),
+]
 if sys.version_info[0] < 3:
-    from luna_rig.importexport.nglayers import NgLayersManager
+    MANAGERS.append(("NgLayersManager", "luna_rig.importexport.nglayers:NgLayersManager"))
+
+# Managers are imported on first access, see lazyFn.install
+lazyFn.install(__name__, MANAGERS)
@@ -0,0 +1,246 @@
+import json
+import maya.cmds as mc
+import maya.api.OpenMaya as om2
+import maya.api.OpenMayaAnim as oma2
+from luna import Logger
+import luna.utils.fileFn as fileFn
+import luna_rig.functions.animFn as animFn
+from luna_rig.importexport import manager
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Per key arrays stored flat, sliced with curve offsets
+KEY_ARRAYS = ["times", "values", "in_types", "out_types", "in_angles", "in_weights", "out_angles", "out_weights"]
+
+
+class AnimClip(object):
+    """Control animation loaded from clip file. Each array is decompressed once on load, curves are slices of in-memory arrays."""
+
+    def __repr__(self):
+        return "AnimClip({0}, {1} curves)".format(self.file_path, len(self.plugs))
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        # NpzFile decompresses array on every key access, read everything once
+        with np.load(file_path) as npz_file:
+            self._data = dict([(name, npz_file[name]) for name in npz_file.files])
+        self.meta = json.loads(str(self._data["meta"]))
+        self.plugs = [str(plug) for plug in self._data["plugs"]]
+        self.offsets = self._data["curve_offsets"]
+
+    @property
+    def controls(self):
+        return sorted(set([plug.split(".")[0] for plug in self.plugs]))
+
+    @property
+    def time_range(self):
+        return tuple(self.meta["time_range"])
+
+    def get_curve_data(self, index, time_range=None):
+        """Get curve data in animFn.get_curve_data format.
+
+        :param index: Curve index
+        :type index: int
+        :param time_range: Keys range, defaults to None (all keys)
+        :type time_range: tuple, optional
+        :rtype: dict
+        """
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        times = self._data["times"][start:end]
+        mask = np.ones(len(times), dtype=bool)
+        if time_range:
+            mask = (times >= time_range[0]) & (times <= time_range[1])
+        data = dict([(name, self._data[name][start:end][mask].tolist()) for name in KEY_ARRAYS])
+        data["weighted"] = bool(self._data["weighted"][index])
+        data["pre_infinity"] = int(self._data["pre_infinity"][index])
+        data["post_infinity"] = int(self._data["post_infinity"][index])
+        return data
+
+    def get_samples(self, time_range=None):
+        """Baked per frame values.
+
+        :param time_range: Frame range, defaults to None (whole clip)
+        :type time_range: tuple, optional
+        :return: Sample times of shape (F,) and values of shape (curves, F)
+        :rtype: (numpy.ndarray, numpy.ndarray)
+        """
+        sample_times = self._data["sample_times"]
+        samples = self._data["samples"]
+        if time_range:
+            mask = (sample_times >= time_range[0]) & (sample_times <= time_range[1])
+            return sample_times[mask], samples[:, mask]
+        return sample_times, samples
+
+
+class AnimClipManager(manager.AbstractManager):
+    """Export/import controls animation as compact numpy arrays (.npz).
+    Curves are keyed by namespace-free control names, so clip can be applied to any character with matching controls.
+    """
+
+    def __init__(self):
+        if np is None:
+            Logger.error("AnimClipManager requires numpy to be available in Maya's python.")
+            raise RuntimeError("numpy is not available")
+        super(AnimClipManager, self).__init__("animClip", "npz")
+
+    @property
+    def path(self):
+        return self.get_data_dir("anim_clips")
+
+    def get_base_name(self, clip_name):
+        return str(clip_name)
+
+    def get_new_file(self, clip_name):
+        return fileFn.get_new_versioned_file(self.get_base_name(clip_name), self.path, extension=self.extension, full_path=True)
+
+    def get_latest_file(self, clip_name):
+        return fileFn.get_latest_file(self.get_base_name(clip_name), self.path, extension=self.extension, full_path=True)
+
+    def export_clip(self, clip_name, character=None, time_range=None):
+        """Export animation of all character controls.
+
+        :param clip_name: Clip name
+        :type clip_name: str
+        :param character: Character to export, defaults to None (build character)
+        :type character: luna_rig.components.Character, optional
+        :param time_range: Frame range, defaults to None (playback range)
+        :type time_range: tuple, optional
+        :return: Exported file path
+        :rtype: str
+        """
+        character = character or self.character
+        if not time_range:
+            time_range = animFn.get_playback_range()
+        ui_unit = om2.MTime.uiUnit()
+        sample_times = np.arange(time_range[0], time_range[1] + 1, dtype=float)
+        sample_mtimes = [om2.MTime(float(frame), ui_unit) for frame in sample_times]
+
+        plugs = []
+        curves_data = []
+        samples = []
+        for ctl in character.list_controls():
+            ctl_name = animFn.strip_namespace(ctl.transform)
+            for attr_name, anim_curve in sorted(animFn.list_anim_curves(ctl.transform).items()):
+                fn_curve = animFn.get_anim_curve_fn(anim_curve)
+                curve_data = animFn.get_curve_data(fn_curve, time_range=time_range)
+                if not curve_data["times"]:
+                    continue
+                plugs.append("{0}.{1}".format(ctl_name, attr_name))
+                curves_data.append(curve_data)
+                samples.append([fn_curve.evaluate(mtime) for mtime in sample_mtimes])
+
+        arrays = {"plugs": np.array(plugs, dtype=str),
+                  "curve_offsets": np.cumsum([0] + [len(data["times"]) for data in curves_data]),
+                  "weighted": np.array([data["weighted"] for data in curves_data], dtype=bool),
+                  "pre_infinity": np.array([data["pre_infinity"] for data in curves_data], dtype=np.int8),
+                  "post_infinity": np.array([data["post_infinity"] for data in curves_data], dtype=np.int8),
+                  "sample_times": sample_times,
+                  "samples": np.array(samples, dtype=np.float32).reshape(len(plugs), len(sample_times)),
+                  "meta": np.array(json.dumps({"character": str(character.pynode.characterName.get()),
+                                               "time_range": list(time_range),
+                                               "time_unit": mc.currentUnit(q=True, time=True),
+                                               "scene": mc.file(q=True, sn=True)}))}
+        for name in KEY_ARRAYS:
+            dtype = np.int8 if name.endswith("_types") else float
+            arrays[name] = np.array([value for data in curves_data for value in data[name]], dtype=dtype)
+
+        export_path = self.get_new_file(clip_name)
+        np.savez_compressed(export_path, **arrays)
+        Logger.info("{0}: Exported {1} curves to {2}".format(self, len(plugs), export_path))
+        return export_path
+
+    def load_clip(self, clip_name):
+        """Load latest version of clip.
+
+        :rtype: AnimClip
+        """
+        latest_file = self.get_latest_file(clip_name)
+        if not latest_file:
+            Logger.error("{0}: No files found for clip {1}".format(self, clip_name))
+            return None
+        return AnimClip(latest_file)
+
+    def import_clip(self, clip_name, character=None, time_range=None, time_offset=0.0, use_samples=False):
+        """Apply clip to character controls matched by name.
+
+        :param clip_name: Clip name or AnimClip instance
+        :type clip_name: str or AnimClip
+        :param character: Target character, defaults to None (build character)
+        :type character: luna_rig.components.Character, optional
+        :param time_range: Apply only part of the clip, defaults to None
+        :type time_range: tuple, optional
+        :param time_offset: Keys time offset, defaults to 0.0
+        :type time_offset: float, optional
+        :param use_samples: Key baked samples instead of original keys, defaults to False
+        :type use_samples: bool, optional
+        :return: Report with "curves" count and "unmatched" plugs
+        :rtype: dict
+        """
+        clip = clip_name if isinstance(clip_name, AnimClip) else self.load_clip(clip_name)
+        if not clip:
+            return None
+        character = character or self.character
+        target_map = dict([(animFn.strip_namespace(ctl.transform), str(ctl.transform)) for ctl in character.list_controls()])
+        if use_samples:
+            sample_times, samples = clip.get_samples(time_range)
+
+        report = {"curves": 0, "unmatched": []}
+        for index, plug in enumerate(clip.plugs):
+            ctl_name, attr_name = plug.split(".", 1)
+            target_plug = "{0}.{1}".format(target_map.get(ctl_name), attr_name)
+            if ctl_name not in target_map or not mc.objExists(target_plug):
+                report["unmatched"].append(plug)
+                continue
+            if use_samples:
+                linear = oma2.MFnAnimCurve.kTangentLinear
+                curve_data = {"times": sample_times.tolist(),
+                              "values": samples[index].tolist(),
+                              "in_types": [linear] * len(sample_times),
+                              "out_types": [linear] * len(sample_times),
+                              "in_angles": [0.0] * len(sample_times),
+                              "in_weights": [1.0] * len(sample_times),
+                              "out_angles": [0.0] * len(sample_times),
+                              "out_weights": [1.0] * len(sample_times),
+                              "weighted": False,
+                              "pre_infinity": 0,
+                              "post_infinity": 0}
+            else:
+                curve_data = clip.get_curve_data(index, time_range=time_range)
+            animFn.set_curve_data(animFn.get_anim_curve_for_plug(target_plug), curve_data, time_offset=time_offset)
+            report["curves"] += 1
+        if report["unmatched"]:
+            Logger.warning("{0}: Unmatched clip curves: {1}".format(self, report["unmatched"]))
+        Logger.info("{0}: Applied {1} curves from {2}".format(self, report["curves"], clip.file_path))
+        return report
+
+    @staticmethod
+    def diff_clips(first_clip, second_clip, tolerance=0.001):
+        """Compare baked samples of two clips.
+
+        :param first_clip: Clip
+        :type first_clip: AnimClip
+        :param second_clip: Clip to compare with
+        :type second_clip: AnimClip
+        :param tolerance: Min difference to report, defaults to 0.001
+        :type tolerance: float, optional
+        :return: Dictionary of {plug: max difference}, missing plugs have None value.
+        :rtype: dict
+        """
+        first_times, first_samples = first_clip.get_samples()
+        second_times, second_samples = second_clip.get_samples()
+        common_times, first_indices, second_indices = np.intersect1d(first_times, second_times, return_indices=True)
+        second_plugs = dict([(plug, index) for index, plug in enumerate(second_clip.plugs)])
+        result = {}
+        for index, plug in enumerate(first_clip.plugs):
+            if plug not in second_plugs:
+                result[plug] = None
+                continue
+            difference = np.abs(first_samples[index, first_indices] - second_samples[second_plugs[plug], second_indices])
+            if difference.size and difference.max() > tolerance:
+                result[plug] = float(difference.max())
+        for plug in set(second_plugs.keys()) - set(first_clip.plugs):
+            result[plug] = None
+        return result
@@ -0,0 +1,349 @@
+import json
+import hashlib
+import maya.cmds as mc
+import maya.utils as mutils
+import maya.OpenMaya as om
+import maya.api.OpenMaya as om2
+import maya.api.OpenMayaAnim as oma2
+from luna import Logger
+import luna.utils.fileFn as fileFn
+import luna_rig
+import luna_rig.functions.animFn as animFn
+from luna_rig.importexport import manager
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+ROTATE_CHANNELS = ["rotateX", "rotateY", "rotateZ"]
+# Anim curve edited callback ids installed by DynamicsCacheManager.watch
+_WATCH_CALLBACK_IDS = []
+
+
+class DynamicsCacheManager(manager.AbstractManager):
+    """Bake FKDynamicsComponent joint rotations to versioned .npz caches and play them back instead of simulation.
+
+    While cache is enabled dynamic offsets are driven by anim curves with cached values and hair system is not simulated.
+    Cache stores signature of upstream animation (controls of parent components), cache is disabled when signature doesn't match.
+    State is stored on component meta node: dynamicsCache (json) and cache curves as util nodes.
+    """
+
+    def __init__(self):
+        if np is None:
+            Logger.error("DynamicsCacheManager requires numpy to be available in Maya's python.")
+            raise RuntimeError("numpy is not available")
+        super(DynamicsCacheManager, self).__init__("dynamicsCache", "npz")
+
+    @property
+    def path(self):
+        return self.get_data_dir("dynamics_cache")
+
+    def get_base_name(self, component):
+        return animFn.strip_namespace(component.pynode)
+
+    def get_new_file(self, component):
+        return fileFn.get_new_versioned_file(self.get_base_name(component), self.path, extension=self.extension, full_path=True)
+
+    def get_latest_file(self, component):
+        return fileFn.get_latest_file(self.get_base_name(component), self.path, extension=self.extension, full_path=True)
+
+    def list_components(self, character=None):
+        """List dynamics components of character.
+
+        :param character: Character, defaults to None (build character)
+        :type character: luna_rig.components.Character, optional
+        :rtype: list[luna_rig.components.FKDynamicsComponent]
+        """
+        character = character or self.character
+        # Every component is connected to character meta children, top level ones twice (metaParent and character)
+        result = []
+        for comp in character.get_meta_children(of_type=luna_rig.components.FKDynamicsComponent):
+            if comp not in result:
+                result.append(comp)
+        return result
+
+    @staticmethod
+    def get_upstream_transforms(component):
+        """Control transforms of parent components and character root control.
+
+        :param component: Dynamics component
+        :type component: luna_rig.components.FKDynamicsComponent
+        :rtype: list[str]
+        """
+        transforms = []
+        parent = component.meta_parent
+        while parent is not None and isinstance(parent, luna_rig.AnimComponent):
+            transforms += [str(ctl.transform) for ctl in parent.controls]
+            parent = parent.meta_parent
+        if component.character:
+            transforms.append(str(component.character.root_control.transform))
+        return transforms
+
+    @staticmethod
+    def get_upstream_curves(component):
+        """Anim curves of controls in parent components and character root control.
+
+        :param component: Dynamics component
+        :type component: luna_rig.components.FKDynamicsComponent
+        :return: Dictionary of {control attribute: anim curve}
+        :rtype: dict
+        """
+        curves = {}
+        for transform in DynamicsCacheManager.get_upstream_transforms(component):
+            for attr_name, anim_curve in animFn.list_anim_curves(transform).items():
+                curves["{0}.{1}".format(animFn.strip_namespace(transform), attr_name)] = anim_curve
+        return curves
+
+    @staticmethod
+    def get_signature(component, time_range):
+        """Hash of upstream animation keys and cached range.
+
+        :param component: Dynamics component
+        :type component: luna_rig.components.FKDynamicsComponent
+        :param time_range: Cache range
+        :type time_range: tuple
+        :rtype: str
+        """
+        upstream = {}
+        for plug, anim_curve in DynamicsCacheManager.get_upstream_curves(component).items():
+            upstream[plug] = animFn.get_curve_data(anim_curve)
+        data = json.dumps({"time_range": list(time_range), "upstream": upstream}, sort_keys=True)
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_state(component):
+        if not component.pynode.hasAttr("dynamicsCache"):
+            return {}
+        return json.loads(component.pynode.dynamicsCache.get() or "{}")
+
+    @staticmethod
+    def _set_state(component, state):
+        if not component.pynode.hasAttr("dynamicsCache"):
+            component.pynode.addAttr("dynamicsCache", dt="string")
+        component.pynode.dynamicsCache.set(json.dumps(state))
+
+    @staticmethod
+    def _list_driven_offsets(component):
+        """Pairs of (ctl chain joint, dynamics offset) connected by rotation."""
+        pairs = []
+        for jnt in component.ctl_chain:
+            for offset in mc.listConnections("{0}.rotate".format(jnt), s=False, d=True, type="transform") or []:
+                pairs.append((str(jnt), offset))
+        return pairs
+
+    def bake(self, components=None, time_range=None):
+        """Simulate range once and write cache file per component. Caches are loaded and enabled after baking.
+
+        :param components: Components to bake, defaults to None (all character dynamics components)
+        :type components: list[luna_rig.components.FKDynamicsComponent], optional
+        :param time_range: Frame range, defaults to None (playback range)
+        :type time_range: tuple, optional
+        :return: Dictionary of {component: cache file}
+        :rtype: dict
+        """
+        if components is None:
+            components = self.list_components()
+        if not components:
+            return {}
+        if not time_range:
+            time_range = animFn.get_playback_range()
+        for comp in components:
+            self.set_cache_enabled(comp, False)
+
+        frames = np.arange(time_range[0], time_range[1] + 1, dtype=float)
+        joints = dict([(comp, [jnt for jnt, _ in self._list_driven_offsets(comp)]) for comp in components])
+        rotations = dict([(comp, np.zeros((len(frames), len(joints[comp]), 3), dtype=np.float32)) for comp in components])
+        # Single sequential pass, simulation depends on previous frames
+        current_frame = mc.currentTime(q=True)
+        for frame_index, frame in enumerate(frames):
+            mc.currentTime(frame, update=True)
+            for comp in components:
+                for jnt_index, jnt in enumerate(joints[comp]):
+                    rotations[comp][frame_index, jnt_index] = mc.getAttr(jnt + ".rotate")[0]
+        mc.currentTime(current_frame, update=True)
+
+        result = {}
+        for comp in components:
+            meta = {"component": str(comp.pynode),
+                    "time_range": list(time_range),
+                    "time_unit": mc.currentUnit(q=True, time=True),
+                    "signature": self.get_signature(comp, time_range),
+                    "scene": mc.file(q=True, sn=True)}
+            export_path = self.get_new_file(comp)
+            np.savez_compressed(export_path,
+                                frames=frames,
+                                rotations=rotations[comp],
+                                joints=np.array([animFn.strip_namespace(jnt) for jnt in joints[comp]], dtype=str),
+                                meta=np.array(json.dumps(meta)))
+            Logger.info("{0}: Cached {1} {2}: {3}".format(self, comp, time_range, export_path))
+            self.load_cache(comp, export_path)
+            result[comp] = export_path
+        return result
+
+    def load_cache(self, component, file_path=None, enable=True):
+        """Create cache curves from file.
+
+        :param component: Dynamics component
+        :type component: luna_rig.components.FKDynamicsComponent
+        :param file_path: Cache file, defaults to None (latest version)
+        :type file_path: str, optional
+        :param enable: Enable cache after loading, defaults to True
+        :type enable: bool, optional
+        :return: True if cache was loaded
+        :rtype: bool
+        """
+        file_path = file_path or self.get_latest_file(component)
+        if not file_path:
+            Logger.warning("{0}: No cache files for {1}".format(self, component))
+            return False
+        data = np.load(file_path)
+        meta = json.loads(str(data["meta"]))
+        self.set_cache_enabled(component, False)
+        self._delete_curves(component)
+
+        pairs = dict([(animFn.strip_namespace(jnt), (jnt, offset)) for jnt, offset in self._list_driven_offsets(component)])
+        ui_unit = om2.MTime.uiUnit()
+        angle_unit = om2.MAngle.uiUnit()
+        times = [om2.MTime(float(frame), ui_unit) for frame in data["frames"]]
+        connections = []
+        curves = []
+        for jnt_index, jnt_name in enumerate(data["joints"]):
+            if str(jnt_name) not in pairs:
+                Logger.warning("{0}: Cached joint {1} not found in {2}".format(self, jnt_name, component))
+                continue
+            jnt, offset = pairs[str(jnt_name)]
+            for axis, channel in enumerate(ROTATE_CHANNELS):
+                anim_curve = mc.createNode("animCurveTA", n="{0}_{1}_cache".format(animFn.strip_namespace(offset), channel))
+                fn_curve = animFn.get_anim_curve_fn(anim_curve)
+                values = [om2.MAngle(value, angle_unit).asRadians() for value in data["rotations"][:, jnt_index, axis].tolist()]
+                fn_curve.addKeys(times, values, oma2.MFnAnimCurve.kTangentLinear, oma2.MFnAnimCurve.kTangentLinear, True)
+                connections.append([anim_curve + ".output", "{0}.{1}".format(offset, channel), jnt, offset])
+                curves.append(anim_curve)
+        component._store_util_nodes(curves)
+        state = {"file": file_path, "signature": meta["signature"], "time_range": meta["time_range"], "connections": connections, "enabled": False}
+        self._set_state(component, state)
+        if enable:
+            self.set_cache_enabled(component)
+        return True
+
+    def _delete_curves(self, component):
+        state = self.get_state(component)
+        curves = mc.ls([connection[0].split(".")[0] for connection in state.get("connections", [])])
+        if curves:
+            mc.delete(curves)
+        state["connections"] = []
+        self._set_state(component, state)
+
+    def is_cache_valid(self, component):
+        """Check if upstream animation matches the one cache was baked with.
+
+        :param component: Dynamics component
+        :type component: luna_rig.components.FKDynamicsComponent
+        :rtype: bool
+        """
+        state = self.get_state(component)
+        if not state.get("connections"):
+            return False
+        return self.get_signature(component, state["time_range"]) == state["signature"]
+
+    def set_cache_enabled(self, component, value=True):
+        """Switch dynamic offsets between cache curves and simulation. Hair system is not simulated while cache is used.
+
+        :param component: Dynamics component
+        :type component: luna_rig.components.FKDynamicsComponent
+        :param value: Use cache, defaults to True
+        :type value: bool, optional
+        :return: True if cache is used
+        :rtype: bool
+        """
+        state = self.get_state(component)
+        if not state or state.get("enabled", False) == value:
+            return state.get("enabled", False)
+        if value and not self.is_cache_valid(component):
+            Logger.warning("{0}: Cache of {1} is outdated, bake it again.".format(self, component))
+            return False
+
+        hair_system = str(component.hair_system)
+        for curve_plug, offset_plug, jnt, offset in state["connections"]:
+            rotate_plug = "{0}.rotate".format(offset)
+            if value:
+                if mc.isConnected(jnt + ".rotate", rotate_plug):
+                    mc.disconnectAttr(jnt + ".rotate", rotate_plug)
+                mc.connectAttr(curve_plug, offset_plug, force=True)
+            else:
+                if mc.isConnected(curve_plug, offset_plug):
+                    mc.disconnectAttr(curve_plug, offset_plug)
+                if not mc.isConnected(jnt + ".rotate", rotate_plug):
+                    mc.connectAttr(jnt + ".rotate", rotate_plug, force=True)
+        if value:
+            state["simulation_method"] = mc.getAttr(hair_system + ".simulationMethod")
+            mc.setAttr(hair_system + ".simulationMethod", 0)
+        elif "simulation_method" in state:
+            mc.setAttr(hair_system + ".simulationMethod", state.pop("simulation_method"))
+        state["enabled"] = value
+        self._set_state(component, state)
+        Logger.info("{0}: {1} cache {2}".format(self, component, "enabled" if value else "disabled"))
+        return value
+
+    def invalidate_stale(self, components=None):
+        """Disable caches which upstream animation has changed.
+
+        :param components: Components to check, defaults to None (all character dynamics components)
+        :type components: list[luna_rig.components.FKDynamicsComponent], optional
+        :return: Components with disabled cache
+        :rtype: list[luna_rig.components.FKDynamicsComponent]
+        """
+        if components is None:
+            components = self.list_components()
+        stale = []
+        for comp in components:
+            if self.get_state(comp).get("enabled") and not self.is_cache_valid(comp):
+                self.set_cache_enabled(comp, False)
+                stale.append(comp)
+        if stale:
+            Logger.warning("{0}: Upstream animation changed, caches disabled: {1}".format(self, stale))
+        return stale
+
+    def watch(self):
+        """Disable outdated caches automatically whenever anim curves are edited.
+        Edits are collected and checked once when Maya is idle, only components driven by edited curves are checked.
+        """
+        self.unwatch()
+        # Upstream transform -> watched components
+        watched = {}
+        for comp in self.list_components():
+            for transform in self.get_upstream_transforms(comp):
+                watched.setdefault(transform, []).append(comp)
+        pending_curves = set()
+
+        def check_pending():
+            edited_curves = mc.ls(list(pending_curves))
+            pending_curves.clear()
+            if not edited_curves:
+                return
+            affected = []
+            for transform in set(mc.listConnections(edited_curves, s=False, d=True) or []):
+                for comp in watched.get(transform, []):
+                    if comp not in affected:
+                        affected.append(comp)
+            if affected:
+                self.invalidate_stale(affected)
+
+        def on_curves_edited(edited_curves, *args):
+            schedule = not pending_curves
+            for index in range(edited_curves.length()):
+                pending_curves.add(om.MFnDependencyNode(edited_curves[index]).name())
+            if schedule:
+                mutils.executeDeferred(check_pending)
+
+        _WATCH_CALLBACK_IDS.append(om.MAnimMessage.addAnimCurveEditedCallback(on_curves_edited))
+
+    @staticmethod
+    def unwatch():
+        for callback_id in _WATCH_CALLBACK_IDS:
+            try:
+                om.MMessage.removeCallback(callback_id)
+            except RuntimeError:
+                Logger.exception("Failed to remove callback {0}".format(callback_id))
+        del _WATCH_CALLBACK_IDS[:]
@@ -1,3 +1,4 @@
+import os
 import abc
 import luna
 from luna import Logger
@@ -35,6 +36,19 @@ class AbstractManager(object):
             raise RuntimeError
         self.versioned_files = fileFn.get_versioned_files(self.path, extension=self.extension)
 
+    def get_data_dir(self, dir_name):
+        """Directory in asset data folder for data types without own asset entry. Created if missing.
+
+        :param dir_name: Directory name
+        :type dir_name: str
+        :rtype: str
+        """
+        # Asset data folder is parent of any data type folder
+        data_path = os.path.join(os.path.dirname(self.asset.data.driven_poses), dir_name)
+        if not os.path.isdir(data_path):
+            os.makedirs(data_path)
+        return data_path
+
     @abc.abstractproperty
     def path(self):
         """Path to asset sub directory. Example: self.asset.weights.skin """
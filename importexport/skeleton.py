@@ -0,0 +1,226 @@
+import os
+import math
+import maya.cmds as mc
+import maya.api.OpenMaya as om2
+from luna import Logger
+import luna.static as static
+from luna.utils import fileFn
+from luna_rig.importexport import manager
+
+
+VERSION = 1
+# Per joint arrays, in traversal order (parents before children)
+JOINT_ARRAYS = ["names", "parents", "translates", "rotates", "scales", "joint_orients",
+                "rotate_orders", "radius", "segment_scale_compensate", "world_matrices", "meta_parents"]
+# Decimals kept in file, keeps values stable between exports
+PRECISION = 6
+# Max world matrix element difference accepted after import
+MATRIX_TOLERANCE = 0.001
+
+
+def _round(values):
+    return [round(value, PRECISION) + 0.0 for value in values]
+
+
+def _get_compound(fn_node, attr_name, angular=False):
+    plug = fn_node.findPlug(attr_name, False)
+    values = [plug.child(index).asDouble() for index in range(plug.numChildren())]
+    return _round([math.degrees(value) for value in values] if angular else values)
+
+
+def _set_compound(modifier, fn_node, attr_name, values, angular=False):
+    plug = fn_node.findPlug(attr_name, False)
+    for index, value in enumerate(values):
+        modifier.newPlugValueDouble(plug.child(index), math.radians(value) if angular else value)
+
+
+class SkeletonManager(manager.AbstractManager):
+    """Export/import skeleton as joint arrays (.skel JSON) instead of skeleton scene.
+    Values are stored in internal units, angles in degrees. Joints are created with single API modifier on import.
+    """
+
+    def __init__(self):
+        super(SkeletonManager, self).__init__("skeleton", "skel")
+
+    @property
+    def path(self):
+        return self.asset.skeleton
+
+    def get_base_name(self):
+        return "{0}_{1}".format(self.asset.name, self.data_type)
+
+    def get_new_file(self):
+        return fileFn.get_new_versioned_file(self.get_base_name(), dir_path=self.path, extension=self.extension, full_path=True)
+
+    def get_latest_file(self):
+        return fileFn.get_latest_file(self.get_base_name(), self.path, extension=self.extension, full_path=True)
+
+    @staticmethod
+    def get_root():
+        """Default export root: character deformation rig group if exists, world otherwise."""
+        deformation_rig = mc.ls(static.CharacterMembers.deformation_rig.value, type="transform", long=True)
+        return deformation_rig[0] if deformation_rig else None
+
+    @staticmethod
+    def get_data(root=None):
+        """Read joints under root with one breadth first traversal.
+
+        :param root: Transform or joint to read joints under, defaults to None (all scene joints)
+        :type root: str or PyNode, optional
+        :return: Skeleton data
+        :rtype: dict
+        """
+        data = dict([(name, []) for name in JOINT_ARRAYS])
+        data["version"] = VERSION
+        dag_iter = om2.MItDag(om2.MItDag.kBreadthFirst, om2.MFn.kJoint)
+        root_name = ""
+        if root:
+            sel_list = om2.MSelectionList()
+            sel_list.add(str(root))
+            root_path = sel_list.getDagPath(0)
+            root_name = root_path.fullPathName()
+            dag_iter.reset(root_path, om2.MItDag.kBreadthFirst, om2.MFn.kJoint)
+        indices = {}
+        while not dag_iter.isDone():
+            dag_path = dag_iter.getPath()
+            dag_iter.next()
+            fn_node = om2.MFnDagNode(dag_path)
+            parent_path = om2.MDagPath(dag_path)
+            parent_path.pop()
+            parent_index = indices.get(parent_path.fullPathName(), -1)
+            # Intermediate transforms are not stored, joint would be imported as root with wrong offset
+            if parent_index < 0 and dag_path.fullPathName() != root_name and parent_path.fullPathName() != root_name:
+                Logger.warning("Skeleton export: {0} parent {1} is not a joint, joint will be imported as root.".format(
+                    dag_path.fullPathName(), parent_path.fullPathName()))
+            indices[dag_path.fullPathName()] = len(data["names"])
+            data["names"].append(fn_node.name().split(":")[-1])
+            data["parents"].append(parent_index)
+            data["translates"].append(_get_compound(fn_node, "translate"))
+            data["rotates"].append(_get_compound(fn_node, "rotate", angular=True))
+            data["scales"].append(_get_compound(fn_node, "scale"))
+            data["joint_orients"].append(_get_compound(fn_node, "jointOrient", angular=True))
+            data["rotate_orders"].append(fn_node.findPlug("rotateOrder", False).asInt())
+            data["radius"].append(round(fn_node.findPlug("radius", False).asDouble(), PRECISION))
+            data["segment_scale_compensate"].append(fn_node.findPlug("segmentScaleCompensate", False).asBool())
+            data["world_matrices"].append(_round(list(dag_path.inclusiveMatrix())))
+            # Meta parent: None - no attribute, "" - not connected, "node.attr" - connected to meta node plug
+            meta_parent = None
+            if fn_node.hasAttribute("metaParent"):
+                destinations = fn_node.findPlug("metaParent", False).connectedTo(False, True)
+                meta_parent = destinations[0].name().split(":")[-1] if destinations else ""
+            data["meta_parents"].append(meta_parent)
+        return data
+
+    @staticmethod
+    def create_joints(data, parent=None):
+        """Create joints from skeleton data.
+        Note: API edits are not added to undo queue.
+
+        :param data: Skeleton data
+        :type data: dict
+        :param parent: Parent for root joints, defaults to None (world, same as skeleton scene)
+        :type parent: str or PyNode, optional
+        :raises ValueError: If data version is newer than supported
+        :return: Full path names of created joints in data order
+        :rtype: list[str]
+        """
+        if data.get("version", 0) > VERSION:
+            raise ValueError("Unsupported skeleton data version {0}, max supported: {1}".format(data.get("version"), VERSION))
+        parent_object = om2.MObject.kNullObj
+        if parent:
+            sel_list = om2.MSelectionList()
+            sel_list.add(str(parent))
+            parent_object = sel_list.getDependNode(0)
+
+        dag_modifier = om2.MDagModifier()
+        joints = []
+        for name, parent_index in zip(data["names"], data["parents"]):
+            joint_object = dag_modifier.createNode("joint", joints[parent_index] if parent_index >= 0 else parent_object)
+            dag_modifier.renameNode(joint_object, name)
+            joints.append(joint_object)
+        dag_modifier.doIt()
+
+        plug_modifier = om2.MDGModifier()
+        for index, joint_object in enumerate(joints):
+            fn_node = om2.MFnDependencyNode(joint_object)
+            _set_compound(plug_modifier, fn_node, "translate", data["translates"][index])
+            _set_compound(plug_modifier, fn_node, "rotate", data["rotates"][index], angular=True)
+            _set_compound(plug_modifier, fn_node, "scale", data["scales"][index])
+            _set_compound(plug_modifier, fn_node, "jointOrient", data["joint_orients"][index], angular=True)
+            plug_modifier.newPlugValueInt(fn_node.findPlug("rotateOrder", False), data["rotate_orders"][index])
+            plug_modifier.newPlugValueDouble(fn_node.findPlug("radius", False), data["radius"][index])
+            plug_modifier.newPlugValueBool(fn_node.findPlug("segmentScaleCompensate", False), data["segment_scale_compensate"][index])
+        plug_modifier.doIt()
+
+        joint_names = [om2.MFnDagNode(joint_object).fullPathName() for joint_object in joints]
+        SkeletonManager.validate_world_matrices(joint_names, data.get("world_matrices", []))
+        for joint_name, meta_parent in zip(joint_names, data["meta_parents"]):
+            if meta_parent is None:
+                continue
+            mc.addAttr(joint_name, ln="metaParent", at="message")
+            if meta_parent and mc.objExists(meta_parent):
+                mc.connectAttr(joint_name + ".metaParent", meta_parent, na=True)
+        return joint_names
+
+    @staticmethod
+    def validate_world_matrices(joint_names, world_matrices):
+        """Compare joints world matrices against exported values, warns about mismatched joints.
+
+        :param joint_names: Joints in data order
+        :type joint_names: list[str]
+        :param world_matrices: Exported world matrices
+        :type world_matrices: list[list[float]]
+        :return: Mismatched joint names
+        :rtype: list[str]
+        """
+        mismatched = []
+        sel_list = om2.MSelectionList()
+        for joint_name in joint_names:
+            sel_list.add(joint_name)
+        for index, stored_matrix in enumerate(world_matrices[:len(joint_names)]):
+            current_matrix = list(sel_list.getDagPath(index).inclusiveMatrix())
+            if any([abs(current - stored) > MATRIX_TOLERANCE for current, stored in zip(current_matrix, stored_matrix)]):
+                mismatched.append(joint_names[index])
+        if mismatched:
+            Logger.warning("Skeleton import: {0} joint(s) don't match exported world position (parent space differs from export?): {1}".format(
+                len(mismatched), mismatched))
+        return mismatched
+
+    @classmethod
+    def export_skeleton(cls, root=None):
+        """Export skeleton to new file version.
+
+        :param root: Export root, defaults to None (deformation rig group or all joints)
+        :type root: str or PyNode, optional
+        :return: Exported file path
+        :rtype: str
+        """
+        manager_instance = cls()
+        data = cls.get_data(root or cls.get_root())
+        if not data["names"]:
+            Logger.warning("{0}: No joints to export.".format(manager_instance))
+            return None
+        export_path = manager_instance.get_new_file()
+        fileFn.write_json(export_path, data=data, sort_keys=True)
+        Logger.info("Exported skeleton: {0} ({1} joints)".format(export_path, len(data["names"])))
+        return export_path
+
+    @classmethod
+    def import_skeleton(cls, file_path=None, parent=None):
+        """Create joints from skeleton file.
+
+        :param file_path: Skeleton file, defaults to None (latest version)
+        :type file_path: str, optional
+        :param parent: Parent for root joints, defaults to None
+        :type parent: str or PyNode, optional
+        :return: Imported file path or None if asset has no skeleton data
+        :rtype: str
+        """
+        manager_instance = cls()
+        file_path = file_path or manager_instance.get_latest_file()
+        if not file_path or not os.path.isfile(file_path):
+            Logger.warning("{0}: No skeleton data found.".format(manager_instance))
+            return None
+        joints = cls.create_joints(fileFn.load_json(file_path), parent=parent)
+        Logger.info("Imported skeleton: {0} ({1} joints)".format(file_path, len(joints)))
+        return file_path